@@ -28,7 +28,7 @@ from semantic_workbench_assistant.assistant_app import (
 )
 
 from .config import AssistantConfigModel, MCPToolsConfigModel, WorkspaceAssistantConfigModel
-from .response import respond_to_conversation
+from .response import close_mcp_sessions, invalidate_history_cache, respond_to_conversation
 
 logger = logging.getLogger(__name__)
 
@@ -153,6 +153,16 @@ async def on_message_created(
             )
 
 
+@assistant.events.conversation.message.on_deleted_including_mine
+async def on_message_deleted(
+    context: ConversationContext, event: ConversationEvent, message: ConversationMessage
+) -> None:
+    """
+    Handle the event triggered when a message is deleted, dropping the cached conversation history that includes it.
+    """
+    invalidate_history_cache(context)
+
+
 async def should_respond_to_message(context: ConversationContext, message: ConversationMessage) -> bool:
     """
     Determine if the assistant should respond to the message.
@@ -229,4 +239,29 @@ async def on_conversation_created(context: ConversationContext) -> None:
     )
 
 
+@assistant.events.conversation.on_deleted
+async def on_conversation_deleted(context: ConversationContext) -> None:
+    """
+    Handle the event triggered when the assistant is removed from a conversation, stopping the MCP servers that were
+    kept connected for the conversation.
+    """
+    await close_mcp_sessions(context.assistant.id, context.id)
+
+
+@assistant.events.assistant.on_deleted
+async def on_assistant_deleted(context: AssistantContext) -> None:
+    """
+    Handle the event triggered when the assistant is deleted, stopping the MCP servers of all of its conversations.
+    """
+    await close_mcp_sessions(context.id)
+
+
+@assistant.events.on_service_shutdown
+async def on_service_shutdown() -> None:
+    """
+    Stop the MCP servers of all conversations when the service shuts down.
+    """
+    await close_mcp_sessions()
+
+
 # endregion
@@ -1,3 +1,4 @@
-from .response import respond_to_conversation
+from .response import close_mcp_sessions, respond_to_conversation
+from .utils import invalidate_history_cache
 
-__all__ = ["respond_to_conversation"]
+__all__ = ["close_mcp_sessions", "invalidate_history_cache", "respond_to_conversation"]
@@ -8,6 +8,7 @@ import deepmerge
 from assistant_extensions.mcp import (
     ExtendedCallToolRequestParams,
     MCPSession,
+    MCPToolRegistry,
     OpenAISamplingHandler,
     handle_mcp_tool_call,
 )
@@ -39,6 +40,7 @@ async def handle_completion(
     step_result: StepResult,
     completion: ParsedChatCompletion | ChatCompletion,
     mcp_sessions: List[MCPSession],
+    tool_registry: MCPToolRegistry,
     context: ConversationContext,
     request_config: OpenAIRequestConfig,
     silence_token: str,
@@ -173,6 +175,7 @@ async def handle_completion(
                         tool_call,
                         f"{metadata_key}:request:tool_call_{tool_call_count}",
                         on_logging_message,
+                        tool_registry=tool_registry,
                     )
                 except Exception as e:
                     logger.exception(f"Error handling tool call '{tool_call.name}': {e}")
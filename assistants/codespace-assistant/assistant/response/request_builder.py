@@ -19,8 +19,6 @@ from openai_client import (
     OpenAIRequestConfig,
     convert_from_completion_messages,
     num_tokens_from_messages,
-    num_tokens_from_tools,
-    num_tokens_from_tools_and_messages,
 )
 from semantic_workbench_assistant.assistant_app import ConversationContext
 
@@ -48,6 +46,7 @@ async def build_request(
     prompts_config: PromptsConfigModel,
     request_config: OpenAIRequestConfig,
     tools: List[ChatCompletionToolParam] | None,
+    tools_token_count: int,
     tools_config: MCPToolsConfigModel,
     attachments_config: AttachmentsConfigModel,
     silence_token: str,
@@ -113,11 +112,8 @@ async def build_request(
         messages=chat_message_params,
     )
 
-    # Get the token count for the tools
-    tool_token_count = num_tokens_from_tools(
-        model=request_config.model,
-        tools=tools or [],
-    )
+    # The token count for the tools is computed once per set of tools
+    tool_token_count = tools_token_count
 
     # Generate the attachment messages
     attachment_messages: List[ChatCompletionMessageParam] = convert_from_completion_messages(
@@ -154,10 +150,12 @@ async def build_request(
     chat_message_params.extend(history_messages_result.messages)
 
     # Check token count
-    total_token_count = num_tokens_from_tools_and_messages(
-        messages=chat_message_params,
-        tools=tools or [],
-        model=request_config.model,
+    total_token_count = (
+        num_tokens_from_messages(
+            messages=chat_message_params,
+            model=request_config.model,
+        )
+        + tool_token_count
     )
     if total_token_count > available_tokens:
         raise ValueError(
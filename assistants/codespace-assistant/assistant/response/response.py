@@ -1,15 +1,17 @@
+import asyncio
 import logging
-from contextlib import AsyncExitStack
+import time
+from dataclasses import dataclass, field
 from typing import Any
 
 from assistant_extensions.attachments import AttachmentsExtension
 from assistant_extensions.mcp import (
     MCPServerConnectionError,
+    MCPSessionPool,
+    MCPToolRegistry,
     OpenAISamplingHandler,
-    establish_mcp_sessions,
     get_enabled_mcp_server_configs,
     get_mcp_server_prompts,
-    refresh_mcp_sessions,
 )
 from semantic_workbench_api_model.workbench_model import (
     ConversationMessage,
@@ -20,11 +22,55 @@ from semantic_workbench_assistant.assistant_app import ConversationContext
 
 from ..config import AssistantConfigModel
 from .step_handler import next_step
-from .utils import get_ai_client_configs
+from .utils import create_mcp_tool_registry, get_ai_client_configs
 
 logger = logging.getLogger(__name__)
 
 
+@dataclass
+class _ConversationMCPSessions:
+    session_pool: MCPSessionPool = field(default_factory=MCPSessionPool)
+    tool_registry: MCPToolRegistry = field(default_factory=create_mcp_tool_registry)
+    responding: int = 0
+    last_used: float = field(default_factory=time.monotonic)
+
+
+# MCP sessions are kept connected across turns, per conversation, so that the sampling requests and notifications of
+# the servers reach the conversation they belong to; the sessions of conversations without a response in progress for
+# _mcp_sessions_idle_seconds are closed, stopping their servers
+_mcp_sessions_idle_seconds = 30 * 60
+_mcp_sessions: dict[tuple[str, str], _ConversationMCPSessions] = {}
+
+
+async def close_mcp_sessions(assistant_id: str | None = None, conversation_id: str | None = None) -> None:
+    """
+    Close the MCP sessions of a conversation, of all conversations of an assistant, or, with no arguments, of all
+    conversations, stopping their servers.
+    """
+    keys = [
+        key
+        for key in _mcp_sessions
+        if (assistant_id is None or key[0] == assistant_id) and (conversation_id is None or key[1] == conversation_id)
+    ]
+    await _close_mcp_sessions(keys)
+
+
+async def _close_idle_mcp_sessions() -> None:
+    idle_before = time.monotonic() - _mcp_sessions_idle_seconds
+    await _close_mcp_sessions([
+        key
+        for key, conversation_mcp_sessions in _mcp_sessions.items()
+        if not conversation_mcp_sessions.responding and conversation_mcp_sessions.last_used < idle_before
+    ])
+
+
+async def _close_mcp_sessions(keys: list[tuple[str, str]]) -> None:
+    session_pools = [_mcp_sessions.pop(key).session_pool for key in keys]
+    if session_pools:
+        logger.debug("closing MCP sessions of %d conversations", len(session_pools))
+    await asyncio.gather(*(session_pool.close() for session_pool in session_pools))
+
+
 async def respond_to_conversation(
     message: ConversationMessage,
     attachments_extension: AttachmentsExtension,
@@ -36,42 +82,105 @@ async def respond_to_conversation(
     Perform a multi-step response to a conversation message using dynamically loaded MCP servers with
     support for multiple tool invocations.
     """
-
-    async with AsyncExitStack() as stack:
-        # Get the AI client configurations for this assistant
-        generative_ai_client_config = get_ai_client_configs(config, "generative")
-        reasoning_ai_client_config = get_ai_client_configs(config, "reasoning")
-
-        # TODO: This is a temporary hack to allow directing the request to the reasoning model
-        # Currently we will only use the requested AI client configuration for the turn
-        request_type = "reasoning" if message.content.startswith("reason:") else "generative"
-        # Set a default AI client configuration based on the request type
-        default_ai_client_config = (
-            reasoning_ai_client_config if request_type == "reasoning" else generative_ai_client_config
-        )
-        # Set the service and request configurations for the AI client
-        service_config = default_ai_client_config.service_config
-        request_config = default_ai_client_config.request_config
-
-        # Create a sampling handler for handling requests from the MCP servers
-        sampling_handler = OpenAISamplingHandler(
-            ai_client_configs=[
-                generative_ai_client_config,
-                reasoning_ai_client_config,
-            ]
+    await _close_idle_mcp_sessions()
+
+    key = (context.assistant.id, context.id)
+    if key not in _mcp_sessions:
+        _mcp_sessions[key] = _ConversationMCPSessions()
+    conversation_mcp_sessions = _mcp_sessions[key]
+    conversation_mcp_sessions.responding += 1
+    try:
+        await _respond_to_conversation(
+            message, attachments_extension, context, config, conversation_mcp_sessions, metadata
         )
+    finally:
+        conversation_mcp_sessions.responding -= 1
+        conversation_mcp_sessions.last_used = time.monotonic()
 
-        enabled_servers = []
-        if config.tools.enabled:
-            enabled_servers = get_enabled_mcp_server_configs(config.tools.mcp_servers)
 
-        try:
-            mcp_sessions = await establish_mcp_sessions(
-                mcp_server_configs=enabled_servers,
-                stack=stack,
-                sampling_handler=sampling_handler.handle_message,
-            )
+async def _respond_to_conversation(
+    message: ConversationMessage,
+    attachments_extension: AttachmentsExtension,
+    context: ConversationContext,
+    config: AssistantConfigModel,
+    conversation_mcp_sessions: _ConversationMCPSessions,
+    metadata: dict[str, Any],
+) -> None:
+    # Get the AI client configurations for this assistant
+    generative_ai_client_config = get_ai_client_configs(config, "generative")
+    reasoning_ai_client_config = get_ai_client_configs(config, "reasoning")
+
+    # TODO: This is a temporary hack to allow directing the request to the reasoning model
+    # Currently we will only use the requested AI client configuration for the turn
+    request_type = "reasoning" if message.content.startswith("reason:") else "generative"
+    # Set a default AI client configuration based on the request type
+    default_ai_client_config = (
+        reasoning_ai_client_config if request_type == "reasoning" else generative_ai_client_config
+    )
+    # Set the service and request configurations for the AI client
+    service_config = default_ai_client_config.service_config
+    request_config = default_ai_client_config.request_config
+
+    # Create a sampling handler for handling requests from the MCP servers
+    sampling_handler = OpenAISamplingHandler(
+        ai_client_configs=[
+            generative_ai_client_config,
+            reasoning_ai_client_config,
+        ]
+    )
+
+    enabled_servers = []
+    if config.tools.enabled:
+        enabled_servers = get_enabled_mcp_server_configs(config.tools.mcp_servers)
+
+    mcp_session_pool = conversation_mcp_sessions.session_pool
+    tool_registry = conversation_mcp_sessions.tool_registry
+
+    try:
+        mcp_sessions = await mcp_session_pool.get_sessions(
+            mcp_server_configs=enabled_servers,
+            sampling_handler=sampling_handler.handle_message,
+        )
 
+    except MCPServerConnectionError as e:
+        await context.send_messages(
+            NewConversationMessage(
+                content=f"Failed to connect to MCP server {e.server_config.key}: {e}",
+                message_type=MessageType.notice,
+                metadata=metadata,
+            )
+        )
+        return
+
+    # Retrieve prompts from the MCP servers
+    mcp_prompts = get_mcp_server_prompts(enabled_servers)
+
+    # Initialize a loop control variable
+    max_steps = config.tools.advanced.max_steps
+    interrupted = False
+    encountered_error = False
+    completed_within_max_steps = False
+    step_count = 0
+
+    # Loop until the response is complete or the maximum number of steps is reached
+    while step_count < max_steps:
+        step_count += 1
+
+        # Check to see if we should interrupt our flow
+        last_message = await context.get_messages(limit=1, message_types=[MessageType.chat])
+
+        if step_count > 1 and last_message.messages[0].sender.participant_id != context.assistant.id:
+            # The last message was from a sender other than the assistant, so we should
+            # interrupt our flow as this would have kicked off a new response from this
+            # assistant with the new message in mind and that process can decide if it
+            # should continue with the current flow or not.
+            interrupted = True
+            logger.info("Response interrupted.")
+            break
+
+        # Reconnect to the MCP servers if they were disconnected, and reload changed tool listings
+        try:
+            mcp_sessions = await mcp_session_pool.get_sessions(mcp_server_configs=enabled_servers)
         except MCPServerConnectionError as e:
             await context.send_messages(
                 NewConversationMessage(
@@ -80,70 +189,43 @@ async def respond_to_conversation(
                     metadata=metadata,
                 )
             )
-            return
-
-        # Retrieve prompts from the MCP servers
-        mcp_prompts = get_mcp_server_prompts(enabled_servers)
-
-        # Initialize a loop control variable
-        max_steps = config.tools.advanced.max_steps
-        interrupted = False
-        encountered_error = False
-        completed_within_max_steps = False
-        step_count = 0
-
-        # Loop until the response is complete or the maximum number of steps is reached
-        while step_count < max_steps:
-            step_count += 1
-
-            # Check to see if we should interrupt our flow
-            last_message = await context.get_messages(limit=1, message_types=[MessageType.chat])
-
-            if step_count > 1 and last_message.messages[0].sender.participant_id != context.assistant.id:
-                # The last message was from a sender other than the assistant, so we should
-                # interrupt our flow as this would have kicked off a new response from this
-                # assistant with the new message in mind and that process can decide if it
-                # should continue with the current flow or not.
-                interrupted = True
-                logger.info("Response interrupted.")
-                break
-
-            # Reconnect to the MCP servers if they were disconnected
-            mcp_sessions = await refresh_mcp_sessions(mcp_sessions)
-
-            step_result = await next_step(
-                sampling_handler=sampling_handler,
-                mcp_sessions=mcp_sessions,
-                mcp_prompts=mcp_prompts,
-                attachments_extension=attachments_extension,
-                context=context,
-                request_config=request_config,
-                service_config=service_config,
-                prompts_config=config.prompts,
-                tools_config=config.tools,
-                attachments_config=config.extensions_config.attachments,
-                metadata=metadata,
-                metadata_key=f"respond_to_conversation:step_{step_count}",
-            )
+            encountered_error = True
+            break
+
+        step_result = await next_step(
+            sampling_handler=sampling_handler,
+            mcp_sessions=mcp_sessions,
+            tool_registry=tool_registry,
+            mcp_prompts=mcp_prompts,
+            attachments_extension=attachments_extension,
+            context=context,
+            request_config=request_config,
+            service_config=service_config,
+            prompts_config=config.prompts,
+            tools_config=config.tools,
+            attachments_config=config.extensions_config.attachments,
+            metadata=metadata,
+            metadata_key=f"respond_to_conversation:step_{step_count}",
+        )
 
-            if step_result.status == "error":
-                encountered_error = True
-                break
+        if step_result.status == "error":
+            encountered_error = True
+            break
 
-            if step_result.status == "final":
-                completed_within_max_steps = True
-                break
+        if step_result.status == "final":
+            completed_within_max_steps = True
+            break
 
-        # If the response did not complete within the maximum number of steps, send a message to the user
-        if not completed_within_max_steps and not encountered_error and not interrupted:
-            await context.send_messages(
-                NewConversationMessage(
-                    content=config.tools.advanced.max_steps_truncation_message,
-                    message_type=MessageType.notice,
-                    metadata=metadata,
-                )
+    # If the response did not complete within the maximum number of steps, send a message to the user
+    if not completed_within_max_steps and not encountered_error and not interrupted:
+        await context.send_messages(
+            NewConversationMessage(
+                content=config.tools.advanced.max_steps_truncation_message,
+                message_type=MessageType.notice,
+                metadata=metadata,
             )
-            logger.info("Response stopped early due to maximum steps.")
+        )
+        logger.info("Response stopped early due to maximum steps.")
 
     # Log the completion of the response
     logger.info("Response completed.")
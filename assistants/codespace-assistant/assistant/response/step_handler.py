@@ -5,7 +5,7 @@ from typing import Any, List
 
 import deepmerge
 from assistant_extensions.attachments import AttachmentsConfigModel, AttachmentsExtension
-from assistant_extensions.mcp import MCPSession, OpenAISamplingHandler
+from assistant_extensions.mcp import MCPSession, MCPToolRegistry, OpenAISamplingHandler
 from openai.types.chat import (
     ChatCompletion,
     ParsedChatCompletion,
@@ -24,7 +24,6 @@ from .request_builder import build_request
 from .utils import (
     get_completion,
     get_formatted_token_count,
-    get_openai_tools_from_mcp_sessions,
 )
 
 logger = logging.getLogger(__name__)
@@ -33,6 +32,7 @@ logger = logging.getLogger(__name__)
 async def next_step(
     sampling_handler: OpenAISamplingHandler,
     mcp_sessions: List[MCPSession],
+    tool_registry: MCPToolRegistry,
     mcp_prompts: List[str],
     attachments_extension: AttachmentsExtension,
     context: ConversationContext,
@@ -75,8 +75,10 @@ async def next_step(
     # Establish a token to be used by the AI model to indicate no response
     silence_token = "{{SILENCE}}"
 
-    # convert the tools to make them compatible with the OpenAI API
-    tools = get_openai_tools_from_mcp_sessions(mcp_sessions, tools_config)
+    # convert the tools to make them compatible with the OpenAI API; the registry reuses the conversion until the
+    # sessions or their tools change
+    tool_registry.update(mcp_sessions, tools_config.advanced.tools_disabled)
+    tools = tool_registry.openai_tools
     sampling_handler.assistant_mcp_tools = tools
 
     build_request_result = await build_request(
@@ -88,6 +90,7 @@ async def next_step(
         request_config=request_config,
         tools_config=tools_config,
         tools=tools,
+        tools_token_count=tool_registry.openai_tools_token_count(request_config.model),
         attachments_config=attachments_config,
         silence_token=silence_token,
     )
@@ -153,6 +156,7 @@ async def next_step(
         step_result,
         completion,
         mcp_sessions,
+        tool_registry,
         context,
         request_config,
         silence_token,
@@ -3,23 +3,25 @@ from .message_utils import (
     build_system_message_content,
     conversation_message_to_chat_message_params,
     get_history_messages,
+    invalidate_history_cache,
 )
 from .openai_utils import (
+    create_mcp_tool_registry,
     extract_content_from_mcp_tool_calls,
     get_ai_client_configs,
     get_completion,
-    get_openai_tools_from_mcp_sessions,
 )
 
 __all__ = [
     "build_system_message_content",
     "conversation_message_to_chat_message_params",
+    "create_mcp_tool_registry",
     "extract_content_from_mcp_tool_calls",
     "get_ai_client_configs",
     "get_completion",
     "get_formatted_token_count",
     "get_history_messages",
-    "get_openai_tools_from_mcp_sessions",
     "get_response_duration_message",
     "get_token_usage_message",
+    "invalidate_history_cache",
 ]
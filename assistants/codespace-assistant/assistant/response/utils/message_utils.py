@@ -1,6 +1,10 @@
+import asyncio
+import bisect
 import json
 import logging
-from dataclasses import dataclass
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field
 from textwrap import dedent
 from typing import Any
 
@@ -201,69 +205,158 @@ async def conversation_message_to_chat_message_params(
     return chat_message_params
 
 
-async def get_history_messages(
-    context: ConversationContext,
-    participants: list[ConversationParticipant],
-    model: str,
-    token_limit: int | None = None,
-) -> GetHistoryMessagesResult:
+@dataclass
+class _ConversationHistory:
     """
-    Get all messages in the conversation, formatted for use in a completion.
+    The formatted history of a conversation, with the token count of each message held as prefix sums.
+    """
+
+    participants_key: tuple[tuple[str, str], ...]
+    model: str
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+    messages: list[ConversationMessage] = field(default_factory=list)
+    formatted_messages: list[list[ChatCompletionMessageParam]] = field(default_factory=list)
+    # token_prefix_sums[i] is the token count of the first i messages
+    token_prefix_sums: list[int] = field(default_factory=lambda: [0])
+
+    async def append(self, context: ConversationContext, participants: list[ConversationParticipant]) -> None:
+        for message in self.messages[len(self.formatted_messages) :]:
+            formatted_message_list = await conversation_message_to_chat_message_params(context, message, participants)
+            self.formatted_messages.append(formatted_message_list)
+            self.token_prefix_sums.append(
+                self.token_prefix_sums[-1]
+                + openai_client.num_tokens_from_messages(formatted_message_list, model=self.model)
+            )
+
+
+# the formatted histories of the most recently used conversations, keyed by (assistant id, conversation id)
+_history_cache: OrderedDict[tuple[str, str], _ConversationHistory] = OrderedDict()
+_history_cache_max_conversations = 100
+
+
+def invalidate_history_cache(context: ConversationContext) -> None:
     """
+    Removes the cached history of the conversation, for example when a message is deleted.
+    """
+    _history_cache.pop((context.assistant.id, context.id), None)
 
-    # each call to get_messages will return a maximum of 100 messages
-    # so we need to loop until all messages are retrieved
-    # if token_limit is provided, we will stop when the token limit is reached
 
-    history = []
-    token_count = 0
-    before_message_id = None
-    token_overage = 0
+async def _get_messages_after(context: ConversationContext, after: uuid.UUID | None) -> list[ConversationMessage]:
+    """
+    Get all chat and tool result messages after the given message, oldest first.
+    """
 
+    # each call to get_messages returns the latest messages, up to a maximum of 100, so page backwards until all
+    # messages after the given message are retrieved
+    batches: list[list[ConversationMessage]] = []
+    before = None
     while True:
-        # get the next batch of messages, including chat and tool result messages
         messages_response = await context.get_messages(
-            limit=100, before=before_message_id, message_types=[MessageType.chat, MessageType.note]
+            limit=100, before=before, after=after, message_types=[MessageType.chat, MessageType.note]
         )
         messages_list = messages_response.messages
+        if not messages_list:
+            break
 
-        # if there are no more messages, break the loop
-        if not messages_list or messages_list.count == 0:
+        batches.append(messages_list)
+        if len(messages_list) < 100:
             break
 
-        # set the before_message_id for the next batch of messages
-        before_message_id = messages_list[0].id
+        before = messages_list[0].id
 
-        # messages are returned in reverse order, so we need to reverse them
-        for message in reversed(messages_list):
-            # format the message
-            formatted_message_list = await conversation_message_to_chat_message_params(context, message, participants)
-            formatted_messages_token_count = openai_client.num_tokens_from_messages(formatted_message_list, model=model)
+    return [message for batch in reversed(batches) for message in batch]
+
+
+async def _get_conversation_history(
+    context: ConversationContext,
+    participants: list[ConversationParticipant],
+    model: str,
+) -> _ConversationHistory:
+    """
+    Get the formatted history of the conversation, fetching only the messages after the last cached message.
+    """
+    key = (context.assistant.id, context.id)
+    participants_key = tuple(sorted((participant.id, participant.name) for participant in participants))
+
+    history = _history_cache.get(key)
+    if history is None:
+        history = _ConversationHistory(participants_key=participants_key, model=model)
+        _history_cache[key] = history
+        while len(_history_cache) > _history_cache_max_conversations:
+            _history_cache.popitem(last=False)
+
+    _history_cache.move_to_end(key)
+
+    async with history.lock:
+        # the formatting includes participant names, and token counts depend on the model
+        if history.participants_key != participants_key or history.model != model:
+            history.participants_key = participants_key
+            history.model = model
+            history.formatted_messages = []
+            history.token_prefix_sums = [0]
+
+        last_message_id = history.messages[-1].id if history.messages else None
+        new_messages = await _get_messages_after(context, after=last_message_id)
+
+        # the workbench ignores an `after` message that does not exist, returning every message instead, so if the
+        # last cached message was deleted without its deletion event invalidating the cache, the messages returned
+        # include cached messages; the returned messages are then the whole history, so the cache is rebuilt from them
+        cached_message_ids = {message.id for message in history.messages} if new_messages else set()
+        if any(message.id in cached_message_ids for message in new_messages):
+            logger.info(
+                "last cached message not found, rebuilding history cache; conversation_id: %s, message_id: %s",
+                context.id,
+                last_message_id,
+            )
+            history.messages = []
+            history.formatted_messages = []
+            history.token_prefix_sums = [0]
+
+        history.messages.extend(new_messages)
+        await history.append(context, participants)
+
+    return history
+
+
+async def get_history_messages(
+    context: ConversationContext,
+    participants: list[ConversationParticipant],
+    model: str,
+    token_limit: int | None = None,
+) -> GetHistoryMessagesResult:
+    """
+    Get all messages in the conversation, formatted for use in a completion.
+    """
 
-            # if the token limit is not reached, or if the token limit is not provided
-            if token_overage == 0 and token_limit and token_count + formatted_messages_token_count < token_limit:
-                # increment the token count
-                token_count += formatted_messages_token_count
+    # include the most recent messages that fit within the token limit, and count the tokens of the older messages
+    # as the token overage
 
-                # insert the formatted messages onto the top of the history list
-                history = formatted_message_list + history
+    conversation_history = await _get_conversation_history(context, participants, model)
+    token_prefix_sums = conversation_history.token_prefix_sums
+    total_token_count = token_prefix_sums[-1]
 
-            else:
-                # on first time through, remove any tool messages that occur before a non-tool message
-                if token_overage == 0:
-                    for i, message in enumerate(history):
-                        if message.get("role") != "tool":
-                            history = history[i:]
-                            break
+    # the most recent messages, starting at index start, fit when total_token_count - token_prefix_sums[start] is
+    # less than the token limit
+    start = len(conversation_history.formatted_messages)
+    if token_limit:
+        start = bisect.bisect_right(token_prefix_sums, total_token_count - token_limit)
 
-                # the token limit was reached, but continue to count the token overage
-                token_overage += formatted_messages_token_count
+    history = [
+        message
+        for formatted_message_list in conversation_history.formatted_messages[start:]
+        for message in formatted_message_list
+    ]
 
-        # while loop will now check for next batch of messages
+    # when messages are left out, remove any tool messages that occur before a non-tool message
+    if start > 0:
+        for i, message in enumerate(history):
+            if message.get("role") != "tool":
+                history = history[i:]
+                break
 
     # return the formatted messages
     return GetHistoryMessagesResult(
         messages=history,
-        token_count=token_count,
-        token_overage=token_overage,
+        token_count=total_token_count - token_prefix_sums[start],
+        token_overage=token_prefix_sums[start],
     )
@@ -7,10 +7,8 @@ from typing import List, Literal, Tuple, Union
 from assistant_extensions.ai_clients.config import AzureOpenAIClientConfigModel, OpenAIClientConfigModel
 from assistant_extensions.mcp import (
     ExtendedCallToolRequestParams,
-    MCPSession,
-    retrieve_mcp_tools_from_sessions,
+    MCPToolRegistry,
 )
-from mcp_extensions import convert_tools_to_openai_tools
 from openai import AsyncOpenAI, NotGiven
 from openai.types.chat import (
     ChatCompletion,
@@ -21,7 +19,7 @@ from openai.types.chat import (
 from openai_client import AzureOpenAIServiceConfig, OpenAIRequestConfig, OpenAIServiceConfig
 from pydantic import BaseModel
 
-from ...config import AssistantConfigModel, MCPToolsConfigModel
+from ...config import AssistantConfigModel
 
 logger = logging.getLogger(__name__)
 
@@ -156,14 +154,12 @@ def split_ai_content_from_mcp_tool_call(
     return None, tool_call
 
 
-def get_openai_tools_from_mcp_sessions(
-    mcp_sessions: List[MCPSession], tools_config: MCPToolsConfigModel
-) -> List[ChatCompletionToolParam] | None:
+def create_mcp_tool_registry() -> MCPToolRegistry:
     """
-    Retrieve the tools from the MCP sessions.
+    Create a registry for the tools of the MCP sessions, converting them to OpenAI tools that ask the AI for the
+    context of each tool call.
     """
 
-    mcp_tools = retrieve_mcp_tools_from_sessions(mcp_sessions, tools_config.advanced.tools_disabled)
     extra_parameters = {
         "aiContext": {
             "type": "string",
@@ -175,5 +171,4 @@ def get_openai_tools_from_mcp_sessions(
             """).strip(),
         },
     }
-    openai_tools = convert_tools_to_openai_tools(mcp_tools, extra_parameters)
-    return openai_tools
+    return MCPToolRegistry(extra_parameters=extra_parameters)
@@ -1,7 +1,11 @@
 import asyncio
 import contextlib
+import hashlib
 import io
 import logging
+import os
+import pathlib
+import time
 from typing import Any, Awaitable, Callable, Sequence
 
 from assistant_drive import Drive, DriveConfig, IfDriveFileExistsBehavior
@@ -12,6 +16,7 @@ from semantic_workbench_api_model.workbench_model import (
     MessageType,
     NewConversationMessage,
 )
+from semantic_workbench_assistant import settings
 from semantic_workbench_assistant.assistant_app import (
     AssistantAppProtocol,
     AssistantCapability,
@@ -20,7 +25,7 @@ from semantic_workbench_assistant.assistant_app import (
 )
 
 from . import _convert as convert
-from ._model import Attachment, AttachmentsConfigModel
+from ._model import Attachment, AttachmentsConfigModel, ConvertedContent
 
 logger = logging.getLogger(__name__)
 
@@ -238,16 +243,16 @@ async def _get_attachments(
     # get all files in the conversation
     files_response = await context.get_files()
 
-    attachments = []
-    # for all files, get the attachment
-    for file in files_response.files:
-        if include_filenames is not None and file.filename not in include_filenames:
-            continue
-        if file.filename in exclude_filenames:
-            continue
+    files = [
+        file
+        for file in files_response.files
+        if (include_filenames is None or file.filename in include_filenames) and file.filename not in exclude_filenames
+    ]
 
-        attachment = await _get_attachment_for_file(context, file, {}, error_handler)
-        attachments.append(attachment)
+    # for all files, get the attachment, updating those that are out of date concurrently
+    attachments = await asyncio.gather(*(
+        _get_attachment_for_file(context, file, {}, error_handler) for file in files
+    ))
 
     # delete cached attachments that are no longer in the conversation
     filenames = {file.filename for file in files_response.files}
@@ -331,7 +336,7 @@ async def _get_attachment_for_file(
                 # read the content of the file
                 file_bytes = await _read_conversation_file(context, file)
                 # convert the content of the file to a string
-                content = await convert.bytes_to_str(file_bytes, filename=file.filename)
+                content = await _convert_file_bytes(file_bytes, filename=file.filename)
             except Exception as e:
                 await error_handler(context, file.filename, e)
                 error = f"error processing file: {e}"
@@ -350,6 +355,91 @@ async def _get_attachment_for_file(
         return attachment
 
 
+# limits of the conversion cache, which is shared by all conversations; the least recently used conversions are evicted
+# once it exceeds the size, and conversions that have not been used for the age are evicted regardless
+conversion_cache_max_bytes = 1024 * 1024 * 1024
+conversion_cache_max_age_seconds = 30 * 24 * 60 * 60
+
+
+def _conversion_cache_drive() -> Drive:
+    """
+    Get the Drive instance for converted document content, which is shared by all conversations.
+    """
+    return Drive(DriveConfig(root=pathlib.Path(settings.storage.root) / "attachment-conversions"))
+
+
+async def _convert_file_bytes(file_bytes: bytes, filename: str) -> str:
+    """
+    Convert the content of the file to a string. Document conversions are cached under the hash of the document
+    content, so that a document attached to several conversations, or re-uploaded, is converted once.
+    """
+    if not convert.converts_document(filename):
+        return await convert.bytes_to_str(file_bytes, filename=filename)
+
+    digest = hashlib.sha256(file_bytes).hexdigest()
+    # the conversion depends on the file type as well as the content
+    cache_filename = f"{digest}{pathlib.Path(filename).suffix.lower()}.json"
+    cache_dir = digest[:2]
+    drive = _conversion_cache_drive()
+
+    cached_content = await asyncio.to_thread(_read_conversion, drive, cache_filename, cache_dir)
+    if cached_content is not None:
+        return cached_content
+
+    content = await convert.bytes_to_str(file_bytes, filename=filename)
+    await asyncio.to_thread(
+        drive.write_model,
+        ConvertedContent(content=content),
+        cache_filename,
+        dir=cache_dir,
+        if_exists=IfDriveFileExistsBehavior.OVERWRITE,
+    )
+    await asyncio.to_thread(_evict_conversions, drive)
+    return content
+
+
+def _read_conversion(drive: Drive, cache_filename: str, cache_dir: str) -> str | None:
+    """
+    Read a cached conversion, or return None if the document has not been converted.
+    """
+    try:
+        content = drive.read_model(ConvertedContent, cache_filename, dir=cache_dir).content
+        # the modification time orders the conversions for eviction, so it is updated on use
+        os.utime(drive.root_path / cache_dir / cache_filename)
+    except FileNotFoundError:
+        return None
+    return content
+
+
+def _evict_conversions(drive: Drive) -> None:
+    """
+    Evict the conversions that have not been used for conversion_cache_max_age_seconds, and then the least recently
+    used conversions until the cache is within conversion_cache_max_bytes.
+    """
+    entries: list[tuple[float, int, pathlib.Path]] = []
+    for path in drive.root_path.glob("*/*.json"):
+        # another process may evict the same conversions
+        with contextlib.suppress(FileNotFoundError):
+            stat = path.stat()
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+    entries.sort()
+    expired_before = time.time() - conversion_cache_max_age_seconds
+    total_bytes = sum(size for _, size, _ in entries)
+
+    evicted = 0
+    for modified, size, path in entries:
+        if modified >= expired_before and total_bytes <= conversion_cache_max_bytes:
+            break
+        with contextlib.suppress(FileNotFoundError):
+            drive.delete(path.name, dir=path.parent.name)
+        total_bytes -= size
+        evicted += 1
+
+    if evicted:
+        logger.info("evicted attachment conversions; count: %d, remaining bytes: %d", evicted, total_bytes)
+
+
 async def _delete_attachment_for_file(context: ConversationContext, file: File) -> None:
     drive = _attachment_drive_for_context(context)
 
@@ -2,13 +2,54 @@ import asyncio
 import base64
 import io
 import logging
+import multiprocessing
+import os
 import pathlib
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable
 
 import docx2txt
 import pdfplumber
 
 logger = logging.getLogger(__name__)
 
+# the number of worker processes for converting documents; parsing PDFs and DOCX files is CPU-bound
+max_conversion_workers = min(4, os.cpu_count() or 1)
+
+_conversion_pool: ProcessPoolExecutor | None = None
+
+
+def _get_conversion_pool() -> ProcessPoolExecutor:
+    global _conversion_pool
+    if _conversion_pool is None:
+        # spawn, rather than fork, as the assistant process runs threads
+        _conversion_pool = ProcessPoolExecutor(
+            max_workers=max_conversion_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _conversion_pool
+
+
+async def _run_in_conversion_pool(func: Callable[..., str], *args: Any) -> str:
+    global _conversion_pool
+    pool = _get_conversion_pool()
+    try:
+        return await asyncio.get_running_loop().run_in_executor(pool, func, *args)
+    except BrokenProcessPool:
+        # a worker died, for example on a crash in a native parser; start a new pool for later conversions
+        if _conversion_pool is pool:
+            _conversion_pool = None
+        pool.shutdown(wait=False)
+        raise
+
+
+def converts_document(filename: str) -> bool:
+    """
+    Whether converting the file parses a document, rather than decoding text or encoding an image.
+    """
+    return pathlib.Path(filename).suffix.lower().strip(".") in ["docx", "pdf"]
+
 
 async def bytes_to_str(file_bytes: bytes, filename: str) -> str:
     """
@@ -34,13 +75,26 @@ async def bytes_to_str(file_bytes: bytes, filename: str) -> str:
             return file_bytes.decode("utf-8")
 
 
+def _docx_to_text(file_bytes: bytes) -> str:
+    with io.BytesIO(file_bytes) as temp:
+        return docx2txt.process(docx=temp)
+
+
 async def _docx_bytes_to_str(file_bytes: bytes) -> str:
     """
     Convert a DOCX file to text.
     """
+    return await _run_in_conversion_pool(_docx_to_text, file_bytes)
+
+
+def _pdf_to_text(file_bytes: bytes, max_pages: int) -> str:
+    pages = []
     with io.BytesIO(file_bytes) as temp:
-        text = await asyncio.to_thread(docx2txt.process, docx=temp)
-    return text
+        with pdfplumber.open(temp, pages=list(range(1, max_pages + 1, 1))) as pdf:
+            for page in pdf.pages:
+                page_text = page.extract_text()
+                pages.append(page_text)
+    return "\n".join(pages)
 
 
 async def _pdf_bytes_to_str(file_bytes: bytes, max_pages: int = 10) -> str:
@@ -51,17 +105,7 @@ async def _pdf_bytes_to_str(file_bytes: bytes, max_pages: int = 10) -> str:
         file_bytes: The raw content of the PDF file.
         max_pages: The maximum number of pages to read from the PDF file.
     """
-
-    def _read_pages() -> str:
-        pages = []
-        with io.BytesIO(file_bytes) as temp:
-            with pdfplumber.open(temp, pages=list(range(1, max_pages + 1, 1))) as pdf:
-                for page in pdf.pages:
-                    page_text = page.extract_text()
-                    pages.append(page_text)
-        return "\n".join(pages)
-
-    return await asyncio.to_thread(_read_pages)
+    return await _run_in_conversion_pool(_pdf_to_text, file_bytes, max_pages)
 
 
 def _image_bytes_to_str(file_bytes: bytes, file_extension: str) -> str:
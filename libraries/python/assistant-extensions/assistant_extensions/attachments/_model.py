@@ -28,6 +28,10 @@ class AttachmentsConfigModel(BaseModel):
     ] = "system"
 
 
+class ConvertedContent(BaseModel):
+    content: str
+
+
 class Attachment(BaseModel):
     filename: str
     content: str = ""
@@ -1,5 +1,9 @@
+import asyncio
 import base64
 import datetime
+import logging
+import os
+import time
 import uuid
 from contextlib import asynccontextmanager
 from typing import Any, AsyncGenerator, AsyncIterator, Callable
@@ -13,9 +17,13 @@ from llm_client.model import (
 )
 from openai.types.chat import ChatCompletionMessageParam
 from semantic_workbench_api_model.workbench_model import File, FileList, ParticipantRole
+from semantic_workbench_assistant import settings
 from semantic_workbench_assistant.assistant_app import AssistantAppProtocol, AssistantContext, ConversationContext
 
-from assistant_extensions.attachments import AttachmentsConfigModel, AttachmentsExtension
+from assistant_extensions.attachments import AttachmentsConfigModel, AttachmentsExtension, _attachments
+from assistant_extensions.attachments import _convert as convert
+
+logger = logging.getLogger(__name__)
 
 
 @pytest.mark.parametrize(
@@ -159,3 +167,169 @@ async def test_get_completion_messages_for_attachments(
     )
 
     assert actual_messages == expected_messages
+
+
+async def test_convert_file_bytes_caches_documents_by_content(monkeypatch: pytest.MonkeyPatch, tmp_path) -> None:
+    monkeypatch.setattr(settings.storage, "root", str(tmp_path))
+
+    conversions: list[str] = []
+
+    async def bytes_to_str(file_bytes: bytes, filename: str) -> str:
+        conversions.append(filename)
+        return f"{len(file_bytes)} bytes"
+
+    monkeypatch.setattr(convert, "bytes_to_str", bytes_to_str)
+
+    assert await _attachments._convert_file_bytes(b"document", filename="a.pdf") == "8 bytes"
+    # the same content, under another name, as in another conversation, is not converted again
+    assert await _attachments._convert_file_bytes(b"document", filename="b.pdf") == "8 bytes"
+    assert conversions == ["a.pdf"]
+
+    # other content, or the same content as another file type, is converted
+    assert await _attachments._convert_file_bytes(b"document", filename="a.docx") == "8 bytes"
+    assert await _attachments._convert_file_bytes(b"other document", filename="a.pdf") == "14 bytes"
+    assert conversions == ["a.pdf", "a.docx", "a.pdf"]
+
+    # text is not cached
+    assert await _attachments._convert_file_bytes(b"text", filename="a.txt") == "4 bytes"
+    assert await _attachments._convert_file_bytes(b"text", filename="a.txt") == "4 bytes"
+    assert conversions == ["a.pdf", "a.docx", "a.pdf", "a.txt", "a.txt"]
+
+
+async def test_convert_file_bytes_evicts_conversions(monkeypatch: pytest.MonkeyPatch, tmp_path) -> None:
+    monkeypatch.setattr(settings.storage, "root", str(tmp_path))
+
+    async def bytes_to_str(file_bytes: bytes, filename: str) -> str:
+        return file_bytes.decode() * 100
+
+    monkeypatch.setattr(convert, "bytes_to_str", bytes_to_str)
+
+    drive = _attachments._conversion_cache_drive()
+
+    def cached_contents() -> list[str]:
+        return sorted(path.read_text() for path in drive.root_path.glob("*/*.json"))
+
+    def set_last_used(document: str, seconds_ago: float) -> None:
+        (path,) = [path for path in drive.root_path.glob("*/*.json") if document * 100 in path.read_text()]
+        last_used = time.time() - seconds_ago
+        os.utime(path, (last_used, last_used))
+
+    for document in [b"a", b"b", b"c"]:
+        await _attachments._convert_file_bytes(document, filename="document.pdf")
+    assert len(cached_contents()) == 3
+
+    # conversions unused for longer than the maximum age are evicted
+    set_last_used("a", _attachments.conversion_cache_max_age_seconds + 60)
+    set_last_used("b", 120)
+    set_last_used("c", 60)
+    await _attachments._convert_file_bytes(b"d", filename="document.pdf")
+    contents = cached_contents()
+    assert len(contents) == 3
+    assert not any("a" * 100 in content for content in contents)
+
+    # reading a conversion makes it the most recently used
+    await _attachments._convert_file_bytes(b"b", filename="document.pdf")
+
+    # beyond the maximum size, the least recently used conversions are evicted
+    entry_size = next(drive.root_path.glob("*/*.json")).stat().st_size
+    monkeypatch.setattr(_attachments, "conversion_cache_max_bytes", entry_size * 2)
+    await _attachments._convert_file_bytes(b"e", filename="document.pdf")
+    contents = cached_contents()
+    assert len(contents) == 2
+    assert any("b" * 100 in content for content in contents)
+    assert any("e" * 100 in content for content in contents)
+
+
+def _pdf(document: int, page_count: int) -> bytes:
+    """
+    Builds a PDF with a page of text for each page.
+    """
+    objects: list[bytes] = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"",
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    page_ids: list[int] = []
+    for page in range(page_count):
+        lines = "".join(
+            f"(Document {document}, page {page + 1}, line {line + 1} of the attachment benchmark corpus.) Tj T* "
+            for line in range(50)
+        )
+        stream = f"BT /F1 10 Tf 14 TL 50 750 Td {lines}ET".encode()
+        objects.append(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream))
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Resources << /Font << /F1 3 0 R >> >>"
+            b" /Contents %d 0 R >>" % len(objects)
+        )
+        page_ids.append(len(objects))
+
+    kids = " ".join(f"{page_id} 0 R" for page_id in page_ids)
+    objects[1] = f"<< /Type /Pages /Kids [{kids}] /Count {page_count} >>".encode()
+
+    pdf = bytearray(b"%PDF-1.4\n")
+    offsets: list[int] = []
+    for object_id, obj in enumerate(objects, start=1):
+        offsets.append(len(pdf))
+        pdf += b"%d 0 obj\n%s\nendobj\n" % (object_id, obj)
+
+    xref_offset = len(pdf)
+    pdf += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    for offset in offsets:
+        pdf += b"%010d 00000 n \n" % offset
+    pdf += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref_offset)
+    return bytes(pdf)
+
+
+async def test_convert_pdf_benchmark(monkeypatch: pytest.MonkeyPatch, tmp_path) -> None:
+    """
+    Compares converting a corpus of 200-page PDFs one at a time in a thread, as attachments were converted, with
+    converting them concurrently in the conversion process pool, and with converting them again from the cache. As
+    in attachments, only the first max_pages pages of each PDF are converted.
+    """
+    if not os.environ.get("ATTACHMENTS_BENCHMARK"):
+        pytest.skip("ATTACHMENTS_BENCHMARK is not set.")
+
+    monkeypatch.setattr(settings.storage, "root", str(tmp_path))
+
+    page_count = 200
+    # the pages that attachments convert, the default of _pdf_bytes_to_str
+    max_pages = 10
+    corpus = [_pdf(document, page_count=page_count) for document in range(8)]
+
+    start = time.perf_counter()
+    serial_contents = [await asyncio.to_thread(convert._pdf_to_text, pdf, max_pages) for pdf in corpus]
+    serial_seconds = time.perf_counter() - start
+
+    # start the worker processes outside of the measurement
+    await convert.bytes_to_str(_pdf(document=-1, page_count=1), filename="warmup.pdf")
+
+    start = time.perf_counter()
+    pooled_contents = await asyncio.gather(*(
+        _attachments._convert_file_bytes(pdf, filename=f"document_{index}.pdf") for index, pdf in enumerate(corpus)
+    ))
+    pooled_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    cached_contents = await asyncio.gather(*(
+        _attachments._convert_file_bytes(pdf, filename=f"copy_of_document_{index}.pdf")
+        for index, pdf in enumerate(corpus)
+    ))
+    cached_seconds = time.perf_counter() - start
+
+    logger.info(
+        "convert the first %d pages of %d %d-page PDFs; serial: %.1fms, process pool (%d workers): %.1fms,"
+        " cached: %.1fms",
+        max_pages,
+        len(corpus),
+        page_count,
+        serial_seconds * 1000,
+        convert.max_conversion_workers,
+        pooled_seconds * 1000,
+        cached_seconds * 1000,
+    )
+
+    assert "Document 0, page 1, line 1 of the attachment benchmark corpus." in serial_contents[0]
+    assert pooled_contents == serial_contents
+    assert cached_contents == serial_contents
+    assert f"Document 0, page {max_pages}, line 1 " in serial_contents[0]
+    assert f"Document 0, page {max_pages + 1}, line 1 " not in serial_contents[0]
@@ -20,6 +20,8 @@ from ._server_utils import (
     get_mcp_server_prompts,
     refresh_mcp_sessions,
 )
+from ._session_pool import MCPSessionPool
+from ._tool_registry import MCPToolRegistry
 from ._tool_utils import handle_mcp_tool_call, retrieve_mcp_tools_from_sessions
 
 __all__ = [
@@ -33,6 +35,8 @@ __all__ = [
     "MCPSession",
     "MCPServerConnectionError",
     "MCPServerEnvConfig",
+    "MCPSessionPool",
+    "MCPToolRegistry",
     "OpenAISamplingHandler",
     "establish_mcp_sessions",
     "get_mcp_server_prompts",
@@ -7,6 +7,7 @@ from mcp.types import (
     CallToolRequestParams,
     CallToolResult,
 )
+from mcp_extensions import ServerNotificationHandler
 from pydantic import BaseModel, Field
 from semantic_workbench_assistant.config import UISchema
 
@@ -139,7 +140,13 @@ class MCPSession:
     config: MCPServerConfig
     client_session: ClientSession
     tools: List[Tool] = []
+    # set when the server notifies that its tools have changed
+    tools_stale: bool = False
     is_connected: bool = True
+    # set for the sessions of an MCPSessionPool, which reads their incoming messages for as long as they are connected
+    pooled: bool = False
+    # the pool passes the notifications of the server to this handler, which is set for the duration of a tool call
+    notification_handler: ServerNotificationHandler | None = None
 
     def __init__(self, config: MCPServerConfig, client_session: ClientSession) -> None:
         self.config = config
@@ -149,6 +156,7 @@ class MCPSession:
         # Load all tools from the session, later we can do the same for resources, prompts, etc.
         tools_result = await self.client_session.list_tools()
         self.tools = tools_result.tools
+        self.tools_stale = False
         self.is_connected = True
         logger.debug(f"Loaded {len(tools_result.tools)} tools from session '{self.config.key}'")
 
@@ -0,0 +1,226 @@
+import asyncio
+import logging
+import time
+from typing import Any
+
+from mcp import ClientSession, types
+from mcp.shared.context import RequestContext
+
+from ._model import MCPSamplingMessageHandler, MCPServerConfig, MCPSession
+from ._server_utils import MCPServerConnectionError, connect_to_mcp_server
+
+logger = logging.getLogger(__name__)
+
+
+class _PooledSession:
+    def __init__(self, config: MCPServerConfig) -> None:
+        self.config = config
+        self.ready: asyncio.Future[MCPSession] = asyncio.get_running_loop().create_future()
+        self.stop = asyncio.Event()
+        self.task: asyncio.Task | None = None
+        self.last_checked = 0.0
+
+
+class MCPSessionPool:
+    """
+    Keeps MCP sessions connected across turns, so that servers are not started, initialized and listed on every
+    turn. Servers are connected in parallel. Sessions that fail a health check, or whose server configuration
+    changes, are reconnected. Tool listings are kept until the server notifies that its tools have changed.
+
+    The connection of each session is owned by a task of the pool, as the MCP transports must be exited from the
+    task that entered them. The task also reads the incoming messages of the session, which are not buffered, so
+    that notifications sent between tool calls do not block the session.
+
+    Sampling requests of the servers are handled by the sampling handler of the latest get_sessions call, so a pool
+    serves a single conversation. Call close when the conversation, or the assistant, is deleted, and on shutdown,
+    to stop the servers.
+    """
+
+    def __init__(self, health_check_interval: float = 30.0, health_check_timeout: float = 5.0) -> None:
+        self._sessions: dict[str, _PooledSession] = {}
+        self._lock = asyncio.Lock()
+        self._health_check_interval = health_check_interval
+        self._health_check_timeout = health_check_timeout
+        self._sampling_handler: MCPSamplingMessageHandler | None = None
+
+    async def get_sessions(
+        self,
+        mcp_server_configs: list[MCPServerConfig],
+        sampling_handler: MCPSamplingMessageHandler | None = None,
+    ) -> list[MCPSession]:
+        """
+        Returns connected sessions for the enabled servers, connecting, in parallel, those that are not connected.
+        Raises MCPServerConnectionError if a server cannot be connected.
+        """
+        if sampling_handler is not None:
+            # the sessions outlive the turn, so they sample through the handler of the latest turn
+            self._sampling_handler = sampling_handler
+
+        server_configs = [server_config for server_config in mcp_server_configs if server_config.enabled]
+        server_configs_by_key = {server_config.key: server_config for server_config in server_configs}
+
+        async with self._lock:
+            for key, pooled in list(self._sessions.items()):
+                if server_configs_by_key.get(key) != pooled.config:
+                    logger.debug("closing MCP session for removed or changed server: %s", key)
+                    await self._close(self._sessions.pop(key))
+
+            results = await asyncio.gather(
+                *(self._get_session(server_config) for server_config in server_configs),
+                return_exceptions=True,
+            )
+
+        mcp_sessions: list[MCPSession] = []
+        for server_config, result in zip(server_configs, results):
+            if isinstance(result, Exception):
+                raise MCPServerConnectionError(server_config, result) from result
+            if isinstance(result, BaseException):
+                # cancellation, or an interrupt, rather than a failure to connect
+                raise result
+            mcp_sessions.append(result)
+
+        return mcp_sessions
+
+    async def close(self) -> None:
+        async with self._lock:
+            sessions = list(self._sessions.values())
+            self._sessions.clear()
+            await asyncio.gather(*(self._close(pooled) for pooled in sessions))
+
+    async def _get_session(self, server_config: MCPServerConfig) -> MCPSession:
+        pooled = self._sessions.get(server_config.key)
+        if pooled is not None and not await self._is_healthy(pooled):
+            logger.info("MCP session is not healthy; reconnecting: %s", server_config.key)
+            await self._close(self._sessions.pop(server_config.key))
+            pooled = None
+
+        if pooled is None:
+            pooled = _PooledSession(server_config)
+            pooled.task = asyncio.create_task(self._run(pooled), name=f"mcp_session_{server_config.key}")
+            self._sessions[server_config.key] = pooled
+
+        try:
+            # the connection belongs to the pool, so a cancelled caller must not cancel it
+            mcp_session = await asyncio.shield(pooled.ready)
+        except Exception:
+            logger.exception("failed to connect to MCP server: %s", server_config.key)
+            self._sessions.pop(server_config.key, None)
+            raise
+
+        if mcp_session.tools_stale:
+            logger.debug("reloading tools for MCP server: %s", server_config.key)
+            await mcp_session.initialize()
+
+        return mcp_session
+
+    async def _is_healthy(self, pooled: _PooledSession) -> bool:
+        if not pooled.ready.done():
+            # still connecting
+            return True
+
+        if pooled.task is None or pooled.task.done():
+            return False
+
+        mcp_session = pooled.ready.result()
+        if not mcp_session.is_connected:
+            return False
+
+        if time.monotonic() - pooled.last_checked < self._health_check_interval:
+            return True
+
+        try:
+            await asyncio.wait_for(mcp_session.client_session.send_ping(), timeout=self._health_check_timeout)
+        except Exception:
+            logger.warning("MCP server did not respond to ping: %s", pooled.config.key, exc_info=True)
+            return False
+
+        pooled.last_checked = time.monotonic()
+        return True
+
+    async def _run(self, pooled: _PooledSession) -> None:
+        try:
+            async with connect_to_mcp_server(pooled.config, sampling_callback=self._sample) as client_session:
+                mcp_session = MCPSession(config=pooled.config, client_session=client_session)
+                mcp_session.pooled = True
+
+                receive_task = asyncio.create_task(
+                    self._receive(pooled, mcp_session), name=f"mcp_session_receive_{pooled.config.key}"
+                )
+                try:
+                    await mcp_session.initialize()
+                    pooled.last_checked = time.monotonic()
+                    pooled.ready.set_result(mcp_session)
+
+                    await pooled.stop.wait()
+                finally:
+                    receive_task.cancel()
+                    await asyncio.gather(receive_task, return_exceptions=True)
+
+        except Exception as e:
+            if not pooled.ready.done():
+                pooled.ready.set_exception(e)
+                return
+            logger.exception("MCP session ended with an error: %s", pooled.config.key)
+
+        finally:
+            if not pooled.ready.done():
+                pooled.ready.cancel()
+            elif not pooled.ready.cancelled() and pooled.ready.exception() is None:
+                pooled.ready.result().is_connected = False
+
+    async def _receive(self, pooled: _PooledSession, mcp_session: MCPSession) -> None:
+        """
+        Read the incoming messages of the session until it is closed. Notifications are passed to the notification
+        handler of the tool call in progress, if any.
+        """
+        async for message in mcp_session.client_session.incoming_messages:
+            if isinstance(message, Exception):
+                logger.warning("error received from MCP server: %s", pooled.config.key, exc_info=message)
+                continue
+
+            if not isinstance(message, types.ServerNotification):
+                # requests the client session does not respond to itself
+                logger.warning("unhandled request from MCP server: %s; request: %s", pooled.config.key, message)
+                continue
+
+            if message.root.method == "notifications/tools/list_changed":
+                # the tools are reloaded before the session is next handed out
+                mcp_session.tools_stale = True
+
+            notification_handler = mcp_session.notification_handler
+            if notification_handler is None:
+                logger.debug(
+                    "notification from MCP server outside of a tool call: %s; method: %s",
+                    pooled.config.key,
+                    message.root.method,
+                )
+                continue
+
+            try:
+                await notification_handler(message)
+            except Exception:
+                logger.exception("error handling notification from MCP server: %s", pooled.config.key)
+
+        # the server closed the session
+        mcp_session.is_connected = False
+        pooled.stop.set()
+
+    async def _close(self, pooled: _PooledSession) -> None:
+        pooled.stop.set()
+        if pooled.task is None:
+            return
+
+        if not pooled.ready.done():
+            pooled.task.cancel()
+
+        await asyncio.gather(pooled.task, return_exceptions=True)
+
+    async def _sample(
+        self,
+        context: RequestContext[ClientSession, Any],
+        params: types.CreateMessageRequestParams,
+    ) -> types.CreateMessageResult | types.ErrorData:
+        if self._sampling_handler is None:
+            return types.ErrorData(code=types.INVALID_REQUEST, message="Sampling is not available")
+
+        return await self._sampling_handler(context, params)
@@ -0,0 +1,92 @@
+import logging
+from typing import Any, List
+
+from mcp import Tool
+from mcp_extensions import convert_tools_to_openai_tools
+from openai.types.chat import ChatCompletionToolParam
+from openai_client import num_tokens_from_tools
+
+from ._model import MCPSession
+from ._tool_utils import retrieve_mcp_tools_from_sessions
+
+logger = logging.getLogger(__name__)
+
+
+class MCPToolRegistry:
+    """
+    Indexes the tools of a set of MCP sessions by name, and caches their OpenAI tool schemas and the token count of
+    the schemas. Call update with the current sessions before each use; the index and caches are rebuilt only when
+    the sessions, their tool listings, or the excluded tools change.
+    """
+
+    def __init__(self, extra_parameters: dict[str, Any] | None = None) -> None:
+        self._extra_parameters = extra_parameters
+        self._mcp_sessions: list[MCPSession] = []
+        # the tool listing of each session when indexed; sessions replace the listing when they reload their tools
+        self._session_tools: list[list[Tool]] = []
+        self._exclude_tools: list[str] = []
+        self._tools: list[Tool] = []
+        self._tools_by_name: dict[str, tuple[MCPSession, Tool]] = {}
+        self._openai_tools: list[ChatCompletionToolParam] | None = None
+        self._openai_tools_converted = False
+        self._token_counts: dict[str, int] = {}
+
+    def _is_current(self, mcp_sessions: List[MCPSession], exclude_tools: list[str]) -> bool:
+        return (
+            len(mcp_sessions) == len(self._mcp_sessions)
+            and all(
+                mcp_session is indexed_session and mcp_session.tools is indexed_tools
+                for mcp_session, indexed_session, indexed_tools in zip(
+                    mcp_sessions, self._mcp_sessions, self._session_tools
+                )
+            )
+            and exclude_tools == self._exclude_tools
+        )
+
+    def update(self, mcp_sessions: List[MCPSession], exclude_tools: list[str] | None = None) -> None:
+        exclude_tools = list(exclude_tools or [])
+        if self._is_current(mcp_sessions, exclude_tools):
+            return
+
+        self._mcp_sessions = list(mcp_sessions)
+        self._session_tools = [mcp_session.tools for mcp_session in mcp_sessions]
+        self._exclude_tools = exclude_tools
+
+        self._tools = retrieve_mcp_tools_from_sessions(mcp_sessions, exclude_tools)
+        tool_names = {tool.name for tool in self._tools}
+        self._tools_by_name = {}
+        for mcp_session in mcp_sessions:
+            for tool in mcp_session.tools:
+                # first tool wins, as in retrieve_mcp_tools_from_sessions
+                if tool.name in tool_names and tool.name not in self._tools_by_name:
+                    self._tools_by_name[tool.name] = (mcp_session, tool)
+
+        self._openai_tools = None
+        self._openai_tools_converted = False
+        self._token_counts = {}
+        logger.debug("indexed %d tools from %d MCP sessions", len(self._tools), len(mcp_sessions))
+
+    @property
+    def tools(self) -> list[Tool]:
+        return self._tools
+
+    def get(self, tool_name: str) -> tuple[MCPSession | None, Tool | None]:
+        """
+        Retrieve the MCP session and tool by tool name.
+        """
+        return self._tools_by_name.get(tool_name, (None, None))
+
+    @property
+    def openai_tools(self) -> list[ChatCompletionToolParam] | None:
+        if not self._openai_tools_converted:
+            self._openai_tools = convert_tools_to_openai_tools(self._tools, self._extra_parameters)
+            self._openai_tools_converted = True
+        return self._openai_tools
+
+    def openai_tools_token_count(self, model: str) -> int:
+        """
+        The number of tokens the OpenAI tool schemas add to a request for the model.
+        """
+        if model not in self._token_counts:
+            self._token_counts[model] = num_tokens_from_tools(tools=self.openai_tools or [], model=model)
+        return self._token_counts[model]
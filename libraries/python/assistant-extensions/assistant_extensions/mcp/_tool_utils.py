@@ -2,12 +2,12 @@
 import asyncio
 import logging
 from textwrap import dedent
-from typing import AsyncGenerator, List
+from typing import TYPE_CHECKING, AsyncGenerator, List
 
 import deepmerge
 from mcp import ServerNotification, Tool
 from mcp.types import CallToolResult, EmbeddedResource, ImageContent, TextContent
-from mcp_extensions import execute_tool_with_retries
+from mcp_extensions import ServerNotificationHandler, ToolCallFunction, execute_tool_with_retries
 
 from ._model import (
     ExtendedCallToolRequestParams,
@@ -17,6 +17,9 @@ from ._model import (
 )
 from ._openai_utils import OpenAISamplingHandler
 
+if TYPE_CHECKING:
+    from ._tool_registry import MCPToolRegistry
+
 logger = logging.getLogger(__name__)
 
 
@@ -65,9 +68,13 @@ async def handle_mcp_tool_call(
     tool_call: ExtendedCallToolRequestParams,
     method_metadata_key: str,
     on_logging_message: MCPLoggingMessageHandler,
+    tool_registry: "MCPToolRegistry | None" = None,
 ) -> ExtendedCallToolResult:
-    # Find the tool and session by tool name.
-    mcp_session, tool = get_mcp_session_and_tool_by_tool_name(mcp_sessions, tool_call.name)
+    # Find the tool and session by tool name, through the registry's index when there is one.
+    if tool_registry is not None:
+        mcp_session, tool = tool_registry.get(tool_call.name)
+    else:
+        mcp_session, tool = get_mcp_session_and_tool_by_tool_name(mcp_sessions, tool_call.name)
 
     if not mcp_session or not tool:
         return ExtendedCallToolResult(
@@ -154,15 +161,21 @@ async def execute_tool(
     async def notification_handler(message: ServerNotification) -> None:
         if message.root.method == "notifications/message":
             await on_logging_message(message.root.params.data)
+        elif message.root.method == "notifications/tools/list_changed":
+            # the tools are reloaded before the session is next handed out by a session pool
+            mcp_session.tools_stale = True
         else:
             logger.warning(f"Received unknown notification: {message}")
 
     logger.debug(f"Invoking '{mcp_session.config.key}.{tool_call.name}' with arguments: {tool_call.arguments}")
 
     try:
-        tool_result = await execute_tool_with_retries(
-            mcp_session, tool_call_function, notification_handler, tool_call.name
-        )
+        if mcp_session.pooled:
+            tool_result = await execute_pooled_tool(mcp_session, tool_call_function, notification_handler)
+        else:
+            tool_result = await execute_tool_with_retries(
+                mcp_session, tool_call_function, notification_handler, tool_call.name
+            )
     except asyncio.CancelledError:
         raise
     except Exception as e:
@@ -217,3 +230,20 @@ async def execute_tool(
         ],
         metadata=metadata,
     )
+
+
+async def execute_pooled_tool(
+    mcp_session: MCPSession,
+    tool_call_function: ToolCallFunction,
+    notification_handler: ServerNotificationHandler,
+) -> CallToolResult:
+    """
+    Execute a tool call on a session of an MCPSessionPool. The pool reads the incoming messages of the session, and
+    passes the notifications of the server to the handler while the call is in progress. A session that fails is
+    reconnected by the pool, rather than retried here.
+    """
+    mcp_session.notification_handler = notification_handler
+    try:
+        return await tool_call_function()
+    finally:
+        mcp_session.notification_handler = None
@@ -0,0 +1,180 @@
+import asyncio
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator
+
+import anyio
+import pytest
+from mcp import types
+
+from assistant_extensions.mcp import MCPServerConfig, MCPServerConnectionError, MCPSessionPool
+from assistant_extensions.mcp import _session_pool as session_pool
+from assistant_extensions.mcp._tool_utils import execute_pooled_tool
+
+
+class FakeClientSession:
+    def __init__(self, server_config: MCPServerConfig) -> None:
+        self.server_config = server_config
+        self.tools = [types.Tool(name=f"{server_config.key}_tool", inputSchema={"type": "object"})]
+        self.list_tools_calls = 0
+        self.ping_error: Exception | None = None
+        # as in the MCP client session, incoming messages are not buffered
+        self.send_incoming, self.incoming_messages = anyio.create_memory_object_stream[Any](0)
+
+    async def list_tools(self) -> types.ListToolsResult:
+        self.list_tools_calls += 1
+        return types.ListToolsResult(tools=self.tools)
+
+    async def send_ping(self) -> types.EmptyResult:
+        if self.ping_error is not None:
+            raise self.ping_error
+        return types.EmptyResult()
+
+    async def notify(self, notification: types.ServerNotification) -> None:
+        await asyncio.wait_for(self.send_incoming.send(notification), timeout=1)
+
+
+class FakeServers:
+    def __init__(self) -> None:
+        self.client_sessions: list[FakeClientSession] = []
+        self.closed: list[FakeClientSession] = []
+
+    def latest(self, key: str) -> FakeClientSession:
+        return [client_session for client_session in self.client_sessions if client_session.server_config.key == key][
+            -1
+        ]
+
+
+@pytest.fixture
+def servers(monkeypatch: pytest.MonkeyPatch) -> FakeServers:
+    servers = FakeServers()
+
+    @asynccontextmanager
+    async def connect_to_mcp_server(server_config: MCPServerConfig, sampling_callback: Any = None) -> AsyncIterator:
+        if server_config.command == "unreachable":
+            raise ConnectionError("connection refused")
+
+        client_session = FakeClientSession(server_config)
+        servers.client_sessions.append(client_session)
+        try:
+            yield client_session
+        finally:
+            servers.closed.append(client_session)
+
+    monkeypatch.setattr(session_pool, "connect_to_mcp_server", connect_to_mcp_server)
+    return servers
+
+
+def _tools_list_changed() -> types.ServerNotification:
+    return types.ServerNotification(types.ToolListChangedNotification(method="notifications/tools/list_changed"))
+
+
+def _logging_message(data: str) -> types.ServerNotification:
+    return types.ServerNotification(
+        types.LoggingMessageNotification(
+            method="notifications/message", params=types.LoggingMessageNotificationParams(level="info", data=data)
+        )
+    )
+
+
+async def test_session_pool_keeps_sessions_connected(servers: FakeServers) -> None:
+    files = MCPServerConfig(key="files", command="files")
+    shell = MCPServerConfig(key="shell", command="shell")
+
+    pool = MCPSessionPool()
+    try:
+        sessions = await pool.get_sessions([files, shell, MCPServerConfig(key="off", command="off", enabled=False)])
+        assert [session.config.key for session in sessions] == ["files", "shell"]
+        assert all(session.pooled for session in sessions)
+
+        # the same sessions are handed out on the next turn
+        assert await pool.get_sessions([files, shell]) == sessions
+        assert len(servers.client_sessions) == 2
+
+        # a server whose configuration changed is reconnected, and a removed server is closed
+        changed_files = files.model_copy(update={"args": ["--verbose"]})
+        reconnected = await pool.get_sessions([changed_files])
+        assert reconnected[0] is not sessions[0]
+        assert servers.closed == servers.client_sessions[:2]
+    finally:
+        await pool.close()
+
+    assert servers.closed == servers.client_sessions
+
+
+async def test_session_pool_reconnects_unhealthy_sessions(servers: FakeServers) -> None:
+    files = MCPServerConfig(key="files", command="files")
+
+    pool = MCPSessionPool(health_check_interval=0)
+    try:
+        (session,) = await pool.get_sessions([files])
+
+        servers.latest("files").ping_error = TimeoutError()
+        (reconnected,) = await pool.get_sessions([files])
+        assert reconnected is not session
+
+        # as is a session that the server closed
+        servers.latest("files").send_incoming.close()
+        await asyncio.sleep(0.01)
+        assert not reconnected.is_connected
+        (reconnected_again,) = await pool.get_sessions([files])
+        assert reconnected_again is not reconnected
+        assert len(servers.client_sessions) == 3
+    finally:
+        await pool.close()
+
+
+async def test_session_pool_reads_notifications(servers: FakeServers) -> None:
+    files = MCPServerConfig(key="files", command="files")
+
+    pool = MCPSessionPool()
+    try:
+        (session,) = await pool.get_sessions([files])
+        client_session = servers.latest("files")
+        assert client_session.list_tools_calls == 1
+
+        # notifications sent between tool calls do not block the session
+        await client_session.notify(_logging_message("idle"))
+        await client_session.notify(_tools_list_changed())
+        await asyncio.sleep(0.01)
+        assert session.tools_stale
+
+        # changed tools are listed again before the session is handed out
+        client_session.tools = [*client_session.tools, types.Tool(name="new_tool", inputSchema={"type": "object"})]
+        (session,) = await pool.get_sessions([files])
+        assert client_session.list_tools_calls == 2
+        assert not session.tools_stale
+        assert [tool.name for tool in session.tools] == ["files_tool", "new_tool"]
+
+        # notifications sent during a tool call are passed to the handler of the call
+        received: list[types.ServerNotification] = []
+
+        async def notification_handler(notification: types.ServerNotification) -> None:
+            received.append(notification)
+
+        async def tool_call_function() -> types.CallToolResult:
+            await client_session.notify(_logging_message("working"))
+            return types.CallToolResult(content=[])
+
+        await execute_pooled_tool(session, tool_call_function, notification_handler)
+        assert received == [_logging_message("working")]
+        assert session.notification_handler is None
+    finally:
+        await pool.close()
+
+
+async def test_session_pool_connection_errors(servers: FakeServers) -> None:
+    files = MCPServerConfig(key="files", command="files")
+    unreachable = MCPServerConfig(key="unreachable", command="unreachable")
+
+    pool = MCPSessionPool()
+    try:
+        with pytest.raises(MCPServerConnectionError) as e:
+            await pool.get_sessions([files, unreachable])
+        assert e.value.server_config == unreachable
+        assert isinstance(e.value.error, ConnectionError)
+
+        # the servers that did connect are kept
+        await pool.get_sessions([files])
+        assert len(servers.client_sessions) == 1
+    finally:
+        await pool.close()
@@ -0,0 +1,83 @@
+from unittest import mock
+
+import pytest
+from mcp import Tool
+
+from assistant_extensions.mcp import MCPServerConfig, MCPSession, MCPToolRegistry
+from assistant_extensions.mcp import _tool_registry as tool_registry
+
+
+def _tool(name: str) -> Tool:
+    return Tool(name=name, description=f"the {name} tool", inputSchema={"type": "object", "properties": {}})
+
+
+def _session(key: str, tools: list[Tool]) -> MCPSession:
+    mcp_session = MCPSession(config=MCPServerConfig(key=key, command=key), client_session=mock.AsyncMock())
+    mcp_session.tools = tools
+    return mcp_session
+
+
+@pytest.fixture
+def conversions(monkeypatch: pytest.MonkeyPatch) -> list[list[str]]:
+    conversions: list[list[str]] = []
+
+    def convert_tools_to_openai_tools(tools: list[Tool], extra_parameters: dict | None = None) -> list:
+        conversions.append([tool.name for tool in tools])
+        return [{"type": "function", "function": {"name": tool.name}} for tool in tools]
+
+    monkeypatch.setattr(tool_registry, "convert_tools_to_openai_tools", convert_tools_to_openai_tools)
+    monkeypatch.setattr(tool_registry, "num_tokens_from_tools", lambda tools, model: len(tools))
+    return conversions
+
+
+def test_tool_registry_indexes_tools(conversions: list[list[str]]) -> None:
+    files = _session("files", [_tool("read"), _tool("write")])
+    shell = _session("shell", [_tool("run"), _tool("read")])
+
+    registry = MCPToolRegistry()
+    registry.update([files, shell])
+
+    assert [tool.name for tool in registry.tools] == ["read", "write", "run"]
+    # the first session with a tool name wins
+    assert registry.get("read") == (files, files.tools[0])
+    assert registry.get("run") == (shell, shell.tools[0])
+    assert registry.get("missing") == (None, None)
+
+    registry.update([files, shell], exclude_tools=["write"])
+    assert [tool.name for tool in registry.tools] == ["read", "run"]
+    assert registry.get("write") == (None, None)
+
+
+def test_tool_registry_caches_until_sessions_or_tools_change(conversions: list[list[str]]) -> None:
+    files = _session("files", [_tool("read")])
+    shell = _session("shell", [_tool("run")])
+
+    registry = MCPToolRegistry()
+    registry.update([files, shell])
+    openai_tools = registry.openai_tools
+    assert registry.openai_tools_token_count("gpt-4o") == 2
+
+    # the same sessions, with the same tool listings, are not indexed or converted again
+    registry.update([files, shell])
+    registry.update([files, shell], exclude_tools=[])
+    assert registry.openai_tools is openai_tools
+    assert conversions == [["read", "run"]]
+
+    # a session that reloaded its tools replaces its listing
+    shell.tools = [_tool("run"), _tool("kill")]
+    registry.update([files, shell])
+    assert registry.openai_tools_token_count("gpt-4o") == 3
+    assert conversions == [["read", "run"], ["read", "run", "kill"]]
+
+    # as does a reconnected session, even with equal tools
+    reconnected_files = _session("files", files.tools)
+    registry.update([reconnected_files, shell])
+    assert registry.openai_tools is not None
+    assert registry.get("read") == (reconnected_files, files.tools[0])
+    assert len(conversions) == 3
+
+    # and a change in the excluded tools
+    registry.update([reconnected_files, shell], exclude_tools=["kill"])
+    assert registry.openai_tools_token_count("gpt-4o") == 2
+    assert conversions[-1] == ["read", "run"]
+    assert len(conversions) == 4
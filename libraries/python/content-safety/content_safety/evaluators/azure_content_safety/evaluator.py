@@ -1,10 +1,11 @@
 # Copyright (c) Microsoft. All rights reserved.
 
 import asyncio
+import hashlib
 import logging
 from typing import Any
 
-from azure.ai.contentsafety import ContentSafetyClient
+from azure.ai.contentsafety.aio import ContentSafetyClient
 from azure.ai.contentsafety.models import AnalyzeTextOptions
 from semantic_workbench_assistant.assistant_app import (
     ContentSafetyEvaluation,
@@ -12,7 +13,7 @@ from semantic_workbench_assistant.assistant_app import (
     ContentSafetyEvaluator,
 )
 
-from .config import AzureContentSafetyEvaluatorConfig
+from .config import AzureContentSafetyEvaluatorConfig, AzureServiceKeyAuthConfig
 
 logger = logging.getLogger(__name__)
 
@@ -31,6 +32,23 @@ logger = logging.getLogger(__name__)
 # region Evaluator Implementation
 #
 
+# clients are shared by evaluators with the same endpoint and credentials, so that connections are reused
+_clients: dict[tuple[str, str], ContentSafetyClient] = {}
+
+
+def _get_client(config: AzureContentSafetyEvaluatorConfig) -> ContentSafetyClient:
+    credential_key = config.auth_config.auth_method
+    if isinstance(config.auth_config, AzureServiceKeyAuthConfig):
+        credential_key += hashlib.sha256(config.auth_config.azure_service_api_key.encode("utf-8")).hexdigest()
+
+    client_key = (str(config.azure_content_safety_endpoint), credential_key)
+    if client_key not in _clients:
+        _clients[client_key] = ContentSafetyClient(
+            endpoint=str(config.azure_content_safety_endpoint),
+            credential=config._get_azure_credentials(),
+        )
+    return _clients[client_key]
+
 
 class AzureContentSafetyEvaluator(ContentSafetyEvaluator):
     """
@@ -102,10 +120,7 @@ class AzureContentSafetyEvaluator(ContentSafetyEvaluator):
 
         # send the text to the Azure Content Safety service for evaluation
         try:
-            response = ContentSafetyClient(
-                endpoint=str(self.config.azure_content_safety_endpoint),
-                credential=self.config._get_azure_credentials(),
-            ).analyze_text(AnalyzeTextOptions(text=text))
+            response = await _get_client(self.config).analyze_text(AnalyzeTextOptions(text=text))
         except Exception as e:
             # if there is an error, return a fail result with the error message
             return ContentSafetyEvaluation(
@@ -1,8 +1,10 @@
 import json
+import logging
+import os
 from dataclasses import dataclass, field
 from os import PathLike
 from pathlib import Path
-from typing import Any
+from typing import Any, Literal
 
 from openai.types.chat import (
     ChatCompletionMessageParam,
@@ -11,6 +13,8 @@ from openai_client.messages import MessageFormatter, format_with_liquid
 
 from .message_history_provider import MessageHistoryProviderProtocol
 
+logger = logging.getLogger(__name__)
+
 DEFAULT_DATA_DIR = Path(".data")
 
 
@@ -20,6 +24,135 @@ class LocalMessageHistoryProviderConfig:
     data_dir: PathLike | str | None = None
     messages: list[ChatCompletionMessageParam] = field(default_factory=list)
     formatter: MessageFormatter | None = None
+    # "json" rewrites messages.json on every change. "jsonl" appends each change to messages.jsonl, which suits long
+    # histories.
+    storage_format: Literal["json", "jsonl"] = "json"
+    # jsonl: the number of records replaced by later calls to set or delete_all before the file is compacted.
+    compact_after: int = 100
+    # jsonl: sync each write to disk before returning, so that written messages survive a crash of the host.
+    fsync: bool = False
+
+
+class _MessageLog:
+    """
+    An append-only JSONL log of a message history. Each line is a record of messages appended to the history,
+    optionally replacing the history before it. The history is kept in memory, and is only read back from the file
+    if another writer changes the file.
+    """
+
+    def __init__(self, path: Path, compact_after: int, fsync: bool) -> None:
+        self._path = path
+        self._compact_after = compact_after
+        self._fsync = fsync
+        self._messages: list[ChatCompletionMessageParam] = []
+        self._size = -1
+        self._records = 0
+        # records before the last reset, which no longer contribute to the history
+        self._obsolete_records = 0
+
+    def _file_size(self) -> int:
+        try:
+            return self._path.stat().st_size
+        except FileNotFoundError:
+            return 0
+
+    def _load(self) -> None:
+        messages: list[ChatCompletionMessageParam] = []
+        records = 0
+        obsolete_records = 0
+        valid_size = 0
+        if not self._path.exists():
+            self._path.touch()
+
+        with open(self._path, "rb") as file:
+            for line in file:
+                # a line without a newline, or that does not parse, is the remains of an interrupted write
+                if not line.endswith(b"\n"):
+                    break
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    break
+
+                valid_size += len(line)
+                records += 1
+                if record.get("reset"):
+                    messages = []
+                    obsolete_records = records - 1
+                messages.extend(record.get("messages", []))
+
+        # the rest of the file is left as it is, as it may be a write still in progress by another writer; it is
+        # repaired by _write, by compacting, if it is still there when the next record is written
+        self._messages = messages
+        self._records = records
+        self._obsolete_records = obsolete_records
+        self._size = valid_size
+
+    def _write(self, record: dict[str, Any]) -> None:
+        line = (json.dumps(record) + "\n").encode("utf-8")
+        while True:
+            with open(self._path, "ab") as file:
+                size_before = os.fstat(file.fileno()).st_size
+                if size_before == self._size:
+                    file.write(line)
+                    if self._fsync:
+                        file.flush()
+                        os.fsync(file.fileno())
+                    # if another writer appended at the same time, the history is read back on the next access
+                    self._size = file.tell() if file.tell() == size_before + len(line) else -1
+                    return
+
+            # another writer changed the file since it was read, so read its records first, to append after them
+            self._load()
+            if self._size != self._file_size():
+                logger.warning("compacting interrupted write at the end of message history; path: %s", self._path)
+                self.compact()
+
+    def messages(self) -> list[ChatCompletionMessageParam]:
+        if self._size != self._file_size():
+            self._load()
+        return self._messages
+
+    def append(self, messages: list[ChatCompletionMessageParam]) -> None:
+        self.messages()
+        self._write({"messages": messages})
+        self._messages.extend(messages)
+        self._records += 1
+
+    def reset(self, messages: list[ChatCompletionMessageParam]) -> None:
+        self.messages()
+        self._write({"reset": True, "messages": messages})
+        self._messages = list(messages)
+        self._obsolete_records = self._records
+        self._records += 1
+        if self._obsolete_records >= self._compact_after:
+            self.compact()
+
+    def compact(self) -> None:
+        """
+        Rewrites the log as a single record of the history, replacing the file atomically.
+        """
+        self.messages()
+        temp_path = self._path.with_name(self._path.name + ".tmp")
+        with open(temp_path, "wb") as file:
+            file.write((json.dumps({"reset": True, "messages": self._messages}) + "\n").encode("utf-8"))
+            if self._fsync:
+                file.flush()
+                os.fsync(file.fileno())
+            size = file.tell()
+
+        os.replace(temp_path, self._path)
+        if self._fsync:
+            # sync the directory, so that the rename survives a crash of the host
+            directory = os.open(self._path.parent, os.O_RDONLY)
+            try:
+                os.fsync(directory)
+            finally:
+                os.close(directory)
+
+        self._size = size
+        self._records = 1
+        self._obsolete_records = 0
 
 
 class LocalMessageHistoryProvider(MessageHistoryProviderProtocol):
@@ -34,6 +167,19 @@ class LocalMessageHistoryProvider(MessageHistoryProviderProtocol):
         if not self.data_dir.exists():
             self.data_dir.mkdir(parents=True)
         self.messages_file = self.data_dir / "messages.json"
+
+        self._message_log: _MessageLog | None = None
+        if config.storage_format == "jsonl":
+            messages_log_file = self.data_dir / "messages.jsonl"
+            self._message_log = _MessageLog(messages_log_file, compact_after=config.compact_after, fsync=config.fsync)
+            if not messages_log_file.exists():
+                # carry over the history of a session that was stored as json
+                if self.messages_file.exists():
+                    self._message_log.reset(json.loads(self.messages_file.read_text()))
+                else:
+                    messages_log_file.touch()
+            return
+
         if not self.messages_file.exists():
             self.messages_file.write_text("[]")
 
@@ -42,6 +188,8 @@ class LocalMessageHistoryProvider(MessageHistoryProviderProtocol):
         Get all messages. This method is required for conforming to the
         MessageFormatter protocol.
         """
+        if self._message_log is not None:
+            return list(self._message_log.messages())
         return json.loads(self.messages_file.read_text())
 
     async def append(self, message: ChatCompletionMessageParam) -> None:
@@ -49,6 +197,9 @@ class LocalMessageHistoryProvider(MessageHistoryProviderProtocol):
         Append a message to the history. This method is required for conforming
         to the MessageFormatter protocol.
         """
+        if self._message_log is not None:
+            self._message_log.append([message])
+            return
         messages = await self.get()
         messages.append(message)
         self.messages_file.write_text(json.dumps(messages, indent=2))
@@ -57,6 +208,9 @@ class LocalMessageHistoryProvider(MessageHistoryProviderProtocol):
         """
         Append a list of messages to the history.
         """
+        if self._message_log is not None:
+            self._message_log.append(messages)
+            return
         existing_messages = await self.get()
         existing_messages.extend(messages)
         self.messages_file.write_text(json.dumps(existing_messages, indent=2))
@@ -65,7 +219,21 @@ class LocalMessageHistoryProvider(MessageHistoryProviderProtocol):
         """
         Completely replace the messages with the new messages.
         """
+        if self._message_log is not None:
+            self._message_log.reset(messages)
+            return
         self.messages_file.write_text(json.dumps(messages, indent=2))
 
     def delete_all(self) -> None:
+        if self._message_log is not None:
+            self._message_log.reset([])
+            return
         self.messages_file.write_text("[]")
+
+    def compact(self) -> None:
+        """
+        Rewrite the jsonl history as a single record. The history is compacted periodically as it is replaced by
+        set and delete_all; this compacts it on demand, for example before archiving a session.
+        """
+        if self._message_log is not None:
+            self._message_log.compact()
@@ -1,10 +1,15 @@
 import base64
+import functools
+import hashlib
+import json
 import logging
 import math
 import re
+import threading
+from collections import OrderedDict
 from fractions import Fraction
 from io import BytesIO
-from typing import Any, Iterable, Sequence
+from typing import Any, Callable, Iterable, Sequence
 
 import tiktoken
 from openai.types.chat import ChatCompletionMessageParam, ChatCompletionToolParam
@@ -51,12 +56,58 @@ def resolve_model_name(model: str) -> str:
         raise NotImplementedError(f"num_tokens_from_messages() is not implemented for model {model}.")
 
 
-def get_encoding_for_model(model: str) -> tiktoken.Encoding:
+@functools.cache
+def _encoding_for_model(specific_model: str, fallback_encoding_name: str) -> tiktoken.Encoding:
     try:
-        return tiktoken.encoding_for_model(resolve_model_name(model))
+        return tiktoken.encoding_for_model(specific_model)
     except KeyError:
-        logger.warning(f"model {model} not found. Using cl100k_base encoding.")
-        return tiktoken.get_encoding("cl100k_base")
+        logger.warning("model %s not found. Using %s encoding.", specific_model, fallback_encoding_name)
+        return tiktoken.get_encoding(fallback_encoding_name)
+
+
+def get_encoding_for_model(model: str) -> tiktoken.Encoding:
+    return _encoding_for_model(resolve_model_name(model), "cl100k_base")
+
+
+class _TokenCountCache:
+    """
+    LRU of token counts keyed by a hash of the counted content, so the content itself (ex. a base64 image) is not
+    held by the cache.
+    """
+
+    def __init__(self, maxsize: int) -> None:
+        self._maxsize = maxsize
+        self._counts: OrderedDict[tuple[str, bytes], int] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_count(self, namespace: str, content: str, count: Callable[[], int]) -> int:
+        key = (namespace, hashlib.blake2b(content.encode("utf-8"), digest_size=16).digest())
+
+        with self._lock:
+            token_count = self._counts.get(key)
+            if token_count is not None:
+                self._counts.move_to_end(key)
+                return token_count
+
+        token_count = count()
+
+        with self._lock:
+            self._counts[key] = token_count
+            if len(self._counts) > self._maxsize:
+                self._counts.popitem(last=False)
+
+        return token_count
+
+    def clear(self) -> None:
+        with self._lock:
+            self._counts.clear()
+
+
+_token_counts = _TokenCountCache(maxsize=50_000)
+
+
+def _num_tokens_from_text(text: str, encoding: tiktoken.Encoding) -> int:
+    return _token_counts.get_or_count(encoding.name, text, lambda: len(encoding.encode(text)))
 
 
 def num_tokens_from_message(message: ChatCompletionMessageParam, model: str) -> int:
@@ -89,11 +140,7 @@ def num_tokens_from_messages(messages: Iterable[ChatCompletionMessageParam], mod
     tokens_per_message = 3
     tokens_per_name = 1
 
-    try:
-        encoding = tiktoken.encoding_for_model(specific_model)
-    except KeyError:
-        logger.warning("model %s not found. Using cl100k_base encoding.", specific_model)
-        encoding = tiktoken.get_encoding("cl100k_base")
+    encoding = _encoding_for_model(specific_model, "cl100k_base")
 
     # Calculate the total tokens for all messages
     for message in messages:
@@ -108,15 +155,17 @@ def num_tokens_from_messages(messages: Iterable[ChatCompletionMessageParam], mod
                 for item in value:
                     # Note: item["type"] does not seem to be counted in the token count
                     if item["type"] == "text":
-                        num_tokens += len(encoding.encode(item["text"]))
+                        num_tokens += _num_tokens_from_text(item["text"], encoding)
                     elif item["type"] == "image_url":
-                        num_tokens += count_tokens_for_image(
-                            item["image_url"]["url"],
-                            model=specific_model,
-                            detail=item["image_url"].get("detail", "auto"),
+                        image_url = item["image_url"]["url"]
+                        detail = item["image_url"].get("detail", "auto")
+                        num_tokens += _token_counts.get_or_count(
+                            f"image:{specific_model}:{detail}",
+                            image_url,
+                            lambda: count_tokens_for_image(image_url, model=specific_model, detail=detail),
                         )
             elif isinstance(value, str):
-                num_tokens += len(encoding.encode(value))
+                num_tokens += _num_tokens_from_text(value, encoding)
             elif value is None:
                 # Null values do not consume tokens
                 pass
@@ -204,16 +253,10 @@ def num_tokens_from_tools(
             f"num_tokens_from_tools_and_messages() is not implemented for model {specific_model}."
         )
 
-    try:
-        encoding = tiktoken.encoding_for_model(specific_model)
-    except KeyError:
-        logger.warning("model %s not found. Using o200k_base encoding.", specific_model)
-        encoding = tiktoken.get_encoding("o200k_base")
+    encoding = _encoding_for_model(specific_model, "o200k_base")
 
-    token_count = 0
-    for f in tools:
-        token_count += func_init  # Add tokens for start of each function
-        function = f["function"]
+    def count_function_tokens(function: Any) -> int:
+        token_count = func_init  # Add tokens for start of each function
         f_name = function["name"]
         f_desc = function.get("description", "")
         if f_desc.endswith("."):
@@ -222,6 +265,20 @@ def num_tokens_from_tools(
         token_count += len(encoding.encode(line))  # Add tokens for set name and description
         if "parameters" in function:  # Process any JSON Schema in parameters
             token_count += count_jsonschema_tokens(function["parameters"], encoding, prop_key, enum_item, enum_init)
+        return token_count
+
+    token_count = 0
+    for f in tools:
+        function = f["function"]
+        try:
+            schema = json.dumps(function, sort_keys=True)
+        except TypeError:
+            token_count += count_function_tokens(function)
+            continue
+
+        token_count += _token_counts.get_or_count(
+            f"tool:{specific_model}:{encoding.name}", schema, lambda: count_function_tokens(function)
+        )
     if len(tools) > 0:
         token_count += func_end
 
@@ -244,13 +301,52 @@ def num_tokens_from_tools_and_messages(
 
 def get_image_dims(image_uri: str) -> tuple[int, int]:
     # From https://github.com/openai/openai-cookbook/pull/881/files
-    if re.match(r"data:image\/\w+;base64", image_uri):
-        image_uri = re.sub(r"data:image\/\w+;base64,", "", image_uri)
-        with Image.open(BytesIO(base64.b64decode(image_uri))) as image:
-            return image.size
-    else:
+    match = re.match(r"data:image\/\w+;base64,", image_uri)
+    if match is None:
         raise ValueError("Image must be a base64 string.")
 
+    image_data = image_uri[match.end() :]
+
+    # the dimensions are in the image header, so decode progressively longer prefixes (a multiple of 4 base64
+    # characters) rather than the whole image; PIL only reads the header when opening an image
+    prefix_length = 4096
+    while True:
+        try:
+            header = base64.b64decode(image_data[:prefix_length])
+            webp_dims = _get_webp_dims(header)
+            if webp_dims is not None:
+                return webp_dims
+
+            with Image.open(BytesIO(header)) as image:
+                return image.size
+        except (OSError, ValueError):
+            if prefix_length >= len(image_data):
+                raise
+        prefix_length *= 4
+
+
+def _get_webp_dims(header: bytes) -> tuple[int, int] | None:
+    """
+    Read the dimensions from a WebP header, which PIL cannot open without the whole image.
+    """
+    if len(header) < 30 or header[:4] != b"RIFF" or header[8:12] != b"WEBP":
+        return None
+
+    match header[12:16]:
+        case b"VP8X":
+            width = int.from_bytes(header[24:27], "little") + 1
+            height = int.from_bytes(header[27:30], "little") + 1
+            return width, height
+        case b"VP8 ":
+            width = int.from_bytes(header[26:28], "little") & 0x3FFF
+            height = int.from_bytes(header[28:30], "little") & 0x3FFF
+            return width, height
+        case b"VP8L":
+            bits = int.from_bytes(header[21:25], "little")
+            return (bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1
+
+    return None
+
 
 def count_tokens_for_image(image_uri: str, detail: str, model: str) -> int:
     # From https://github.com/openai/openai-cookbook/pull/881/files
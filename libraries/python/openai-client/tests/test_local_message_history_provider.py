@@ -0,0 +1,123 @@
+import asyncio
+import json
+import pathlib
+
+import pytest
+from openai.types.chat import ChatCompletionMessageParam
+from openai_client.chat_driver import LocalMessageHistoryProvider, LocalMessageHistoryProviderConfig
+from openai_client.chat_driver.message_history_providers.local_message_history_provider import _MessageLog
+
+
+def _message(index: int) -> ChatCompletionMessageParam:
+    return {"role": "user", "content": f"message {index}"}
+
+
+def _provider(data_dir: pathlib.Path, **kwargs) -> LocalMessageHistoryProvider:
+    return LocalMessageHistoryProvider(
+        LocalMessageHistoryProviderConfig(session_id="session", data_dir=data_dir, storage_format="jsonl", **kwargs)
+    )
+
+
+def test_jsonl_history(tmp_path: pathlib.Path) -> None:
+    async def test() -> None:
+        provider = _provider(tmp_path)
+        await provider.append(_message(1))
+        await provider.extend([_message(2), _message(3)])
+        assert await provider.get() == [_message(1), _message(2), _message(3)]
+
+        # each change is appended as a line
+        assert len((tmp_path / "messages.jsonl").read_text().splitlines()) == 2
+
+        # another provider for the session reads the history back
+        assert await _provider(tmp_path).get() == [_message(1), _message(2), _message(3)]
+
+        await provider.set([_message(4)], vars={})
+        assert await provider.get() == [_message(4)]
+        assert await _provider(tmp_path).get() == [_message(4)]
+
+        provider.delete_all()
+        assert await provider.get() == []
+        assert await _provider(tmp_path).get() == []
+
+    asyncio.run(test())
+
+
+def test_jsonl_history_reloads_changes_by_other_writers(tmp_path: pathlib.Path) -> None:
+    async def test() -> None:
+        provider = _provider(tmp_path)
+        await provider.append(_message(1))
+        assert await provider.get() == [_message(1)]
+
+        await _provider(tmp_path).append(_message(2))
+        assert await provider.get() == [_message(1), _message(2)]
+
+    asyncio.run(test())
+
+
+def test_jsonl_history_compacts_replaced_records(tmp_path: pathlib.Path) -> None:
+    async def test() -> None:
+        provider = _provider(tmp_path, compact_after=3)
+        for index in range(3):
+            await provider.append(_message(index))
+
+        # the set replaces the three records before it, so the file is compacted to a single record
+        await provider.set([_message(3), _message(4)], vars={})
+        assert len((tmp_path / "messages.jsonl").read_text().splitlines()) == 1
+        assert await provider.get() == [_message(3), _message(4)]
+
+        await provider.append(_message(5))
+        assert await _provider(tmp_path).get() == [_message(3), _message(4), _message(5)]
+
+    asyncio.run(test())
+
+
+def test_jsonl_history_ignores_interrupted_write(tmp_path: pathlib.Path) -> None:
+    async def test() -> None:
+        provider = _provider(tmp_path, fsync=True)
+        await provider.extend([_message(1), _message(2)])
+
+        with open(tmp_path / "messages.jsonl", "a") as file:
+            file.write('{"messages": [{"role": "user", "con')
+
+        provider = _provider(tmp_path)
+        assert await provider.get() == [_message(1), _message(2)]
+
+        # reading leaves the file as it is, as the write may still be in progress
+        assert (tmp_path / "messages.jsonl").read_text().endswith('"con')
+
+        await provider.append(_message(3))
+        assert await _provider(tmp_path).get() == [_message(1), _message(2), _message(3)]
+        assert (tmp_path / "messages.jsonl").read_text().endswith("\n")
+
+    asyncio.run(test())
+
+
+def test_jsonl_history_write_after_other_writer(tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    path = tmp_path / "messages.jsonl"
+    message_log = _MessageLog(path, compact_after=100, fsync=False)
+    message_log.append([_message(1)])
+
+    # another writer appends after the history is read, and before the next record is written
+    read_messages = message_log.messages
+
+    def read_then_other_writer_appends() -> list[ChatCompletionMessageParam]:
+        messages = read_messages()
+        _MessageLog(path, compact_after=100, fsync=False).append([_message(2)])
+        return messages
+
+    monkeypatch.setattr(message_log, "messages", read_then_other_writer_appends)
+    message_log.append([_message(3)])
+    monkeypatch.undo()
+
+    assert message_log.messages() == [_message(1), _message(2), _message(3)]
+    assert _MessageLog(path, compact_after=100, fsync=False).messages() == [_message(1), _message(2), _message(3)]
+
+
+def test_jsonl_history_carries_over_json_history(tmp_path: pathlib.Path) -> None:
+    async def test() -> None:
+        (tmp_path / "messages.json").write_text(json.dumps([_message(1), _message(2)]))
+
+        provider = _provider(tmp_path)
+        assert await provider.get() == [_message(1), _message(2)]
+
+    asyncio.run(test())
@@ -1,9 +1,20 @@
+import base64
+import io
+import logging
 import os
+import random
+import time
+from typing import Iterator
 
 import openai_client
 import pytest
+import tiktoken
 from openai import OpenAI
 from openai.types.chat import ChatCompletionMessageParam, ChatCompletionToolParam
+from openai_client import tokens
+from PIL import Image
+
+logger = logging.getLogger(__name__)
 
 
 @pytest.fixture
@@ -151,3 +162,129 @@ def test_num_tokens_for_tools_and_messages(model: str, client: OpenAI) -> None:
     assert actual_num_tokens == expected_num_tokens, (
         f"num_tokens_from_tools_and_messages() does not match the OpenAI API response for model {model}."
     )
+
+
+def _image_uri(image_format: str, size: tuple[int, int], **save_args) -> str:
+    # noise does not compress, so the encoded image is large
+    image = Image.frombytes("RGB", size, random.randbytes(size[0] * size[1] * 3))
+    buffer = io.BytesIO()
+    image.save(buffer, format=image_format, **save_args)
+    return f"data:image/{image_format.lower()};base64,{base64.b64encode(buffer.getvalue()).decode()}"
+
+
+@pytest.mark.parametrize(
+    ("image_format", "save_args"),
+    [("PNG", {}), ("JPEG", {}), ("GIF", {}), ("WEBP", {}), ("WEBP", {"lossless": True}), ("WEBP", {"exif": b"x"})],
+)
+def test_get_image_dims_reads_header(image_format: str, save_args: dict, monkeypatch: pytest.MonkeyPatch) -> None:
+    image_uri = _image_uri(image_format, (640, 480), **save_args)
+
+    decoded_lengths: list[int] = []
+    b64decode = base64.b64decode
+
+    def b64decode_spy(data: str) -> bytes:
+        decoded_lengths.append(len(data))
+        return b64decode(data)
+
+    monkeypatch.setattr(tokens.base64, "b64decode", b64decode_spy)
+
+    assert tokens.get_image_dims(image_uri) == (640, 480)
+    assert max(decoded_lengths) < len(image_uri) // 10
+
+
+def test_get_image_dims_rejects_non_base64_uri() -> None:
+    with pytest.raises(ValueError):
+        tokens.get_image_dims("https://example.com/image.png")
+
+
+@pytest.fixture
+def byte_encoding(monkeypatch: pytest.MonkeyPatch) -> Iterator[tiktoken.Encoding]:
+    """
+    A byte-level encoding, which needs no download, used in place of the model encodings.
+    """
+    encoding = tiktoken.Encoding(
+        name="test_bytes",
+        pat_str=r"\S+|\s+",
+        mergeable_ranks={bytes([i]): i for i in range(256)},
+        special_tokens={},
+    )
+    monkeypatch.setattr(tiktoken, "encoding_for_model", lambda model: encoding)
+    tokens._encoding_for_model.cache_clear()
+    tokens._token_counts.clear()
+    yield encoding
+    tokens._encoding_for_model.cache_clear()
+    tokens._token_counts.clear()
+
+
+def test_token_counts_are_cached(byte_encoding: tiktoken.Encoding, monkeypatch: pytest.MonkeyPatch) -> None:
+    messages: list[ChatCompletionMessageParam] = [
+        {"role": "system", "content": "You are a helpful assistant."},
+        {
+            "role": "user",
+            "content": [
+                {"type": "text", "text": "What is in this image?"},
+                {"type": "image_url", "image_url": {"url": _image_uri("PNG", (1024, 1024)), "detail": "high"}},
+            ],
+        },
+    ]
+    tools: list[ChatCompletionToolParam] = [
+        {
+            "type": "function",
+            "function": {
+                "name": "get_current_weather",
+                "description": "Get the current weather in a given location",
+                "parameters": {"type": "object", "properties": {"location": {"type": "string"}}},
+            },
+        }
+    ]
+
+    expected = openai_client.num_tokens_from_tools_and_messages(tools=tools, messages=messages, model="gpt-4o")
+
+    # cached counts are used, so neither the text nor the image is processed again
+    monkeypatch.setattr(byte_encoding, "encode", lambda *args, **kwargs: pytest.fail("text was re-encoded"))
+    monkeypatch.setattr(tokens, "get_image_dims", lambda *args: pytest.fail("image was re-read"))
+
+    assert openai_client.num_tokens_from_tools_and_messages(tools=tools, messages=messages, model="gpt-4o") == expected
+
+
+def test_num_tokens_from_messages_benchmark() -> None:
+    """
+    Compares counting the tokens of a 500 message history, with images, with and without cached token counts.
+    """
+    try:
+        tiktoken.encoding_for_model("gpt-4o")
+    except Exception:
+        pytest.skip("the gpt-4o encoding is not available")
+
+    image_uris = [_image_uri("PNG", (1024, 768)) for _ in range(10)]
+    words = ["token", "counting", "conversation", "history", "assistant", "workbench", "image", "message"]
+    messages: list[ChatCompletionMessageParam] = []
+    for index in range(500):
+        text = " ".join(random.choices(words, k=100))
+        if index % 25 == 0:
+            messages.append({
+                "role": "user",
+                "content": [
+                    {"type": "text", "text": text},
+                    {"type": "image_url", "image_url": {"url": image_uris[index % len(image_uris)], "detail": "high"}},
+                ],
+            })
+        else:
+            messages.append({"role": "user", "content": text} if index % 2 else {"role": "assistant", "content": text})
+
+    tokens._token_counts.clear()
+    start = time.perf_counter()
+    uncached_count = openai_client.num_tokens_from_messages(messages, model="gpt-4o")
+    uncached_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    cached_count = openai_client.num_tokens_from_messages(messages, model="gpt-4o")
+    cached_seconds = time.perf_counter() - start
+
+    logger.info(
+        "num_tokens_from_messages, 500 messages; uncached: %.1fms, cached: %.1fms",
+        uncached_seconds * 1000,
+        cached_seconds * 1000,
+    )
+
+    assert cached_count == uncached_count
@@ -10,6 +10,7 @@ import httpx
 from fastapi import HTTPException
 from pydantic import BaseModel
 
+from semantic_workbench_api_model import connection_pool
 from semantic_workbench_api_model.assistant_model import (
     AssistantPutRequestModel,
     ConfigPutRequestModel,
@@ -20,14 +21,14 @@ from semantic_workbench_api_model.assistant_model import (
     StatePutRequestModel,
     StateResponseModel,
 )
-from semantic_workbench_api_model.workbench_model import ConversationEvent
+from semantic_workbench_api_model.workbench_model import ConversationEvent, ConversationEventList
 
 HEADER_API_KEY = "X-API-Key"
 
 
 # HTTPX transport factory can be overridden to return an ASGI transport for testing
-def httpx_transport_factory() -> httpx.AsyncHTTPTransport:
-    return httpx.AsyncHTTPTransport(retries=3)
+def httpx_transport_factory() -> httpx.AsyncBaseTransport:
+    return connection_pool.shared_transport()
 
 
 class AuthParams(BaseModel):
@@ -134,6 +135,22 @@ class AssistantClient:
         if not http_response.is_success:
             raise AssistantResponseError(http_response)
 
+    async def post_conversation_events(self, events: list[ConversationEvent]) -> None:
+        """
+        Posts a batch of events, for any of the assistant's conversations, in a single request. Assistant services
+        that do not support batches respond with 404 or 405.
+        """
+        try:
+            http_response = await self._client.post(
+                "/events",
+                json=ConversationEventList(events=events).model_dump(mode="json"),
+            )
+        except httpx.RequestError as e:
+            raise AssistantConnectionError(e) from e
+
+        if not http_response.is_success:
+            raise AssistantResponseError(http_response)
+
     async def get_config(self) -> ConfigResponseModel:
         try:
             http_response = await self._client.get("/config")
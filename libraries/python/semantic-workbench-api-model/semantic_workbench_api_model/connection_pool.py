@@ -0,0 +1,122 @@
+"""
+Process-wide, keep-alive HTTP connection pool shared by the workbench and assistant service clients.
+
+The clients create a lightweight httpx.AsyncClient per call, or per assistant, to carry the base url and headers.
+They all send requests through the same pooled transport, so connections (and TLS sessions) are reused across
+calls and across conversation contexts. Closing a client does not close the pool; services close it on shutdown
+with `aclose`.
+"""
+
+import asyncio
+import importlib.util
+import logging
+
+import httpx
+from pydantic import BaseModel
+
+logger = logging.getLogger(__name__)
+
+
+class ConnectionPoolSettings(BaseModel):
+    max_connections: int = 100
+    max_keepalive_connections: int = 20
+    keepalive_expiry_seconds: float = 30.0
+    # HTTP/2 is used when the optional h2 package is installed (pip install httpx[http2])
+    http2: bool = True
+    retries: int = 3
+
+
+class _SharedTransport(httpx.AsyncBaseTransport):
+    """
+    Sends requests through the shared pooled transport. Closing it, which happens when the owning client is closed,
+    leaves the pool open.
+    """
+
+    def __init__(self, transport: httpx.AsyncHTTPTransport) -> None:
+        self._transport = transport
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        return await self._transport.handle_async_request(request)
+
+    async def aclose(self) -> None:
+        pass
+
+
+_settings = ConnectionPoolSettings()
+_transport: httpx.AsyncHTTPTransport | None = None
+_transport_loop: asyncio.AbstractEventLoop | None = None
+# transports replaced when the event loop changed; their connections belong to the previous loop, which may still be
+# using them, so they are closed by `aclose` rather than when they are replaced
+_replaced_transports: list[httpx.AsyncHTTPTransport] = []
+
+
+def configure(settings: ConnectionPoolSettings) -> None:
+    """
+    Sets the pool settings. Takes effect when the pool is next created, at first use or after `aclose`.
+    """
+    global _settings
+    _settings = settings
+
+
+def _create_transport() -> httpx.AsyncHTTPTransport:
+    http2 = _settings.http2 and importlib.util.find_spec("h2") is not None
+    if _settings.http2 and not http2:
+        logger.debug("h2 is not installed, using HTTP/1.1 for the shared connection pool")
+
+    return httpx.AsyncHTTPTransport(
+        http2=http2,
+        retries=_settings.retries,
+        limits=httpx.Limits(
+            max_connections=_settings.max_connections,
+            max_keepalive_connections=_settings.max_keepalive_connections,
+            keepalive_expiry=_settings.keepalive_expiry_seconds,
+        ),
+    )
+
+
+def shared_transport() -> httpx.AsyncBaseTransport:
+    """
+    Returns a transport that sends requests through the process-wide connection pool.
+    """
+    global _transport, _transport_loop
+
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        loop = None
+
+    # pooled connections are bound to the event loop they were opened on
+    if _transport is None or (loop is not None and _transport_loop is not None and loop is not _transport_loop):
+        if _transport is not None:
+            _replaced_transports.append(_transport)
+        _transport = _create_transport()
+        _transport_loop = loop
+
+    elif _transport_loop is None:
+        _transport_loop = loop
+
+    return _SharedTransport(_transport)
+
+
+async def aclose() -> None:
+    """
+    Closes the pooled connections, including those of pools replaced after the event loop changed. The pool is
+    re-created on next use.
+    """
+    global _transport, _transport_loop
+
+    transport = _transport
+    _transport = None
+    _transport_loop = None
+
+    replaced_transports = list(_replaced_transports)
+    _replaced_transports.clear()
+    for replaced_transport in replaced_transports:
+        try:
+            await replaced_transport.aclose()
+        except Exception:
+            # the connections may belong to an event loop that has since closed
+            logger.debug("error closing replaced connection pool", exc_info=True)
+
+    if transport is not None:
+        await transport.aclose()
@@ -106,6 +106,7 @@ class Conversation(BaseModel):
 
 class ConversationList(BaseModel):
     conversations: list[Conversation]
+    next_cursor: str | None = None
 
 
 class ConversationShare(BaseModel):
@@ -186,6 +187,7 @@ class ConversationMessageDebug(BaseModel):
 
 class ConversationMessageList(BaseModel):
     messages: list[ConversationMessage]
+    next_cursor: str | None = None
 
 
 class File(BaseModel):
@@ -447,6 +449,16 @@ class NewConversationMessage(BaseModel):
     debug_data: dict[str, Any] | None = None
 
 
+class NewConversationMessageDelta(BaseModel):
+    """
+    Partial content of a message that is still being generated, appended to the content sent before it. Deltas are
+    delivered to the conversation's SSE clients as message.delta events and are not stored; the message is stored
+    once, when it is created with the same id.
+    """
+
+    content: str
+
+
 class NewConversationShare(BaseModel):
     conversation_id: uuid.UUID
     label: str
@@ -467,6 +479,7 @@ class UpdateParticipant(BaseModel):
 class ConversationEventType(StrEnum):
     message_created = "message.created"
     message_deleted = "message.deleted"
+    message_delta = "message.delta"
     participant_created = "participant.created"
     participant_updated = "participant.updated"
     file_created = "file.created"
@@ -488,3 +501,7 @@ class ConversationEvent(BaseModel):
     event: ConversationEventType
     timestamp: datetime.datetime = Field(default_factory=lambda: datetime.datetime.now(datetime.UTC))
     data: dict[str, Any] = {}
+
+
+class ConversationEventList(BaseModel):
+    events: list[ConversationEvent]
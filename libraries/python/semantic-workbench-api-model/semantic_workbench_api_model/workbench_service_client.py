@@ -11,7 +11,7 @@ from typing import Any, AsyncGenerator, AsyncIterator, Callable, Iterable, Mappi
 import asgi_correlation_id
 import httpx
 
-from . import assistant_model, workbench_model
+from . import assistant_model, connection_pool, workbench_model
 
 HEADER_ASSISTANT_SERVICE_ID = "X-Assistant-Service-ID"
 HEADER_ASSISTANT_ID = "X-Assistant-ID"
@@ -19,8 +19,8 @@ HEADER_API_KEY = "X-API-Key"
 
 
 # HTTPX transport factory can be overridden to return an ASGI transport for testing
-def httpx_transport_factory() -> httpx.AsyncHTTPTransport:
-    return httpx.AsyncHTTPTransport(retries=3)
+def httpx_transport_factory() -> httpx.AsyncBaseTransport:
+    return connection_pool.shared_transport()
 
 
 @dataclass
@@ -197,6 +197,8 @@ class ConversationAPIClient:
         participant_ids: Iterable[str] | None = None,
         participant_role: workbench_model.ParticipantRole | None = None,
         limit: int | None = None,
+        before_cursor: str | None = None,
+        after_cursor: str | None = None,
     ) -> workbench_model.ConversationMessageList:
         async with self._client as client:
             params: dict[str, str | list[str]] = {}
@@ -210,6 +212,10 @@ class ConversationAPIClient:
                 params["before"] = str(before)
             if after:
                 params["after"] = str(after)
+            if before_cursor:
+                params["before_cursor"] = before_cursor
+            if after_cursor:
+                params["after_cursor"] = after_cursor
             if limit:
                 params["limit"] = str(limit)
 
@@ -234,6 +240,18 @@ class ConversationAPIClient:
 
         return workbench_model.ConversationMessageList(messages=messages_out)
 
+    async def send_message_delta(
+        self,
+        message_id: uuid.UUID,
+        delta: workbench_model.NewConversationMessageDelta,
+    ) -> None:
+        async with self._client as client:
+            http_response = await client.post(
+                f"/conversations/{self._conversation_id}/messages/{message_id}/deltas",
+                json=delta.model_dump(mode="json"),
+            )
+            http_response.raise_for_status()
+
     async def send_conversation_state_event(
         self,
         assistant_id: str,
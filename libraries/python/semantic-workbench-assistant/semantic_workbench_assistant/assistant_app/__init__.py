@@ -7,7 +7,7 @@ from .content_safety import (
     ContentSafetyEvaluationResult,
     ContentSafetyEvaluator,
 )
-from .context import AssistantContext, ConversationContext, storage_directory_for_context
+from .context import AssistantContext, ConversationContext, MessageDeltaStream, storage_directory_for_context
 from .error import BadRequestError, ConflictError, NotFoundError
 from .export_import import FileStorageAssistantDataExporter, FileStorageConversationDataExporter
 from .protocol import (
@@ -39,6 +39,7 @@ __all__ = [
     "ContentSafetyEvaluator",
     "FileStorageAssistantDataExporter",
     "FileStorageConversationDataExporter",
+    "MessageDeltaStream",
     "BadRequestError",
     "NotFoundError",
     "ConflictError",
@@ -1,5 +1,7 @@
 import logging
+import os
 import pathlib
+from dataclasses import dataclass
 from typing import Any, Generic, TypeVar
 
 from pydantic import (
@@ -26,14 +28,31 @@ logger = logging.getLogger(__name__)
 ConfigModelT = TypeVar("ConfigModelT", bound=BaseModel)
 
 
+@dataclass
+class _CachedConfig(Generic[ConfigModelT]):
+    template_id: str
+    # the path, modification time, size and inode of the config file when read, or None if there was no file
+    file_signature: tuple[str, int, int, int] | None
+    config: ConfigModelT
+
+
 class BaseModelAssistantConfig(Generic[ConfigModelT]):
     """
     Assistant-config implementation that uses a BaseModel for default config.
+
+    Configs are cached in memory per assistant, and the cache is invalidated when the config is set, or the
+    assistant is imported or deleted. With check_for_changes, the config file is also checked for changes made outside
+    the process (a stat call per get), and read again if it changed.
     """
 
     def __init__(
-        self, default_cls: type[ConfigModelT], additional_templates: dict[str, type[ConfigModelT]] = {}
+        self,
+        default_cls: type[ConfigModelT],
+        additional_templates: dict[str, type[ConfigModelT]] = {},
+        check_for_changes: bool = True,
     ) -> None:
+        self._check_for_changes = check_for_changes
+        self._cache: dict[str, _CachedConfig[ConfigModelT]] = {}
         self._templates = {
             "default": default_cls,
         }
@@ -47,6 +66,13 @@ class BaseModelAssistantConfig(Generic[ConfigModelT]):
             self._templates[template_id] = template_cls
 
     async def get(self, assistant_context: AssistantContext) -> ConfigModelT:
+        cached = self._cache.get(assistant_context.id)
+        if cached is not None and cached.template_id == assistant_context._template_id:
+            if not self._check_for_changes or cached.file_signature == self._file_signature_for(assistant_context):
+                # callers may modify the config they get, so each gets a copy
+                return cached.config.model_copy(deep=True)
+
+        file_signature = self._file_signature_for(assistant_context)
         path = self._private_path_for(assistant_context)
 
         if not path.exists():
@@ -59,7 +85,28 @@ class BaseModelAssistantConfig(Generic[ConfigModelT]):
         except ValidationError as e:
             logger.warning("exception reading config; path: %s", path, exc_info=e)
 
-        return config or self._templates[assistant_context._template_id].model_construct()
+        config = config or self._templates[assistant_context._template_id].model_construct()
+        self._cache[assistant_context.id] = _CachedConfig(
+            template_id=assistant_context._template_id,
+            file_signature=file_signature,
+            config=config.model_copy(deep=True),
+        )
+        return config
+
+    def invalidate(self, assistant_context: AssistantContext) -> None:
+        """
+        Drop the cached config for the assistant, so that it is read from storage on the next get.
+        """
+        self._cache.pop(assistant_context.id, None)
+
+    def _file_signature_for(self, assistant_context: AssistantContext) -> tuple[str, int, int, int] | None:
+        for path in (self._private_path_for(assistant_context), self._export_import_path_for(assistant_context)):
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            return (str(path), stat.st_mtime_ns, stat.st_size, stat.st_ino)
+        return None
 
     @property
     def provider(self) -> AssistantConfigProvider:
@@ -95,6 +142,9 @@ class BaseModelAssistantConfig(Generic[ConfigModelT]):
                 config = self._provider._templates[template_id].model_construct()
                 return self._provider._config_data_model_for(config)
 
+            def invalidate(self, assistant_context: AssistantContext) -> None:
+                self._provider.invalidate(assistant_context)
+
         return _ConfigProvider(self)
 
     def _private_path_for(self, assistant_context: AssistantContext) -> pathlib.Path:
@@ -106,6 +156,7 @@ class BaseModelAssistantConfig(Generic[ConfigModelT]):
         return storage_directory_for_context(assistant_context) / "config.json"
 
     async def _set(self, assistant_context: AssistantContext, config: ConfigModelT) -> None:
+        self.invalidate(assistant_context)
         # save the config with secrets serialized with their actual values for the assistant
         write_model(
             self._private_path_for(assistant_context),
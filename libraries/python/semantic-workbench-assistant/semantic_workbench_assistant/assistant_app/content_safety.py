@@ -1,6 +1,9 @@
 # Copyright (c) Microsoft. All rights reserved.
+import hashlib
 import json
 import logging
+import time
+from collections import OrderedDict
 from enum import StrEnum
 from typing import Any, Awaitable, Callable, Protocol
 
@@ -115,6 +118,11 @@ class ContentSafety(ContentInterceptor):
         - Add the evaluation result to the debug metadata for visibility in the workbench UI debug views.
         - Add interceptor data to the message metadata to avoid infinite loops.
 
+    Only the user-visible content of events and messages is evaluated, not their metadata or debug data.
+    Pass and warn results are cached by a hash of the content and of the evaluator configuration for
+    `verdict_cache_ttl` seconds, so that content that is posted again is not evaluated again, until the
+    evaluator configuration, such as its thresholds, changes.
+
     **Notes**
     - Use this interceptor as an example or template for implementing content safety evaluation in an
         assistant if you want to introduce your own content safety evaluation logic or handling of
@@ -126,8 +134,17 @@ class ContentSafety(ContentInterceptor):
     def metadata_key(self) -> str:
         return "content_safety"
 
-    def __init__(self, content_evaluator_factory: ContentEvaluatorFactory) -> None:
+    def __init__(
+        self,
+        content_evaluator_factory: ContentEvaluatorFactory,
+        verdict_cache_ttl: float = 300.0,
+        verdict_cache_size: int = 10_000,
+    ) -> None:
         self.content_evaluator_factory = content_evaluator_factory
+        self.verdict_cache_ttl = verdict_cache_ttl
+        self.verdict_cache_size = verdict_cache_size
+        # expiry (monotonic time) and evaluation, by content hash, least recently used first
+        self._verdicts: OrderedDict[str, tuple[float, ContentSafetyEvaluation]] = OrderedDict()
 
     #
     # interceptor methods
@@ -158,10 +175,9 @@ class ContentSafety(ContentInterceptor):
             # skip evaluation for other event types
             return event
 
-        # evaluate the content safety of the event data
+        # evaluate the content safety of the user-visible content of the event
         try:
-            evaluator = await self.content_evaluator_factory(context)
-            evaluation = await evaluator.evaluate(json.dumps(event.data))
+            evaluation = await self._evaluate(context, self._event_content(event))
         except Exception as e:
             # if there is an error, return a fail result with the error message
             logger.exception("Content safety evaluation failed.")
@@ -243,8 +259,7 @@ class ContentSafety(ContentInterceptor):
 
         # evaluate the content safety of the messages
         try:
-            evaluator = await self.content_evaluator_factory(context)
-            evaluation = await evaluator.evaluate([message.content for message in messages])
+            evaluation = await self._evaluate(context, [message.content for message in messages])
         except Exception as e:
             # if there is an error, return a fail result with the error message
             logger.exception("Content safety evaluation failed.")
@@ -312,6 +327,66 @@ class ContentSafety(ContentInterceptor):
     # helper methods
     #
 
+    def _event_content(self, event: ConversationEvent) -> list[str]:
+        """
+        Get the user-visible content of an event: the content and filenames of a message, or the name of a file.
+        """
+        match event.event:
+            case ConversationEventType.message_created:
+                message = event.data.get("message", {})
+                content = [message.get("content", ""), *message.get("filenames", [])]
+
+            case ConversationEventType.file_created | ConversationEventType.file_updated:
+                content = [event.data.get("file", {}).get("filename", "")]
+
+            case _:
+                content = []
+
+        return [item for item in content if item]
+
+    async def _evaluate(self, context: ConversationContext, content: list[str]) -> ContentSafetyEvaluation:
+        """
+        Evaluate the content safety of the content, reusing the evaluation of the same content for the same
+        assistant, with the same evaluator configuration, while it is cached.
+        """
+        if not content:
+            return ContentSafetyEvaluation(result=ContentSafetyEvaluationResult.Pass, metadata={"content_length": 0})
+
+        evaluator = await self.content_evaluator_factory(context)
+
+        content_hash = hashlib.sha256(
+            json.dumps([context.assistant.id, self._evaluator_config(evaluator), content], default=str).encode("utf-8")
+        ).hexdigest()
+        now = time.monotonic()
+
+        cached = self._verdicts.get(content_hash)
+        if cached is not None:
+            expires_at, evaluation = cached
+            if expires_at > now:
+                self._verdicts.move_to_end(content_hash)
+                return evaluation.model_copy(update={"metadata": {**evaluation.metadata, "cached": True}})
+            del self._verdicts[content_hash]
+
+        evaluation = await evaluator.evaluate(content)
+
+        # failures, including failures to reach the evaluation service, are evaluated again
+        if evaluation.result != ContentSafetyEvaluationResult.Fail and self.verdict_cache_ttl > 0:
+            self._verdicts[content_hash] = (now + self.verdict_cache_ttl, evaluation)
+            while len(self._verdicts) > self.verdict_cache_size:
+                self._verdicts.popitem(last=False)
+
+        return evaluation
+
+    def _evaluator_config(self, evaluator: ContentSafetyEvaluator) -> Any:
+        """
+        Get the configuration of an evaluator, which evaluators conventionally hold in their `config` attribute,
+        for the verdict cache key.
+        """
+        config = getattr(evaluator, "config", None)
+        if isinstance(config, BaseModel):
+            config = config.model_dump(mode="json")
+        return [type(evaluator).__qualname__, config]
+
     def _tag_event(self, event: ConversationEvent, assistant_id: str) -> ConversationEvent:
         """
         Tag an event with the assistant ID to avoid infinite loops.
@@ -5,7 +5,7 @@ import pathlib
 import uuid
 from contextlib import asynccontextmanager
 from dataclasses import dataclass, field
-from typing import Any, AsyncGenerator, AsyncIterator
+from typing import Any, AsyncGenerator, AsyncIterator, Awaitable, Callable
 
 import semantic_workbench_api_model
 import semantic_workbench_api_model.workbench_service_client
@@ -25,6 +25,86 @@ class AssistantContext:
     _template_id: str = field(default="default")
 
 
+class MessageDeltaStream:
+    """
+    Streams the content of a message, as it is generated, to the conversation's clients. Appended content is
+    coalesced, and sent once coalesce_bytes are pending or the oldest pending content has waited coalesce_seconds.
+
+    Deltas are only displayed while the message is generated; send the message, with the stream's message_id and
+    content, to store it. Failures to send deltas are logged, not raised, as the message carries the full content.
+    """
+
+    def __init__(
+        self,
+        message_id: uuid.UUID,
+        send_delta: Callable[[str], Awaitable[None]],
+        coalesce_bytes: int,
+        coalesce_seconds: float,
+    ) -> None:
+        self.message_id = message_id
+        self._send_delta = send_delta
+        self._coalesce_bytes = coalesce_bytes
+        self._coalesce_seconds = coalesce_seconds
+        self._content: list[str] = []
+        self._pending: list[str] = []
+        self._pending_bytes = 0
+        self._send_lock = asyncio.Lock()
+        self._flush_task: asyncio.Task | None = None
+
+    @property
+    def content(self) -> str:
+        """The content appended so far."""
+        return "".join(self._content)
+
+    async def append(self, content: str) -> None:
+        if not content:
+            return
+
+        self._content.append(content)
+        self._pending.append(content)
+        self._pending_bytes += len(content.encode())
+
+        if self._pending_bytes >= self._coalesce_bytes:
+            await self.flush()
+            return
+
+        if self._flush_task is None:
+            self._flush_task = asyncio.create_task(self._flush_after_delay())
+
+    async def _flush_after_delay(self) -> None:
+        await asyncio.sleep(self._coalesce_seconds)
+        self._flush_task = None
+        await self.flush()
+
+    async def flush(self) -> None:
+        """
+        Sends the pending content now.
+        """
+        # deltas are sent one at a time, so that they arrive in order
+        async with self._send_lock:
+            if not self._pending:
+                return
+
+            content = "".join(self._pending)
+            self._pending.clear()
+            self._pending_bytes = 0
+
+            try:
+                await self._send_delta(content)
+            except Exception:
+                logger.exception("error sending message delta; message_id: %s", self.message_id)
+
+    async def close(self) -> None:
+        """
+        Stops sending deltas, discarding any pending content.
+        """
+        self._pending.clear()
+        self._pending_bytes = 0
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            self._flush_task = None
+
+
 @dataclass
 class ConversationContext:
     id: str
@@ -50,6 +130,42 @@ class ConversationContext:
             messages = [messages]
         return await self._workbench_client.send_messages(*messages)
 
+    @asynccontextmanager
+    async def stream_message(self, message_id: uuid.UUID | None = None) -> AsyncIterator[MessageDeltaStream]:
+        """
+        Context manager to stream the content of a message to the conversation's clients while it is generated,
+        without storing the partial content. Send the message when done, to store it.
+
+        Example:
+        ```python
+        async with conversation.stream_message() as stream:
+            async for chunk in completion:
+                await stream.append(chunk.choices[0].delta.content or "")
+
+        await conversation.send_messages(
+            workbench_model.NewConversationMessage(id=stream.message_id, content=stream.content)
+        )
+        ```
+        """
+        message_id = message_id or uuid.uuid4()
+        workbench_client = self._workbench_client
+
+        async def send_delta(content: str) -> None:
+            await workbench_client.send_message_delta(
+                message_id, workbench_model.NewConversationMessageDelta(content=content)
+            )
+
+        stream = MessageDeltaStream(
+            message_id=message_id,
+            send_delta=send_delta,
+            coalesce_bytes=settings.message_delta_coalesce_bytes,
+            coalesce_seconds=settings.message_delta_coalesce_seconds,
+        )
+        try:
+            yield stream
+        finally:
+            await stream.close()
+
     async def update_participant_me(
         self, participant: workbench_model.UpdateParticipant
     ) -> workbench_model.ConversationParticipant:
@@ -89,6 +89,7 @@ class AssistantConfigProvider(Protocol):
     async def get(self, assistant_context: AssistantContext) -> AssistantConfigDataModel: ...
     async def set(self, assistant_context: AssistantContext, config: dict[str, Any]) -> None: ...
     def default_for(self, template_id: str) -> AssistantConfigDataModel: ...
+    def invalidate(self, assistant_context: AssistantContext) -> None: ...
 
 
 @dataclass
@@ -3,13 +3,14 @@ import contextlib
 import functools
 import logging
 import pathlib
+import time
 from contextlib import asynccontextmanager, contextmanager
+from dataclasses import asdict, dataclass
 from typing import (
     IO,
     AsyncContextManager,
     AsyncIterator,
     Callable,
-    NoReturn,
     TypeVar,
     cast,
 )
@@ -63,6 +64,46 @@ class _PersistedAssistantStates(BaseModel):
 class _Event(BaseModel):
     assistant_id: str
     event: workbench_model.ConversationEvent
+    enqueued_time: float
+
+
+@dataclass
+class EventHandlingMetrics:
+    """
+    Metrics for the conversation events queued and handled by the AssistantService.
+    """
+
+    # events waiting in conversation queues, across all conversations
+    queued_events: int = 0
+    # the largest number of events seen waiting in a single conversation queue, since the last report
+    max_queue_depth: int = 0
+    # conversations with a queue and task, and the number removed after being idle
+    active_conversations: int = 0
+    reaped_conversations: int = 0
+
+    running_handlers: int = 0
+    handled_events: int = 0
+    handler_seconds_total: float = 0.0
+    handler_seconds_max: float = 0.0
+    queued_seconds_total: float = 0.0
+    queued_seconds_max: float = 0.0
+
+    def observe_handler(self, handler_seconds: float, queued_seconds: float) -> None:
+        self.handled_events += 1
+        self.handler_seconds_total += handler_seconds
+        self.handler_seconds_max = max(self.handler_seconds_max, handler_seconds)
+        self.queued_seconds_total += queued_seconds
+        self.queued_seconds_max = max(self.queued_seconds_max, queued_seconds)
+
+    def report(self) -> dict[str, int | float]:
+        """
+        Returns the metrics, and resets the peaks, so that each report holds the peaks since the previous one.
+        """
+        report = asdict(self)
+        self.max_queue_depth = 0
+        self.handler_seconds_max = 0.0
+        self.queued_seconds_max = 0.0
+        return report
 
 
 def translate_assistant_errors(func):
@@ -129,7 +170,11 @@ class AssistantService(FastAPIAssistantService):
 
         self._root_path = pathlib.Path(settings.storage.root)
         self._assistant_states_path = self._root_path / "assistant_states.json"
-        self._event_queue_lock = asyncio.Lock()
+        # the persisted states are loaded once and kept in memory; writes go through to disk
+        self._assistant_states: _PersistedAssistantStates | None = None
+        self._conversation_states: dict[tuple[str, str], tuple[_AssistantState, _ConversationState]] = {}
+        self._event_handler_semaphore = asyncio.Semaphore(settings.max_concurrent_conversation_event_handlers)
+        self.event_handling_metrics = EventHandlingMetrics()
         self._conversation_event_queues: dict[tuple[str, str], asyncio.Queue[_Event]] = {}
         self._conversation_event_tasks: set[asyncio.Task] = set()
         register_lifespan_handler(self.lifespan)
@@ -138,9 +183,18 @@ class AssistantService(FastAPIAssistantService):
     async def lifespan(self) -> AsyncIterator[None]:
         await self.assistant_app.events._on_service_start_handlers(True)
 
+        metrics_log_task: asyncio.Task | None = None
+        if settings.event_handling_metrics_log_interval_seconds > 0:
+            metrics_log_task = asyncio.create_task(self._log_event_handling_metrics())
+
         try:
             yield
         finally:
+            if metrics_log_task is not None:
+                metrics_log_task.cancel()
+                with contextlib.suppress(asyncio.CancelledError):
+                    await metrics_log_task
+
             await self.assistant_app.events._on_service_shutdown_handlers(True)
 
             for task in self._conversation_event_tasks:
@@ -154,21 +208,67 @@ class AssistantService(FastAPIAssistantService):
                 if isinstance(result, Exception):
                     logging.exception("event handling task raised exception", exc_info=result)
 
-    def read_assistant_states(self) -> _PersistedAssistantStates:
-        states = None
-        try:
-            states = read_model(self._assistant_states_path, _PersistedAssistantStates)
-        except FileNotFoundError:
-            pass
-        except ValidationError:
-            logging.warning(
-                "invalid assistant states, returning new state; path: %s", self._assistant_states_path, exc_info=True
+    async def _log_event_handling_metrics(self) -> None:
+        while True:
+            await asyncio.sleep(settings.event_handling_metrics_log_interval_seconds)
+
+            report = self.event_handling_metrics.report()
+            logger.info(
+                "event handling metrics; queued_events: %d, max_queue_depth: %d, active_conversations: %d,"
+                " running_handlers: %d, handled_events: %d",
+                report["queued_events"],
+                report["max_queue_depth"],
+                report["active_conversations"],
+                report["running_handlers"],
+                report["handled_events"],
+                extra={"data": report},
             )
 
-        return states or _PersistedAssistantStates()
+    def _cached_assistant_states(self) -> _PersistedAssistantStates:
+        """
+        Returns the in-memory states, loading them from disk on first use. The returned states must not be mutated.
+        """
+        states = self._assistant_states
+        if states is None:
+            try:
+                states = read_model(self._assistant_states_path, _PersistedAssistantStates)
+            except FileNotFoundError:
+                pass
+            except ValidationError:
+                logging.warning(
+                    "invalid assistant states, returning new state; path: %s",
+                    self._assistant_states_path,
+                    exc_info=True,
+                )
+
+            states = states or _PersistedAssistantStates()
+            self._set_assistant_states(states)
+
+        return states
+
+    def _set_assistant_states(self, states: _PersistedAssistantStates) -> None:
+        self._assistant_states = states
+        self._conversation_states = {
+            (assistant_id, conversation_id): (assistant_state, conversation_state)
+            for assistant_id, assistant_state in states.assistants.items()
+            for conversation_id, conversation_state in assistant_state.conversations.items()
+        }
+
+    def _get_conversation_state(
+        self, assistant_id: str, conversation_id: str
+    ) -> tuple[_AssistantState, _ConversationState] | None:
+        self._cached_assistant_states()
+        return self._conversation_states.get((assistant_id, conversation_id))
+
+    def read_assistant_states(self) -> _PersistedAssistantStates:
+        """
+        Returns a copy of the assistant states, which can be modified and saved with write_assistant_states.
+        """
+        return self._cached_assistant_states().model_copy(deep=True)
 
     def write_assistant_states(self, new_states: _PersistedAssistantStates) -> None:
         write_model(self._assistant_states_path, new_states)
+        self._set_assistant_states(new_states.model_copy(deep=True))
 
     def _build_assistant_context(self, assistant_id: str, template_id: str, assistant_name: str) -> AssistantContext:
         return AssistantContext(
@@ -179,8 +279,7 @@ class AssistantService(FastAPIAssistantService):
         )
 
     def get_assistant_context(self, assistant_id: str) -> AssistantContext | None:
-        states = self.read_assistant_states()
-        assistant_state = states.assistants.get(assistant_id)
+        assistant_state = self._cached_assistant_states().assistants.get(assistant_id)
         if assistant_state is None:
             return None
         return self._build_assistant_context(
@@ -188,13 +287,10 @@ class AssistantService(FastAPIAssistantService):
         )
 
     def get_conversation_context(self, assistant_id: str, conversation_id: str) -> ConversationContext | None:
-        states = self.read_assistant_states()
-        assistant_state = states.assistants.get(assistant_id)
-        if assistant_state is None:
-            return None
-        conversation_state = assistant_state.conversations.get(conversation_id)
-        if conversation_state is None:
+        states = self._get_conversation_state(assistant_id, conversation_id)
+        if states is None:
             return None
+        assistant_state, conversation_state = states
 
         assistant_context = self._build_assistant_context(
             assistant_id, assistant_state.template_id, assistant_state.assistant_name
@@ -277,6 +373,7 @@ class AssistantService(FastAPIAssistantService):
 
         if from_export is not None:
             await self.assistant_app.data_exporter.import_(assistant_context, from_export)
+            self.assistant_app.config_provider.invalidate(assistant_context)
 
         return await self.get_assistant(assistant_id)
 
@@ -318,6 +415,9 @@ class AssistantService(FastAPIAssistantService):
 
         await self.assistant_app.events.assistant._on_deleted_handlers(True, assistant_context)
 
+        # an assistant created again with the same id starts from the default config
+        self.assistant_app.config_provider.invalidate(assistant_context)
+
     @translate_assistant_errors
     async def get_config(self, assistant_id: str) -> assistant_model.ConfigResponseModel:
         assistant_context = require_found(self.get_assistant_context(assistant_id))
@@ -405,42 +505,48 @@ class AssistantService(FastAPIAssistantService):
 
         await self.assistant_app.events.conversation._on_deleted_handlers(True, conversation_context)
 
-    async def _get_or_create_queue(self, assistant_id: str, conversation_id: str) -> asyncio.Queue[_Event]:
+    def _enqueue_event(self, assistant_id: str, conversation_id: str, event: workbench_model.ConversationEvent) -> None:
         key = (assistant_id, conversation_id)
-        async with self._event_queue_lock:
-            queue = self._conversation_event_queues.get(key)
-            if queue is not None:
-                return queue
-
+        queue = self._conversation_event_queues.get(key)
+        if queue is None:
             queue = asyncio.Queue()
             self._conversation_event_queues[key] = queue
-            task = asyncio.create_task(self._forward_events_from_queue(queue))
+            self.event_handling_metrics.active_conversations = len(self._conversation_event_queues)
+
+            task = asyncio.create_task(self._forward_events_from_queue(key, queue))
             self._conversation_event_tasks.add(task)
             task.add_done_callback(self._conversation_event_tasks.discard)
-            return queue
 
-    async def _forward_events_from_queue(self, queue: asyncio.Queue[_Event]) -> NoReturn:
+        queue.put_nowait(_Event(assistant_id=assistant_id, event=event, enqueued_time=time.perf_counter()))
+
+        metrics = self.event_handling_metrics
+        metrics.queued_events += 1
+        metrics.max_queue_depth = max(metrics.max_queue_depth, queue.qsize())
+
+    async def _forward_events_from_queue(self, key: tuple[str, str], queue: asyncio.Queue[_Event]) -> None:
         """
-        De-queues events and makes the call to process_workbench_event.
+        De-queues events for a single conversation, in order, and forwards them to the assistant app. The task ends,
+        and the queue is removed, after the conversation has been idle for the idle timeout.
         """
+        metrics = self.event_handling_metrics
+
         while True:
             try:
-                wrapper = None
                 try:
-                    async with asyncio.timeout(1):
+                    async with asyncio.timeout(settings.conversation_event_queue_idle_timeout_seconds):
                         wrapper = await queue.get()
-                except asyncio.TimeoutError:
+                except TimeoutError:
+                    # no await between the check and the removal, so no event can be enqueued in between
+                    if queue.empty():
+                        if self._conversation_event_queues.get(key) is queue:
+                            del self._conversation_event_queues[key]
+                        metrics.active_conversations = len(self._conversation_event_queues)
+                        metrics.reaped_conversations += 1
+                        return
                     continue
 
-                except RuntimeError as e:
-                    logging.exception("exception in _forward_events_from_queue loop")
-                    if e.args[0] == "Event loop is closed":
-                        break
-
                 queue.task_done()
-
-                if wrapper is None:
-                    continue
+                metrics.queued_events -= 1
 
                 assistant_id = wrapper.assistant_id
                 event = wrapper.event
@@ -453,7 +559,19 @@ class AssistantService(FastAPIAssistantService):
                 if conversation_context is None:
                     continue
 
-                await self._forward_event(conversation_context, event)
+                # limits concurrent handling across conversations; each conversation is handled by this one task,
+                # so its events are still handled in order
+                async with self._event_handler_semaphore:
+                    metrics.running_handlers += 1
+                    start_time = time.perf_counter()
+                    try:
+                        await self._forward_event(conversation_context, event)
+                    finally:
+                        end_time = time.perf_counter()
+                        metrics.running_handlers -= 1
+                        metrics.observe_handler(
+                            handler_seconds=end_time - start_time, queued_seconds=start_time - wrapper.enqueued_time
+                        )
 
             except Exception:
                 logging.exception("exception in _forward_events_from_queue loop")
@@ -468,8 +586,22 @@ class AssistantService(FastAPIAssistantService):
         """
         _ = require_found(self.get_conversation_context(assistant_id, conversation_id))
 
-        queue = await self._get_or_create_queue(assistant_id=assistant_id, conversation_id=conversation_id)
-        await queue.put(_Event(assistant_id=assistant_id, event=event))
+        self._enqueue_event(assistant_id=assistant_id, conversation_id=conversation_id, event=event)
+
+    @translate_assistant_errors
+    async def post_conversation_events(
+        self, assistant_id: str, events: list[workbench_model.ConversationEvent]
+    ) -> None:
+        """
+        Receives a batch of events from semantic workbench and buffers each in its conversation's queue, preserving
+        order within each conversation. Events for unknown assistants or conversations are skipped.
+        """
+        for event in events:
+            conversation_id = str(event.conversation_id)
+            if self._get_conversation_state(assistant_id, conversation_id) is None:
+                continue
+
+            self._enqueue_event(assistant_id=assistant_id, conversation_id=conversation_id, event=event)
 
     async def _forward_event(
         self, conversation_context: ConversationContext, event: workbench_model.ConversationEvent
@@ -34,6 +34,7 @@ from fastapi.responses import FileResponse, JSONResponse, StreamingResponse
 from pydantic import BaseModel, HttpUrl, ValidationError
 from semantic_workbench_api_model import (
     assistant_model,
+    connection_pool,
     workbench_model,
     workbench_service_client,
 )
@@ -80,21 +81,27 @@ class FastAPIAssistantService(ABC):
                 settings.callback_url,
             )
 
-            async with self.workbench_client.for_service() as service_client:
-                # start periodic pings to workbench
-                ping_task = asyncio.create_task(
-                    self._periodically_ping_semantic_workbench(service_client), name="ping-workbench"
-                )
+            connection_pool.configure(settings.http_connection_pool)
 
-                try:
-                    yield
+            try:
+                async with self.workbench_client.for_service() as service_client:
+                    # start periodic pings to workbench
+                    ping_task = asyncio.create_task(
+                        self._periodically_ping_semantic_workbench(service_client), name="ping-workbench"
+                    )
 
-                finally:
-                    ping_task.cancel()
                     try:
-                        await ping_task
-                    except asyncio.CancelledError:
-                        pass
+                        yield
+
+                    finally:
+                        ping_task.cancel()
+                        try:
+                            await ping_task
+                        except asyncio.CancelledError:
+                            pass
+
+            finally:
+                await connection_pool.aclose()
 
         register_lifespan_handler(lifespan)
 
@@ -253,6 +260,22 @@ class FastAPIAssistantService(ABC):
     ) -> None:
         pass
 
+    async def post_conversation_events(
+        self,
+        assistant_id: str,
+        events: list[workbench_model.ConversationEvent],
+    ) -> None:
+        """
+        Receives a batch of events for any of the assistant's conversations. Events for unknown conversations are
+        skipped. Implementations can override this to avoid per-event overhead.
+        """
+        for event in events:
+            try:
+                await self.post_conversation_event(assistant_id, str(event.conversation_id), event)
+            except HTTPException as e:
+                if e.status_code != status.HTTP_404_NOT_FOUND:
+                    raise
+
     @abstractmethod
     async def get_conversation_state_descriptions(
         self, assistant_id: str, conversation_id: str
@@ -354,6 +377,17 @@ def _assistant_service_api(
             case _:
                 raise TypeError(f"Unexpected response type {type(response)}")
 
+    @app.post(
+        "/{assistant_id}/events",
+        description="Notify assistant of a batch of events, in order, across its conversations",
+        status_code=status.HTTP_204_NO_CONTENT,
+    )
+    async def post_conversation_events(
+        assistant_id: str,
+        event_list: workbench_model.ConversationEventList,
+    ) -> None:
+        return await service.post_conversation_events(assistant_id, event_list.events)
+
     @app.get(
         "/{assistant_id}/config",
         description="Get config for this assistant",
@@ -1,5 +1,6 @@
 from pydantic import Field, HttpUrl
 from pydantic_settings import BaseSettings, SettingsConfigDict
+from semantic_workbench_api_model.connection_pool import ConnectionPoolSettings
 
 from semantic_workbench_assistant.logging_config import LoggingSettings
 
@@ -18,6 +19,21 @@ class Settings(BaseSettings):
     workbench_service_api_key: str = ""
     workbench_service_ping_interval_seconds: float = 20.0
 
+    # the queue and task for a conversation's events are removed after the conversation is idle for this long
+    conversation_event_queue_idle_timeout_seconds: float = 300.0
+    # the number of conversation events handled concurrently, across all conversations
+    max_concurrent_conversation_event_handlers: int = 100
+    # the event handling metrics are logged at this interval; 0 disables the log
+    event_handling_metrics_log_interval_seconds: float = 60.0
+
+    # partial message content streamed with ConversationContext.stream_message is coalesced, and sent to the
+    # workbench once this many bytes are pending or the oldest pending content has waited this long
+    message_delta_coalesce_bytes: int = 1_024
+    message_delta_coalesce_seconds: float = 0.1
+
+    # the connection pool shared by all clients of the workbench service
+    http_connection_pool: ConnectionPoolSettings = ConnectionPoolSettings()
+
     assistant_service_id: str | None = None
     assistant_service_name: str | None = None
     assistant_service_description: str | None = None
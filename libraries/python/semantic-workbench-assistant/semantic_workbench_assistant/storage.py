@@ -1,6 +1,7 @@
 import logging
 import os
 import pathlib
+import tempfile
 from typing import Any, Iterator, TypeVar
 
 from pydantic import BaseModel
@@ -15,14 +16,51 @@ class FileStorageSettings(BaseSettings):
     root: str = ".data/files"
 
 
+def _default_file_mode() -> int:
+    """The mode of files created with open(), per the process umask."""
+    # the umask can only be read by setting it
+    umask = os.umask(0o022)
+    os.umask(umask)
+    return 0o666 & ~umask
+
+
+_default_mode = _default_file_mode()
+
+
 def write_model(file_path: os.PathLike, value: BaseModel, serialization_context: dict[str, Any] | None = None) -> None:
-    """Write a pydantic model to a file."""
+    """Write a pydantic model to a file. The file is replaced atomically, so readers never see a partial write."""
     path = pathlib.Path(file_path)
-    if not path.parent.exists():
-        path.parent.mkdir(parents=True)
+    path.parent.mkdir(parents=True, exist_ok=True)
 
     data_json = value.model_dump_json(context=serialization_context)
-    path.write_text(data_json, encoding="utf-8")
+
+    # temporary files are created with mode 0600; the replacement keeps the mode of the file it replaces, or gets the
+    # mode of a newly created file
+    try:
+        mode = path.stat().st_mode & 0o7777
+    except FileNotFoundError:
+        mode = _default_mode
+
+    with tempfile.NamedTemporaryFile(
+        "w", encoding="utf-8", dir=path.parent, prefix=f".{path.name}.", suffix=".tmp", delete=False
+    ) as temp_file:
+        temp_path = pathlib.Path(temp_file.name)
+        try:
+            temp_file.write(data_json)
+            # the content is on disk before the rename is, so a crash cannot leave an empty or partial file in place
+            temp_file.flush()
+            os.fsync(temp_file.fileno())
+        except BaseException:
+            temp_file.close()
+            temp_path.unlink(missing_ok=True)
+            raise
+
+    try:
+        os.chmod(temp_path, mode)
+        os.replace(temp_path, path)
+    except BaseException:
+        temp_path.unlink(missing_ok=True)
+        raise
 
 
 ModelT = TypeVar("ModelT", bound=BaseModel)
@@ -1,6 +1,8 @@
 import asyncio
 import datetime
 import io
+import json
+import logging
 import pathlib
 import random
 import shutil
@@ -14,6 +16,7 @@ import httpx
 import pytest
 import semantic_workbench_api_model
 import semantic_workbench_api_model.assistant_service_client
+import semantic_workbench_assistant.assistant_app.service
 from asgi_lifespan import LifespanManager
 from fastapi import HTTPException
 from pydantic import BaseModel
@@ -37,6 +40,7 @@ from semantic_workbench_assistant.assistant_app import (
 )
 from semantic_workbench_assistant.assistant_app.context import storage_directory_for_context
 from semantic_workbench_assistant.assistant_app.service import (
+    AssistantService,
     translate_assistant_errors,
 )
 from semantic_workbench_assistant.config import (
@@ -227,6 +231,260 @@ async def test_assistant_with_event_handlers(
         assert message_created_all_calls == 3
 
 
+async def test_assistant_with_batched_events(
+    monkeypatch: pytest.MonkeyPatch, storage_settings: storage.FileStorageSettings
+) -> None:
+    monkeypatch.setattr(settings, "storage", storage_settings)
+
+    app = AssistantApp(
+        assistant_service_id="assistant_id",
+        assistant_service_name="service name",
+        assistant_service_description="service description",
+    )
+
+    received_contents: list[str] = []
+
+    @app.events.conversation.message.chat.on_created
+    async def on_chat_message(
+        conversation_context: ConversationContext,
+        _: workbench_model.ConversationEvent,
+        message: workbench_model.ConversationMessage,
+    ) -> None:
+        received_contents.append(message.content)
+
+    service = app.fastapi_app()
+
+    monkeypatch.setattr(assistant_service_client, "httpx_transport_factory", lambda: httpx.ASGITransport(app=service))
+    monkeypatch.setattr(workbench_service_client, "httpx_transport_factory", lambda: AllOKTransport())
+
+    async with LifespanManager(service):
+        assistant_id = uuid.uuid4()
+        client_builder = assistant_service_client.AssistantServiceClientBuilder("https://fake", "")
+        instance_client = client_builder.for_assistant(assistant_id)
+
+        await client_builder.for_service().put_assistant(
+            assistant_id=assistant_id,
+            request=assistant_model.AssistantPutRequestModel(assistant_name="my assistant", template_id="default"),
+            from_export=None,
+        )
+
+        conversation_id = uuid.uuid4()
+        await instance_client.put_conversation(
+            request=assistant_model.ConversationPutRequestModel(id=str(conversation_id), title="My conversation"),
+            from_export=None,
+        )
+
+        def message_event(conversation_id: uuid.UUID, content: str) -> workbench_model.ConversationEvent:
+            return workbench_model.ConversationEvent(
+                conversation_id=conversation_id,
+                correlation_id="",
+                event=workbench_model.ConversationEventType.message_created,
+                data={
+                    "message": workbench_model.ConversationMessage(
+                        id=uuid.uuid4(),
+                        sender=workbench_model.MessageSender(
+                            participant_role=workbench_model.ParticipantRole.user, participant_id="user"
+                        ),
+                        message_type=workbench_model.MessageType.chat,
+                        timestamp=datetime.datetime.now(),
+                        content_type="text/plain",
+                        content=content,
+                        filenames=[],
+                        metadata={},
+                        has_debug_data=False,
+                    ).model_dump(mode="json")
+                },
+            )
+
+        # events for unknown conversations are skipped, the rest are handled in order
+        await instance_client.post_conversation_events(
+            events=[
+                message_event(conversation_id, "one"),
+                message_event(uuid.uuid4(), "unknown"),
+                message_event(conversation_id, "two"),
+                message_event(conversation_id, "three"),
+            ]
+        )
+
+        async with asyncio.timeout(5):
+            while len(received_contents) < 3:
+                await asyncio.sleep(0.01)
+
+        assert received_contents == ["one", "two", "three"]
+
+
+async def test_assistant_states_are_cached_and_written_through(
+    monkeypatch: pytest.MonkeyPatch, storage_settings: storage.FileStorageSettings
+) -> None:
+    monkeypatch.setattr(settings, "storage", storage_settings)
+
+    def create_service() -> AssistantService:
+        app = AssistantApp(
+            assistant_service_id="assistant_id",
+            assistant_service_name="service name",
+            assistant_service_description="service description",
+        )
+        return AssistantService(assistant_app=app, register_lifespan_handler=lambda _: None)
+
+    read_model_spy = mock.Mock(wraps=storage.read_model)
+    monkeypatch.setattr(semantic_workbench_assistant.assistant_app.service, "read_model", read_model_spy)
+
+    service = create_service()
+    assistant_id = str(uuid.uuid4())
+    conversation_id = str(uuid.uuid4())
+
+    await service.put_assistant(
+        assistant_id, assistant_model.AssistantPutRequestModel(assistant_name="my assistant", template_id="default")
+    )
+    await service.put_conversation(
+        assistant_id, conversation_id, assistant_model.ConversationPutRequestModel(id=conversation_id, title="title")
+    )
+
+    for _ in range(10):
+        assert service.get_conversation_context(assistant_id, conversation_id) is not None
+    assert service.get_conversation_context(assistant_id, str(uuid.uuid4())) is None
+
+    # the states are read from disk once
+    assert read_model_spy.call_count == 1
+
+    # modifying a copy of the states does not change the cached states
+    states = service.read_assistant_states()
+    states.assistants.clear()
+    assert service.get_assistant_context(assistant_id) is not None
+
+    # a new service reads the written states
+    reloaded_context = create_service().get_conversation_context(assistant_id, conversation_id)
+    assert reloaded_context is not None
+    assert reloaded_context.title == "title"
+
+    await service.delete_conversation(assistant_id, conversation_id)
+    assert service.get_conversation_context(assistant_id, conversation_id) is None
+    assert create_service().get_conversation_context(assistant_id, conversation_id) is None
+
+
+async def test_conversation_event_handling_is_bounded_and_reaped(
+    monkeypatch: pytest.MonkeyPatch, storage_settings: storage.FileStorageSettings
+) -> None:
+    monkeypatch.setattr(settings, "storage", storage_settings)
+    monkeypatch.setattr(settings, "conversation_event_queue_idle_timeout_seconds", 0.1)
+    monkeypatch.setattr(settings, "max_concurrent_conversation_event_handlers", 2)
+    monkeypatch.setattr(workbench_service_client, "httpx_transport_factory", lambda: AllOKTransport())
+
+    app = AssistantApp(
+        assistant_service_id="assistant_id",
+        assistant_service_name="service name",
+        assistant_service_description="service description",
+    )
+
+    running = 0
+    max_running = 0
+    handled: dict[str, list[str]] = {}
+
+    @app.events.conversation.message.chat.on_created
+    async def on_chat_message(
+        conversation_context: ConversationContext,
+        _: workbench_model.ConversationEvent,
+        message: workbench_model.ConversationMessage,
+    ) -> None:
+        nonlocal running, max_running
+        running += 1
+        max_running = max(max_running, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        handled.setdefault(conversation_context.id, []).append(message.content)
+
+    service = AssistantService(assistant_app=app, register_lifespan_handler=lambda _: None)
+
+    assistant_id = str(uuid.uuid4())
+    await service.put_assistant(
+        assistant_id, assistant_model.AssistantPutRequestModel(assistant_name="my assistant", template_id="default")
+    )
+
+    conversation_ids = [str(uuid.uuid4()) for _ in range(5)]
+    for conversation_id in conversation_ids:
+        await service.put_conversation(
+            assistant_id, conversation_id, assistant_model.ConversationPutRequestModel(id=conversation_id, title="")
+        )
+
+    contents = [str(index) for index in range(3)]
+    for content in contents:
+        for conversation_id in conversation_ids:
+            await service.post_conversation_event(
+                assistant_id,
+                conversation_id,
+                workbench_model.ConversationEvent(
+                    conversation_id=uuid.UUID(conversation_id),
+                    event=workbench_model.ConversationEventType.message_created,
+                    data={
+                        "message": workbench_model.ConversationMessage(
+                            id=uuid.uuid4(),
+                            sender=workbench_model.MessageSender(
+                                participant_role=workbench_model.ParticipantRole.user, participant_id="user"
+                            ),
+                            message_type=workbench_model.MessageType.chat,
+                            timestamp=datetime.datetime.now(),
+                            content_type="text/plain",
+                            content=content,
+                            filenames=[],
+                            metadata={},
+                            has_debug_data=False,
+                        ).model_dump(mode="json")
+                    },
+                ),
+            )
+
+    metrics = service.event_handling_metrics
+    assert metrics.active_conversations == len(conversation_ids)
+    assert metrics.queued_events == len(conversation_ids) * len(contents)
+
+    # the tasks end once their conversations are idle
+    async with asyncio.timeout(5):
+        while metrics.active_conversations > 0:
+            await asyncio.sleep(0.01)
+
+    assert handled == {conversation_id: contents for conversation_id in conversation_ids}
+    assert max_running == 2
+    assert metrics.queued_events == 0
+    assert metrics.handled_events == len(conversation_ids) * len(contents)
+    assert metrics.reaped_conversations == len(conversation_ids)
+    assert metrics.handler_seconds_max >= 0.01
+    assert not service._conversation_event_tasks
+
+    # the peaks are reset each time the metrics are reported
+    report = metrics.report()
+    assert report["max_queue_depth"] == len(contents)
+    assert report["queued_events"] == 0
+    assert metrics.max_queue_depth == 0
+    assert metrics.handler_seconds_max == 0.0
+    assert metrics.handled_events == len(conversation_ids) * len(contents)
+
+
+async def test_event_handling_metrics_are_logged(
+    monkeypatch: pytest.MonkeyPatch, storage_settings: storage.FileStorageSettings, caplog: pytest.LogCaptureFixture
+) -> None:
+    monkeypatch.setattr(settings, "storage", storage_settings)
+    monkeypatch.setattr(settings, "event_handling_metrics_log_interval_seconds", 0.01)
+
+    app = AssistantApp(
+        assistant_service_id="assistant_id",
+        assistant_service_name="service name",
+        assistant_service_description="service description",
+    )
+    service = AssistantService(assistant_app=app, register_lifespan_handler=lambda _: None)
+    service.event_handling_metrics.queued_events = 3
+    service.event_handling_metrics.max_queue_depth = 2
+
+    with caplog.at_level(logging.INFO, logger="semantic_workbench_assistant.assistant_app.service"):
+        async with service.lifespan():
+            await asyncio.sleep(0.05)
+
+    reports = [record for record in caplog.records if record.message.startswith("event handling metrics")]
+    assert reports
+    assert reports[0].data["queued_events"] == 3
+    assert reports[0].data["max_queue_depth"] == 2
+    assert reports[-1].data["max_queue_depth"] == 0
+
+
 async def test_assistant_with_inspector(
     monkeypatch: pytest.MonkeyPatch, storage_settings: storage.FileStorageSettings
 ) -> None:
@@ -391,7 +649,8 @@ async def test_assistant_with_config_provider(
         test_key: str = "test_value"
         secret_field: ConfigSecretStr = "secret_default"
 
-    config_provider = BaseModelAssistantConfig(TestConfigModel).provider
+    assistant_config = BaseModelAssistantConfig(TestConfigModel)
+    config_provider = assistant_config.provider
     # wrap the provider so we can check calls to it
     config_provider_wrapper = mock.Mock(wraps=config_provider)
 
@@ -505,6 +764,11 @@ async def test_assistant_with_config_provider(
 
         assert e.value.status_code == 400
 
+        # deleting the assistant drops its cached config
+        assert str(assistant_id) in assistant_config._cache
+        await service_client.delete_assistant(assistant_id)
+        assert str(assistant_id) not in assistant_config._cache
+
 
 async def test_file_system_storage_state_data_provider_to_empty_dir(
     storage_settings: storage.FileStorageSettings, monkeypatch: pytest.MonkeyPatch
@@ -657,3 +921,45 @@ async def test_translate_assistant_errors(
 
     if isinstance(exc_info.value, HTTPException):
         assert exc_info.value.status_code == expected_status_code
+
+
+async def test_stream_message_coalesces_deltas(monkeypatch: pytest.MonkeyPatch) -> None:
+    sent_deltas: list[tuple[str, str]] = []
+
+    class RecordingTransport(httpx.AsyncBaseTransport):
+        async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+            await request.aread()
+            sent_deltas.append((request.url.path, json.loads(request.content)["content"]))
+            return httpx.Response(204)
+
+    monkeypatch.setattr(workbench_service_client, "httpx_transport_factory", RecordingTransport)
+    monkeypatch.setattr(settings, "message_delta_coalesce_bytes", 10)
+    monkeypatch.setattr(settings, "message_delta_coalesce_seconds", 0.05)
+
+    conversation_id = str(uuid.uuid4())
+    conversation_context = ConversationContext(
+        id=conversation_id,
+        title="conversation",
+        assistant=AssistantContext(id=str(uuid.uuid4()), name="assistant", _assistant_service_id="service-id"),
+    )
+
+    async with conversation_context.stream_message() as stream:
+        path = f"/conversations/{conversation_id}/messages/{stream.message_id}/deltas"
+
+        # sent once the pending content reaches the byte threshold
+        await stream.append("hello")
+        assert sent_deltas == []
+        await stream.append(" world")
+        assert sent_deltas == [(path, "hello world")]
+
+        # or once it has waited for the coalescing interval
+        await stream.append("!")
+        await asyncio.sleep(0.2)
+        assert sent_deltas == [(path, "hello world"), (path, "!")]
+
+        # pending content is discarded when the stream closes, as the message carries it
+        await stream.append(" bye")
+
+    await asyncio.sleep(0.1)
+    assert sent_deltas == [(path, "hello world"), (path, "!")]
+    assert stream.content == "hello world! bye"
@@ -1,8 +1,11 @@
 import uuid
 from typing import Annotated, Literal
+from unittest import mock
 
 import pytest
 from pydantic import BaseModel
+from semantic_workbench_assistant import settings, storage
+from semantic_workbench_assistant.assistant_app import AssistantContext, BaseModelAssistantConfig
 from semantic_workbench_assistant.config import (
     ConfigSecretStr,
     ConfigSecretStrJsonSerializationMode,
@@ -171,3 +174,50 @@ def test_list_items() -> None:
             }
         },
     }
+
+
+async def test_assistant_config_cache(
+    monkeypatch: pytest.MonkeyPatch, storage_settings: storage.FileStorageSettings
+) -> None:
+    monkeypatch.setattr(settings, "storage", storage_settings)
+    read_model_spy = mock.Mock(wraps=storage.read_model)
+    monkeypatch.setattr("semantic_workbench_assistant.assistant_app.config.read_model", read_model_spy)
+
+    class TestConfigModel(BaseModel):
+        prompt: str = "default-prompt"
+
+    assistant_config = BaseModelAssistantConfig(TestConfigModel)
+    assistant_context = AssistantContext(
+        id=str(uuid.uuid4()), name="assistant", _assistant_service_id="assistant-service-id", _template_id="default"
+    )
+
+    await assistant_config._set(assistant_context, TestConfigModel(prompt="first-prompt"))
+    assert (await assistant_config.get(assistant_context)).prompt == "first-prompt"
+    assert (await assistant_config.get(assistant_context)).prompt == "first-prompt"
+    assert read_model_spy.call_count == 1
+
+    # callers get copies of the cached config
+    config = await assistant_config.get(assistant_context)
+    config.prompt = "modified-prompt"
+    assert (await assistant_config.get(assistant_context)).prompt == "first-prompt"
+
+    # setting the config invalidates the cache
+    await assistant_config._set(assistant_context, TestConfigModel(prompt="second-prompt"))
+    assert (await assistant_config.get(assistant_context)).prompt == "second-prompt"
+    assert read_model_spy.call_count == 2
+
+    # changes made outside the process are read when the file changes
+    storage.write_model(assistant_config._private_path_for(assistant_context), TestConfigModel(prompt="edited-prompt"))
+    assert (await assistant_config.get(assistant_context)).prompt == "edited-prompt"
+    assert read_model_spy.call_count == 3
+
+    # without the check, only invalidation reads the file again
+    assistant_config = BaseModelAssistantConfig(TestConfigModel, check_for_changes=False)
+    assert (await assistant_config.get(assistant_context)).prompt == "edited-prompt"
+    storage.write_model(
+        assistant_config._private_path_for(assistant_context), TestConfigModel(prompt="imported-prompt")
+    )
+    assert (await assistant_config.get(assistant_context)).prompt == "edited-prompt"
+
+    assistant_config.provider.invalidate(assistant_context)
+    assert (await assistant_config.get(assistant_context)).prompt == "imported-prompt"
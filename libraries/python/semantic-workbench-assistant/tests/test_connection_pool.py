@@ -0,0 +1,127 @@
+import asyncio
+import logging
+import time
+from typing import AsyncIterator
+from unittest import mock
+
+import httpx
+import pytest
+from semantic_workbench_api_model import connection_pool, workbench_service_client
+
+logger = logging.getLogger(__name__)
+
+
+class _KeepAliveServer:
+    """
+    Minimal HTTP/1.1 server that answers every request with an empty 200 and counts the connections it accepts.
+    """
+
+    def __init__(self) -> None:
+        self.connection_count = 0
+        self.url = ""
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.connection_count += 1
+        try:
+            while True:
+                await reader.readuntil(b"\r\n\r\n")
+                writer.write(b"HTTP/1.1 200 OK\r\ncontent-length: 2\r\ncontent-type: application/json\r\n\r\n{}")
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionResetError):
+            pass
+        finally:
+            writer.close()
+
+    async def __aenter__(self) -> "_KeepAliveServer":
+        self._server = await asyncio.start_server(self._handle, host="127.0.0.1", port=0)
+        host, port = self._server.sockets[0].getsockname()[:2]
+        self.url = f"http://{host}:{port}"
+        return self
+
+    async def __aexit__(self, *args) -> None:
+        self._server.close()
+
+
+@pytest.fixture
+async def server() -> AsyncIterator[_KeepAliveServer]:
+    async with _KeepAliveServer() as server:
+        yield server
+    await connection_pool.aclose()
+
+
+async def test_clients_share_pooled_connections(server: _KeepAliveServer) -> None:
+    builder = workbench_service_client.WorkbenchServiceClientBuilder(
+        base_url=server.url, assistant_service_id="service", api_key=""
+    )
+
+    for _ in range(10):
+        # every call creates, and closes, its own client
+        async with builder._client() as client:
+            response = await client.get("/")
+            assert response.status_code == 200
+
+    assert server.connection_count == 1
+
+    await connection_pool.aclose()
+
+    async with builder._client() as client:
+        await client.get("/")
+
+    assert server.connection_count == 2
+
+
+async def test_pooled_request_latency(server: _KeepAliveServer) -> None:
+    """
+    Compares the latency of sequential requests made with a new transport per request, as the clients did before
+    the shared pool, with requests made through the shared pool.
+    """
+    request_count = 100
+
+    async def measure(transport_factory) -> float:
+        start = time.perf_counter()
+        for _ in range(request_count):
+            async with httpx.AsyncClient(transport=transport_factory(), base_url=server.url) as client:
+                await client.get("/")
+        return (time.perf_counter() - start) / request_count
+
+    per_request_latency = await measure(lambda: httpx.AsyncHTTPTransport(retries=3))
+    per_request_connections = server.connection_count
+
+    pooled_latency = await measure(connection_pool.shared_transport)
+    pooled_connections = server.connection_count - per_request_connections
+
+    logger.warning(
+        "request latency; new transport per request: %.3fms (%d connections), shared pool: %.3fms (%d connections)",
+        per_request_latency * 1000,
+        per_request_connections,
+        pooled_latency * 1000,
+        pooled_connections,
+    )
+
+    assert per_request_connections == request_count
+    assert pooled_connections == 1
+
+
+async def test_pool_replaced_on_another_event_loop_is_closed(monkeypatch: pytest.MonkeyPatch) -> None:
+    transports: list[mock.Mock] = []
+
+    def create_transport() -> mock.Mock:
+        transport = mock.Mock(spec=httpx.AsyncHTTPTransport)
+        transport.aclose = mock.AsyncMock()
+        transports.append(transport)
+        return transport
+
+    monkeypatch.setattr(connection_pool, "_create_transport", create_transport)
+
+    async def use_pool() -> None:
+        connection_pool.shared_transport()
+
+    # first used on another event loop, then on this one
+    await asyncio.to_thread(asyncio.run, use_pool())
+    connection_pool.shared_transport()
+    assert len(transports) == 2
+    transports[0].aclose.assert_not_awaited()
+
+    await connection_pool.aclose()
+    for transport in transports:
+        transport.aclose.assert_awaited_once()
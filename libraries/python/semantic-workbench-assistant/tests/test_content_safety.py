@@ -0,0 +1,121 @@
+import uuid
+from unittest import mock
+
+from pydantic import BaseModel
+from semantic_workbench_api_model import workbench_model
+from semantic_workbench_assistant.assistant_app import (
+    AssistantContext,
+    ContentSafety,
+    ContentSafetyEvaluation,
+    ContentSafetyEvaluationResult,
+    ConversationContext,
+)
+
+
+def _context() -> ConversationContext:
+    return ConversationContext(
+        id=str(uuid.uuid4()),
+        title="conversation",
+        assistant=AssistantContext(
+            id="assistant-id",
+            name="assistant",
+            _assistant_service_id="assistant-service-id",
+            _template_id="",
+        ),
+    )
+
+
+def _message_created_event(content: str) -> workbench_model.ConversationEvent:
+    return workbench_model.ConversationEvent(
+        conversation_id=uuid.uuid4(),
+        event=workbench_model.ConversationEventType.message_created,
+        data={
+            "message": {
+                "content": content,
+                "filenames": ["notes.txt"],
+                "metadata": {"debug": {"payload": "not user-visible"}},
+            },
+        },
+    )
+
+
+class RecordingEvaluator:
+    def __init__(self, result: ContentSafetyEvaluationResult = ContentSafetyEvaluationResult.Pass) -> None:
+        self.result = result
+        self.evaluated: list[str | list[str]] = []
+
+    async def evaluate(self, content: str | list[str]) -> ContentSafetyEvaluation:
+        self.evaluated.append(content)
+        return ContentSafetyEvaluation(result=self.result)
+
+
+async def test_content_safety_evaluates_user_visible_content() -> None:
+    evaluator = RecordingEvaluator()
+    content_safety = ContentSafety(mock.AsyncMock(return_value=evaluator))
+
+    event = await content_safety.intercept_incoming_event(_context(), _message_created_event("hello"))
+
+    assert event is not None
+    assert evaluator.evaluated == [["hello", "notes.txt"]]
+
+
+async def test_content_safety_caches_verdicts() -> None:
+    evaluator = RecordingEvaluator()
+    content_safety = ContentSafety(mock.AsyncMock(return_value=evaluator))
+    context = _context()
+
+    await content_safety.intercept_incoming_event(context, _message_created_event("hello"))
+    # the same content, posted again, is not evaluated again
+    event = await content_safety.intercept_incoming_event(context, _message_created_event("hello"))
+    assert event is not None
+    assert event.data["content_safety"]["intercept_incoming_event"]["evaluation"]["metadata"] == {"cached": True}
+    await content_safety.intercept_incoming_event(context, _message_created_event("goodbye"))
+
+    assert evaluator.evaluated == [["hello", "notes.txt"], ["goodbye", "notes.txt"]]
+
+    # with no time to live, verdicts are not cached
+    content_safety.verdict_cache_ttl = 0
+    content_safety._verdicts.clear()
+    await content_safety.intercept_incoming_event(context, _message_created_event("hello"))
+    await content_safety.intercept_incoming_event(context, _message_created_event("hello"))
+
+    assert evaluator.evaluated[2:] == [["hello", "notes.txt"], ["hello", "notes.txt"]]
+
+
+class ThresholdConfig(BaseModel):
+    fail_at_severity: int = 4
+
+
+class ConfiguredEvaluator(RecordingEvaluator):
+    def __init__(self, config: ThresholdConfig) -> None:
+        super().__init__()
+        self.config = config
+
+
+async def test_content_safety_verdicts_depend_on_evaluator_config() -> None:
+    evaluator = ConfiguredEvaluator(ThresholdConfig())
+    content_safety = ContentSafety(mock.AsyncMock(side_effect=lambda _: evaluator))
+    context = _context()
+
+    await content_safety.intercept_incoming_event(context, _message_created_event("hello"))
+    await content_safety.intercept_incoming_event(context, _message_created_event("hello"))
+    assert evaluator.evaluated == [["hello", "notes.txt"]]
+
+    # once the evaluator configuration changes, the cached verdict no longer applies
+    evaluator.config = ThresholdConfig(fail_at_severity=2)
+    await content_safety.intercept_incoming_event(context, _message_created_event("hello"))
+    await content_safety.intercept_incoming_event(context, _message_created_event("hello"))
+    assert evaluator.evaluated == [["hello", "notes.txt"], ["hello", "notes.txt"]]
+
+
+async def test_content_safety_does_not_cache_failures() -> None:
+    evaluator = RecordingEvaluator(ContentSafetyEvaluationResult.Fail)
+    content_safety = ContentSafety(mock.AsyncMock(return_value=evaluator))
+    context = mock.MagicMock(wraps=_context())
+    context.assistant.id = "assistant-id"
+    context.send_messages = mock.AsyncMock()
+
+    assert await content_safety.intercept_incoming_event(context, _message_created_event("unsafe")) is None
+    assert await content_safety.intercept_incoming_event(context, _message_created_event("unsafe")) is None
+
+    assert len(evaluator.evaluated) == 2
@@ -57,3 +57,37 @@ def test_write_read_updated_model():
             storage.read_model(value_path, TestModelBreaking)
 
         assert storage.read_model(value_path, TestModelSupportsOldName) == TestModelSupportsOldName(name_new="test")
+
+
+def test_write_model_replaces_file():
+    class TestModel(BaseModel):
+        name: str
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        value_path = Path(temp_dir) / "sub" / "model.json"
+        storage.write_model(file_path=value_path, value=TestModel(name="first"))
+        storage.write_model(file_path=value_path, value=TestModel(name="second"))
+
+        assert storage.read_model(value_path, TestModel) == TestModel(name="second")
+        # no temporary files are left behind
+        assert [path.name for path in value_path.parent.iterdir()] == ["model.json"]
+
+
+def test_write_model_file_mode():
+    class TestModel(BaseModel):
+        name: str
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        value_path = Path(temp_dir) / "model.json"
+
+        # a new file gets the mode of files created with open(), rather than that of temporary files
+        open_path = Path(temp_dir) / "open.json"
+        open_path.write_text("")
+        storage.write_model(file_path=value_path, value=TestModel(name="first"))
+        assert value_path.stat().st_mode == open_path.stat().st_mode
+
+        # a replaced file keeps its mode
+        value_path.chmod(0o640)
+        storage.write_model(file_path=value_path, value=TestModel(name="second"))
+        assert value_path.stat().st_mode & 0o777 == 0o640
+        assert storage.read_model(value_path, TestModel) == TestModel(name="second")
@@ -204,6 +204,10 @@ class Engine:
                 self._emit(StatusUpdatedEvent())
                 logger.debug("Routine paused for ask_user.", extra_data({"prompt": prompt}))
 
+                # persist the routine state while the routine waits for the user
+                await self.routine_stack.set_current_state(routine_stack_state)
+                await self.routine_stack.flush()
+
                 # Create new input future
                 self._current_input_future = asyncio.Future()
                 return await self._current_input_future
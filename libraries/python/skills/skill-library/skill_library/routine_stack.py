@@ -1,5 +1,6 @@
 # skill_library/routine_stack.py
 
+import io
 from contextlib import asynccontextmanager
 from typing import Any, AsyncGenerator, List
 from uuid import uuid4
@@ -46,53 +47,100 @@ class RoutineStack:
     State is persisted between messages/steps in the conversation, allowing
     routines to maintain context even when paused waiting for user input. When
     routines call other routines, each gets its own isolated state frame.
+
+    The stack is held in memory and written behind: push, pop, set and clear
+    persist it, as they mark routine boundaries, while state updates are
+    persisted by the next boundary or call to flush() (such as when a routine
+    waits for user input). Only frames that changed since they were last
+    persisted are serialized again.
     """
 
     def __init__(self, drive: Drive):
         self.drive = drive
+        self._frames: List[RoutineFrame] | None = None
+        self._dirty = False
+        # the serialized JSON of frames, by frame id, as of when they were last persisted
+        self._serialized_frames: dict[str, str] = {}
+
+    def _loaded_frames(self) -> List[RoutineFrame]:
+        if self._frames is None:
+            try:
+                self._frames = self.drive.read_model(RoutineStackData, STACK_FILENAME).frames
+            except FileNotFoundError:
+                self._frames = []
+                self._dirty = True
+        return self._frames
+
+    def _mark_dirty(self, frame: RoutineFrame | None = None) -> None:
+        self._dirty = True
+        if frame is not None:
+            self._serialized_frames.pop(frame.id, None)
+
+    async def flush(self) -> None:
+        """Persists the stack, if it changed since it was last persisted."""
+        frames = self._loaded_frames()
+        if not self._dirty:
+            return
+
+        serialized_frames: dict[str, str] = {}
+        for frame in frames:
+            serialized_frame = self._serialized_frames.get(frame.id)
+            if serialized_frame is None:
+                serialized_frame = frame.model_dump_json()
+            serialized_frames[frame.id] = serialized_frame
+
+        # equivalent to RoutineStackData(frames=frames).model_dump_json(), reusing the JSON of unchanged frames
+        data = '{"frames":[' + ",".join(serialized_frames[frame.id] for frame in frames) + "]}"
+        self.drive.write(
+            io.BytesIO(data.encode("utf-8")),
+            STACK_FILENAME,
+            if_exists=IfDriveFileExistsBehavior.OVERWRITE,
+        )
+        self._serialized_frames = serialized_frames
+        self._dirty = False
 
     async def get(self) -> List[RoutineFrame]:
-        try:
-            stack = self.drive.read_model(RoutineStackData, STACK_FILENAME)
-        except FileNotFoundError:
-            stack = RoutineStackData(frames=[])
-            await self.set(stack.frames)
-        return stack.frames
+        frames = self._loaded_frames()
+        if self._dirty and not frames:
+            # persist the empty stack on first use, as before the stack was held in memory
+            await self.flush()
+        return list(frames)
 
     async def push(self, name: str) -> str:
-        stack = await self.get()
         frame = RoutineFrame(name=name)
-        stack.append(frame)
-        await self.set(stack)
+        self._loaded_frames().append(frame)
+        self._mark_dirty(frame)
+        await self.flush()
         return frame.id
 
     async def pop(self) -> RoutineFrame | None:
-        stack = await self.get()
-        if not stack:
+        frames = self._loaded_frames()
+        if not frames:
             return None
-        frame = stack.pop()
-        await self.set(stack)
+        frame = frames.pop()
+        self._mark_dirty(frame)
+        await self.flush()
         return frame
 
     async def peek(self) -> RoutineFrame | None:
-        stack = await self.get()
-        if not stack:
+        frames = self._loaded_frames()
+        if not frames:
             return None
-        return stack[-1]
+        return frames[-1]
 
     async def update(self, frame: RoutineFrame) -> None:
         """Updates the top frame in the stack."""
-        stack = await self.get()
-        stack[-1] = frame
-        await self.set(stack)
+        frames = self._loaded_frames()
+        self._mark_dirty(frames[-1])
+        frames[-1] = frame
+        self._mark_dirty(frame)
 
     async def set(self, frames: List[RoutineFrame]) -> None:
         """Replaces the stack with the given list of frames."""
-        self.drive.write_model(
-            RoutineStackData(frames=frames),
-            STACK_FILENAME,
-            if_exists=IfDriveFileExistsBehavior.OVERWRITE,
-        )
+        self._frames = list(frames)
+        self._serialized_frames = {}
+        self._dirty = True
+        await self.flush()
 
     async def get_current_state(self) -> dict[str, Any]:
         """Returns the state of the current routine."""
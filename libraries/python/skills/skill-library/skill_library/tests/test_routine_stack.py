@@ -1,13 +1,9 @@
 from assistant_drive import Drive, DriveConfig, IfDriveFileExistsBehavior
-from skill_library.routine_stack import RoutineStack
+from skill_library.routine_stack import STACK_FILENAME, RoutineStack, RoutineStackData
 
 
 async def test_routine_stack():
-    drive = Drive(
-        DriveConfig(
-            root=".data/test", default_if_exists_behavior=IfDriveFileExistsBehavior.OVERWRITE
-        )
-    )
+    drive = Drive(DriveConfig(root=".data/test", default_if_exists_behavior=IfDriveFileExistsBehavior.OVERWRITE))
     stack = RoutineStack(drive)
 
     await stack.clear()
@@ -54,3 +50,31 @@ async def test_routine_stack():
     # Test pop empty
     frame = await stack.pop()
     assert not frame
+
+
+async def test_routine_stack_writes_behind(tmp_path):
+    drive = Drive(DriveConfig(root=str(tmp_path), default_if_exists_behavior=IfDriveFileExistsBehavior.OVERWRITE))
+    stack = RoutineStack(drive)
+
+    outer_frame_id = await stack.push("outer")
+    await stack.push("inner")
+
+    # state updates are held in memory until the stack is flushed
+    await stack.set_current_state_key("key", "value")
+    assert await RoutineStack(drive).get_current_state() == {}
+    assert await stack.get_current_state_key("key") == "value"
+
+    await stack.flush()
+    assert await RoutineStack(drive).get_current_state() == {"key": "value"}
+
+    # routine boundaries persist the stack
+    await stack.pop()
+    frames = await RoutineStack(drive).get()
+    assert [frame.id for frame in frames] == [outer_frame_id]
+
+    # the persisted stack matches the stack serialized as a whole
+    await stack.set_current_state({"outer": "state"})
+    await stack.push("next")
+    assert drive.read_model(RoutineStackData, STACK_FILENAME) == RoutineStackData(frames=await stack.get())
+    with drive.open_file(STACK_FILENAME) as file:
+        assert file.read().decode("utf-8") == RoutineStackData(frames=await stack.get()).model_dump_json()
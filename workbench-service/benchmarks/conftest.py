@@ -0,0 +1,221 @@
+import uuid
+from dataclasses import dataclass
+from typing import AsyncIterator
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from pydantic import HttpUrl
+from semantic_workbench_api_model import workbench_model, workbench_service_client
+from semantic_workbench_service.config import DBSettings
+
+from tests import conftest as tests_conftest
+from tests.conftest import (  # noqa: F401 - fixtures shared with the tests
+    db_settings,
+    db_type,
+    docker_compose_file,
+    echo_sql,
+    storage_settings,
+    storage_type,
+    test_user,
+    workbench_service,
+)
+from tests.types import MockUser
+
+from .harness import BenchmarkReport, BenchmarkResult, serve
+from .stub_assistant_service import StubAssistantService
+
+_report_key = pytest.StashKey[BenchmarkReport]()
+
+
+def pytest_addoption(parser: pytest.Parser) -> None:
+    tests_conftest.pytest_addoption(parser)
+
+    env_var = tests_conftest.env_var
+    parser.addoption(
+        "--benchmark-scale",
+        action="store",
+        type=float,
+        help="multiplier for the number of operations in each workload",
+        default=float(env_var("WORKBENCH_BENCHMARK_SCALE") or 1.0),
+    )
+    parser.addoption(
+        "--benchmark-messages",
+        action="store",
+        type=int,
+        help="number of messages in the conversation that is paged through, e.g. 1000000",
+        default=int(env_var("WORKBENCH_BENCHMARK_MESSAGES") or 10_000),
+    )
+    parser.addoption(
+        "--benchmark-subscribers",
+        action="store",
+        type=int,
+        help="number of SSE subscribers to fan conversation events out to",
+        default=int(env_var("WORKBENCH_BENCHMARK_SUBSCRIBERS") or 100),
+    )
+    parser.addoption(
+        "--benchmark-baseline",
+        action="store",
+        help="path of the results of a previous run (see --benchmark-save) to check for regressions against",
+        default=env_var("WORKBENCH_BENCHMARK_BASELINE"),
+    )
+    parser.addoption(
+        "--benchmark-tolerance",
+        action="store",
+        type=float,
+        help="fractional regression in throughput or p99 latency, against the baseline, that fails a benchmark",
+        default=float(env_var("WORKBENCH_BENCHMARK_TOLERANCE") or 0.25),
+    )
+    parser.addoption(
+        "--benchmark-save",
+        action="store",
+        help="path to save the results to, for use as a baseline",
+        default=env_var("WORKBENCH_BENCHMARK_SAVE"),
+    )
+
+
+def pytest_configure(config: pytest.Config) -> None:
+    config.stash[_report_key] = BenchmarkReport.load(
+        baseline_path=config.option.benchmark_baseline, tolerance=config.option.benchmark_tolerance
+    )
+
+
+def pytest_terminal_summary(terminalreporter, exitstatus: int, config: pytest.Config) -> None:  # noqa: ANN001, ARG001
+    report = config.stash[_report_key]
+    if not report.results:
+        return
+
+    terminalreporter.section("benchmarks")
+    for line in report.table():
+        terminalreporter.write_line(line)
+
+    if config.option.benchmark_save:
+        report.save(config.option.benchmark_save)
+        terminalreporter.write_line(f"results saved to {config.option.benchmark_save}")
+
+
+@dataclass
+class BenchmarkWorkbench:
+    """
+    A workbench service served over HTTP, with a registered stub assistant service and an assistant.
+    """
+
+    client: httpx.AsyncClient
+    stub_assistant_service: StubAssistantService
+    assistant_id: uuid.UUID
+    user: MockUser
+    db_type: str
+    scale: float
+    message_count: int
+    subscriber_count: int
+    report: BenchmarkReport
+
+    def operations(self, count: int) -> int:
+        return max(int(count * self.scale), 1)
+
+    def check(self, result: BenchmarkResult) -> None:
+        """
+        Records the result, failing the benchmark if it regressed against the baseline.
+        """
+        result.name = f"{result.name}[{self.db_type}]"
+        regressions = self.report.record(result)
+        assert not regressions, "\n".join(regressions)
+
+    async def create_conversation(self, title: str = "benchmark", with_assistant: bool = True) -> uuid.UUID:
+        response = await self.client.post(
+            "/conversations", json=workbench_model.NewConversation(title=title).model_dump(mode="json")
+        )
+        response.raise_for_status()
+        conversation = workbench_model.Conversation.model_validate(response.json())
+
+        if with_assistant:
+            response = await self.client.put(
+                f"/conversations/{conversation.id}/participants/{self.assistant_id}", json={}
+            )
+            response.raise_for_status()
+
+        return conversation.id
+
+    async def create_message(self, conversation_id: uuid.UUID, content: str) -> workbench_model.ConversationMessage:
+        response = await self.client.post(
+            f"/conversations/{conversation_id}/messages",
+            json=workbench_model.NewConversationMessage(content=content).model_dump(mode="json"),
+        )
+        response.raise_for_status()
+        return workbench_model.ConversationMessage.model_validate(response.json())
+
+
+async def _register_assistant_service(
+    client: httpx.AsyncClient, stub_assistant_service: StubAssistantService, url: str
+) -> None:
+    new_registration = workbench_model.NewAssistantServiceRegistration(
+        assistant_service_id=stub_assistant_service.assistant_service_id,
+        name="benchmark assistant service",
+        description="",
+    )
+    response = await client.post("/assistant-service-registrations", json=new_registration.model_dump(mode="json"))
+    response.raise_for_status()
+    registration = workbench_model.AssistantServiceRegistration.model_validate(response.json())
+
+    response = await client.put(
+        f"/assistant-service-registrations/{registration.assistant_service_id}",
+        json=workbench_model.UpdateAssistantServiceRegistrationUrl(
+            name=new_registration.name,
+            description=new_registration.description,
+            url=HttpUrl(url),
+            online_expires_in_seconds=3600,
+        ).model_dump(mode="json"),
+        headers=workbench_service_client.AssistantServiceRequestHeaders(
+            assistant_service_id=registration.assistant_service_id,
+            api_key=registration.api_key or "",
+        ).to_headers(),
+    )
+    response.raise_for_status()
+
+
+@pytest.fixture
+async def benchmark_workbench(
+    workbench_service: FastAPI,  # noqa: F811
+    db_settings: DBSettings,  # noqa: F811
+    db_type: str,  # noqa: F811
+    test_user: MockUser,  # noqa: F811
+    request: pytest.FixtureRequest,
+) -> AsyncIterator[BenchmarkWorkbench]:
+    # the tests use a single connection, which would serialize every request
+    db_settings.postgresql_pool_size = DBSettings.model_fields["postgresql_pool_size"].default
+
+    stub_assistant_service = StubAssistantService.new()
+
+    async with (
+        serve(stub_assistant_service.app, lifespan=False) as stub_assistant_service_url,
+        serve(workbench_service) as workbench_service_url,
+        httpx.AsyncClient(
+            base_url=workbench_service_url,
+            headers=test_user.authorization_headers,
+            timeout=httpx.Timeout(60.0),
+            limits=httpx.Limits(max_connections=None, max_keepalive_connections=None),
+        ) as client,
+    ):
+        await _register_assistant_service(client, stub_assistant_service, stub_assistant_service_url)
+
+        response = await client.post(
+            "/assistants",
+            json=workbench_model.NewAssistant(
+                name="benchmark assistant",
+                assistant_service_id=stub_assistant_service.assistant_service_id,
+            ).model_dump(mode="json"),
+        )
+        response.raise_for_status()
+        assistant = workbench_model.Assistant.model_validate(response.json())
+
+        yield BenchmarkWorkbench(
+            client=client,
+            stub_assistant_service=stub_assistant_service,
+            assistant_id=assistant.id,
+            user=test_user,
+            db_type=db_type,
+            scale=request.config.option.benchmark_scale,
+            message_count=request.config.option.benchmark_messages,
+            subscriber_count=request.config.option.benchmark_subscribers,
+            report=request.config.stash[_report_key],
+        )
@@ -0,0 +1,197 @@
+"""
+Measurement and reporting for the workbench service benchmarks.
+
+Workloads are run as a number of operations spread over concurrent workers. Each operation is timed, and the
+result reports throughput and p50/p99 latency. Results are compared against a baseline, if one is given, and
+fail the benchmark when they regress by more than the configured tolerance.
+"""
+
+import asyncio
+import contextlib
+import json
+import logging
+import math
+import pathlib
+import socket
+import time
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Awaitable, Callable
+
+import uvicorn
+from fastapi import FastAPI
+
+logger = logging.getLogger(__name__)
+
+
+def percentile(values: list[float], percent: float) -> float:
+    """
+    The nearest-rank percentile of the values.
+    """
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(math.ceil(percent / 100 * len(ordered)), 1)
+    return ordered[rank - 1]
+
+
+@dataclass
+class BenchmarkResult:
+    name: str
+    # seconds, per operation
+    latencies: list[float]
+    # wall-clock seconds for all operations
+    duration: float
+
+    @property
+    def operations(self) -> int:
+        return len(self.latencies)
+
+    @property
+    def throughput(self) -> float:
+        """Operations per second."""
+        return self.operations / self.duration if self.duration > 0 else 0.0
+
+    @property
+    def p50(self) -> float:
+        return percentile(self.latencies, 50)
+
+    @property
+    def p99(self) -> float:
+        return percentile(self.latencies, 99)
+
+    def summary(self) -> dict[str, float]:
+        return {
+            "operations": self.operations,
+            "throughput": self.throughput,
+            "p50_ms": self.p50 * 1000,
+            "p99_ms": self.p99 * 1000,
+        }
+
+
+async def run_workload(
+    name: str,
+    operation: Callable[[int], Awaitable[None]],
+    operations: int,
+    concurrency: int = 1,
+) -> BenchmarkResult:
+    """
+    Runs operation(index) for each index in range(operations), on concurrency workers, timing each call.
+    """
+    latencies: list[float] = []
+    indexes = iter(range(operations))
+
+    async def worker() -> None:
+        for index in indexes:
+            start = time.perf_counter()
+            await operation(index)
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    async with asyncio.TaskGroup() as task_group:
+        for _ in range(min(concurrency, operations)):
+            task_group.create_task(worker())
+    duration = time.perf_counter() - start
+
+    return BenchmarkResult(name=name, latencies=latencies, duration=duration)
+
+
+@dataclass
+class BenchmarkReport:
+    """
+    Collects the results of a benchmark run, and checks them against the baseline.
+    """
+
+    # the fractional regression allowed against the baseline, in throughput and in p99 latency
+    tolerance: float
+    baseline: dict[str, dict[str, float]] = field(default_factory=dict)
+    results: dict[str, BenchmarkResult] = field(default_factory=dict)
+
+    @classmethod
+    def load(cls, baseline_path: str | None, tolerance: float) -> "BenchmarkReport":
+        baseline = {}
+        if baseline_path:
+            baseline = json.loads(pathlib.Path(baseline_path).read_text())
+        return cls(tolerance=tolerance, baseline=baseline)
+
+    def record(self, result: BenchmarkResult) -> list[str]:
+        """
+        Records the result, returning the regressions against the baseline, if any.
+        """
+        self.results[result.name] = result
+        summary = result.summary()
+        logger.info(
+            "benchmark %s: %d operations, %.1f ops/s, p50 %.2f ms, p99 %.2f ms",
+            result.name,
+            summary["operations"],
+            summary["throughput"],
+            summary["p50_ms"],
+            summary["p99_ms"],
+        )
+
+        baseline = self.baseline.get(result.name)
+        if baseline is None:
+            return []
+
+        regressions = []
+        min_throughput = baseline["throughput"] * (1 - self.tolerance)
+        if summary["throughput"] < min_throughput:
+            regressions.append(
+                f"{result.name}: throughput {summary['throughput']:.1f} ops/s is below {min_throughput:.1f} ops/s"
+                f" (baseline {baseline['throughput']:.1f} ops/s)"
+            )
+        max_p99_ms = baseline["p99_ms"] * (1 + self.tolerance)
+        if summary["p99_ms"] > max_p99_ms:
+            regressions.append(
+                f"{result.name}: p99 {summary['p99_ms']:.2f} ms is above {max_p99_ms:.2f} ms"
+                f" (baseline {baseline['p99_ms']:.2f} ms)"
+            )
+        return regressions
+
+    def save(self, path: str) -> None:
+        # results are merged into an existing file, so that runs against each database can share a baseline
+        output_path = pathlib.Path(path)
+        summaries = json.loads(output_path.read_text()) if output_path.exists() else {}
+        summaries.update({name: result.summary() for name, result in self.results.items()})
+        output_path.write_text(json.dumps(summaries, indent=2, sort_keys=True))
+
+    def table(self) -> list[str]:
+        lines = [f"{'benchmark':<48} {'ops':>8} {'ops/s':>10} {'p50 ms':>10} {'p99 ms':>10}"]
+        for name, result in sorted(self.results.items()):
+            summary = result.summary()
+            lines.append(
+                f"{name:<48} {summary['operations']:>8} {summary['throughput']:>10.1f}"
+                f" {summary['p50_ms']:>10.2f} {summary['p99_ms']:>10.2f}"
+            )
+        return lines
+
+
+@contextlib.asynccontextmanager
+async def serve(app: FastAPI, lifespan: bool = True) -> AsyncIterator[str]:
+    """
+    Serves the app over HTTP on a local port, in this process and event loop, yielding its base url.
+    """
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind(("127.0.0.1", 0))
+    port = sock.getsockname()[1]
+
+    # the benchmarks do not use websockets, and loading the websockets protocol warns of its deprecated legacy
+    # implementation, which the test settings turn into an error
+    server = uvicorn.Server(
+        uvicorn.Config(app, lifespan="on" if lifespan else "off", ws="none", log_level="warning", access_log=False)
+    )
+    server_task = asyncio.create_task(server.serve(sockets=[sock]))
+    try:
+        while not server.started:
+            if server_task.done():
+                # raises the startup error
+                await server_task
+                raise RuntimeError("server stopped during startup")
+            await asyncio.sleep(0.01)
+
+        yield f"http://127.0.0.1:{port}"
+
+    finally:
+        server.should_exit = True
+        await server_task
+        sock.close()
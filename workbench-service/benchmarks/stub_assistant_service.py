@@ -0,0 +1,89 @@
+"""
+A stub assistant service that accepts everything the workbench sends to assistants, doing no work of its own, so
+that the benchmarks measure the workbench. It records when each message event arrives.
+"""
+
+import io
+import time
+import uuid
+import zipfile
+
+from fastapi import FastAPI, Request, Response
+from fastapi.responses import StreamingResponse
+from semantic_workbench_api_model import assistant_model, workbench_model
+
+
+class StubAssistantService:
+    def __init__(self, assistant_service_id: str) -> None:
+        self.assistant_service_id = assistant_service_id
+        # message id -> time.perf_counter() when the message created event arrived
+        self.message_received: dict[str, float] = {}
+        self.events_received = 0
+        self.event_requests_received = 0
+        # when False, the batch endpoint responds 404, as an assistant service that predates it would
+        self.batches_supported = True
+        self.app = self._create_app()
+
+    def _receive(self, events: list[workbench_model.ConversationEvent]) -> None:
+        now = time.perf_counter()
+        self.events_received += len(events)
+        self.event_requests_received += 1
+        for event in events:
+            if event.event == workbench_model.ConversationEventType.message_created:
+                self.message_received.setdefault(event.data["message"]["id"], now)
+
+    def _create_app(self) -> FastAPI:
+        app = FastAPI(title="stub assistant service")
+
+        @app.get("/")
+        async def get_service_info() -> assistant_model.ServiceInfoModel:
+            return assistant_model.ServiceInfoModel(
+                assistant_service_id=self.assistant_service_id,
+                name="stub assistant service",
+                templates=[
+                    assistant_model.AssistantTemplateModel(
+                        id="default",
+                        name="stub assistant",
+                        description="",
+                        config=assistant_model.ConfigResponseModel(config={}, json_schema={}, ui_schema={}),
+                    )
+                ],
+            )
+
+        @app.post("/{assistant_id}/events")
+        async def post_events(event_list: workbench_model.ConversationEventList) -> Response:
+            if not self.batches_supported:
+                return Response(status_code=404)
+            self._receive(event_list.events)
+            return Response(status_code=200)
+
+        @app.post("/{assistant_id}/conversations/{conversation_id}/events")
+        async def post_event(event: workbench_model.ConversationEvent) -> None:
+            self._receive([event])
+
+        @app.get("/{assistant_id}/export-data")
+        @app.get("/{assistant_id}/conversations/{conversation_id}/export-data")
+        async def export_data() -> StreamingResponse:
+            archive = io.BytesIO()
+            with zipfile.ZipFile(archive, "w") as zip_file:
+                zip_file.writestr("state.json", "{}")
+            return StreamingResponse(iter([archive.getvalue()]), media_type="application/zip")
+
+        @app.put("/{assistant_id}")
+        @app.put("/{assistant_id}/conversations/{conversation_id}")
+        @app.delete("/{assistant_id}")
+        @app.delete("/{assistant_id}/conversations/{conversation_id}")
+        async def accept(request: Request) -> Response:
+            # read, and discard, any uploaded export
+            await request.body()
+            return Response(status_code=200)
+
+        @app.get("/{assistant_id}/config")
+        async def get_config() -> assistant_model.ConfigResponseModel:
+            return assistant_model.ConfigResponseModel(config={}, json_schema={}, ui_schema={})
+
+        return app
+
+    @staticmethod
+    def new() -> "StubAssistantService":
+        return StubAssistantService(assistant_service_id=f"benchmark-assistant-service-{uuid.uuid4().hex}")
@@ -0,0 +1,296 @@
+import asyncio
+import datetime
+import json
+import logging
+import os
+import time
+import uuid
+
+import sqlalchemy
+from semantic_workbench_api_model import workbench_model
+from semantic_workbench_service import db, settings
+
+from .conftest import BenchmarkWorkbench
+from .harness import BenchmarkResult, run_workload
+
+logger = logging.getLogger(__name__)
+
+
+async def _seed_messages(conversation_id: uuid.UUID, sender_id: str, count: int, batch_size: int = 10_000) -> None:
+    """
+    Inserts messages directly into the database, as creating a large history through the API would take longer
+    than the benchmark.
+    """
+    async with db.create_engine(settings.db) as engine:
+        for batch_start in range(0, count, batch_size):
+            rows = [
+                {
+                    "message_id": uuid.uuid4(),
+                    "conversation_id": conversation_id,
+                    "created_datetime": datetime.datetime.now(datetime.UTC),
+                    "sender_participant_id": sender_id,
+                    "sender_participant_role": "user",
+                    "message_type": "chat",
+                    "content": f"seeded message {index}",
+                    "content_type": "text/plain",
+                    "metadata": {},
+                    "filenames": [],
+                }
+                for index in range(batch_start, min(batch_start + batch_size, count))
+            ]
+            async with engine.begin() as connection:
+                await connection.execute(sqlalchemy.insert(db.ConversationMessage), rows)
+
+
+async def _wait_until(condition, timeout: float = 60.0) -> None:  # noqa: ANN001
+    async with asyncio.timeout(timeout):
+        while not condition():
+            await asyncio.sleep(0.01)
+
+
+async def test_create_message_benchmark(benchmark_workbench: BenchmarkWorkbench) -> None:
+    workbench = benchmark_workbench
+    conversation_ids = [await workbench.create_conversation(f"benchmark {index}") for index in range(10)]
+    sent: dict[str, float] = {}
+
+    async def create_message(index: int) -> None:
+        start = time.perf_counter()
+        message = await workbench.create_message(conversation_ids[index % len(conversation_ids)], f"message {index}")
+        sent[str(message.id)] = start
+
+    workbench.check(
+        await run_workload("create_message", create_message, operations=workbench.operations(500), concurrency=20)
+    )
+
+    # every message is forwarded to the assistant in the conversation
+    received = workbench.stub_assistant_service.message_received
+    await _wait_until(lambda: all(message_id in received for message_id in sent))
+
+    workbench.check(
+        BenchmarkResult(
+            name="forward_message_to_assistant",
+            latencies=[received[message_id] - start for message_id, start in sent.items()],
+            duration=max(received[message_id] for message_id in sent) - min(sent.values()),
+        )
+    )
+
+
+async def _event_burst(workbench: BenchmarkWorkbench, name: str) -> None:
+    conversation_id = await workbench.create_conversation(name)
+    stub_assistant_service = workbench.stub_assistant_service
+    requests_before = stub_assistant_service.event_requests_received
+    sent: dict[str, float] = {}
+
+    async def create_message(index: int) -> None:
+        start = time.perf_counter()
+        message = await workbench.create_message(conversation_id, f"burst message {index}")
+        sent[str(message.id)] = start
+
+    await run_workload(name, create_message, operations=workbench.operations(500), concurrency=50)
+
+    received = stub_assistant_service.message_received
+    await _wait_until(lambda: all(message_id in received for message_id in sent))
+
+    logger.warning(
+        "%s; events: %d, requests to the assistant service: %d",
+        name,
+        len(sent),
+        stub_assistant_service.event_requests_received - requests_before,
+    )
+    workbench.check(
+        BenchmarkResult(
+            name=name,
+            latencies=[received[message_id] - start for message_id, start in sent.items()],
+            duration=max(received[message_id] for message_id in sent) - min(sent.values()),
+        )
+    )
+
+
+async def test_event_burst_benchmark(benchmark_workbench: BenchmarkWorkbench) -> None:
+    """
+    Forwards a burst of events, for messages created concurrently in one conversation, to the assistant: in batches,
+    and then one request per event, as to an assistant service that does not support batches.
+    """
+    await _event_burst(benchmark_workbench, "event_burst_batched")
+
+    benchmark_workbench.stub_assistant_service.batches_supported = False
+    await _event_burst(benchmark_workbench, "event_burst_unbatched")
+
+
+async def test_list_conversation_messages_benchmark(benchmark_workbench: BenchmarkWorkbench) -> None:
+    workbench = benchmark_workbench
+    conversation_id = await workbench.create_conversation(with_assistant=False)
+    await _seed_messages(conversation_id, sender_id=workbench.user.id, count=workbench.message_count)
+    # created through the API, so that the conversation's latest message is maintained
+    await workbench.create_message(conversation_id, "latest message")
+
+    page_size = 100
+
+    async def get_page(before_cursor: str | None) -> workbench_model.ConversationMessageList:
+        params: dict[str, str | int] = {"limit": page_size}
+        if before_cursor:
+            params["before_cursor"] = before_cursor
+        response = await workbench.client.get(f"/conversations/{conversation_id}/messages", params=params)
+        response.raise_for_status()
+        return workbench_model.ConversationMessageList.model_validate(response.json())
+
+    async def latest_page(_: int) -> None:
+        page = await get_page(None)
+        assert len(page.messages) == page_size
+
+    workbench.check(
+        await run_workload("list_messages_latest_page", latest_page, workbench.operations(500), concurrency=10)
+    )
+
+    # page back through the history, as a client scrolling up does
+    next_cursor: str | None = None
+
+    async def next_page(_: int) -> None:
+        nonlocal next_cursor
+        page = await get_page(next_cursor)
+        assert page.messages
+        next_cursor = page.next_cursor
+
+    page_count = (workbench.message_count + 1) // page_size
+    workbench.check(await run_workload("list_messages_paging", next_page, min(page_count, workbench.operations(1_000))))
+
+
+async def test_list_conversations_benchmark(benchmark_workbench: BenchmarkWorkbench) -> None:
+    workbench = benchmark_workbench
+
+    async def create_conversation(index: int) -> None:
+        conversation_id = await workbench.create_conversation(f"benchmark {index}", with_assistant=False)
+        await workbench.create_message(conversation_id, f"message {index}")
+
+    workbench.check(
+        await run_workload(
+            "create_conversation_with_message", create_conversation, workbench.operations(200), concurrency=10
+        )
+    )
+
+    async def first_page(_: int) -> None:
+        response = await workbench.client.get("/conversations", params={"limit": 50})
+        response.raise_for_status()
+        assert workbench_model.ConversationList.model_validate(response.json()).conversations
+
+    workbench.check(
+        await run_workload("list_conversations_page", first_page, workbench.operations(500), concurrency=10)
+    )
+
+    async def all_conversations(_: int) -> None:
+        response = await workbench.client.get("/conversations")
+        response.raise_for_status()
+
+    workbench.check(
+        await run_workload("list_conversations_all", all_conversations, workbench.operations(50), concurrency=10)
+    )
+
+
+async def test_sse_fan_out_benchmark(benchmark_workbench: BenchmarkWorkbench) -> None:
+    workbench = benchmark_workbench
+    conversation_id = await workbench.create_conversation(with_assistant=False)
+    message_count = workbench.operations(50)
+
+    # message content -> time.perf_counter() when the message was sent
+    sent: dict[str, float] = {}
+    latencies: list[float] = []
+    last_received = 0.0
+    connected = 0
+
+    async def subscribe() -> None:
+        nonlocal connected, last_received
+        received = 0
+        async with workbench.client.stream("GET", f"/conversations/{conversation_id}/events") as response:
+            response.raise_for_status()
+            # the subscription is registered before the response starts
+            connected += 1
+
+            event_type = ""
+            async for line in response.aiter_lines():
+                if line.startswith("event:"):
+                    event_type = line.removeprefix("event:").strip()
+                    continue
+
+                if not line.startswith("data:") or event_type != workbench_model.ConversationEventType.message_created:
+                    continue
+
+                now = time.perf_counter()
+                content = json.loads(line.removeprefix("data:"))["data"]["message"]["content"]
+                latencies.append(now - sent[content])
+                last_received = max(last_received, now)
+                received += 1
+                if received == message_count:
+                    return
+
+    async with asyncio.TaskGroup() as task_group:
+        for _ in range(workbench.subscriber_count):
+            task_group.create_task(subscribe())
+        await _wait_until(lambda: connected == workbench.subscriber_count)
+
+        async with asyncio.timeout(120):
+            for index in range(message_count):
+                content = f"fan-out message {index}"
+                sent[content] = time.perf_counter()
+                await workbench.create_message(conversation_id, content)
+
+    workbench.check(
+        BenchmarkResult(
+            name=f"sse_fan_out_{workbench.subscriber_count}_subscribers",
+            latencies=latencies,
+            duration=last_received - min(sent.values()),
+        )
+    )
+
+
+async def test_file_upload_download_benchmark(benchmark_workbench: BenchmarkWorkbench) -> None:
+    workbench = benchmark_workbench
+    conversation_id = await workbench.create_conversation()
+    file_content = os.urandom(256 * 1024)
+    file_count = workbench.operations(100)
+
+    async def upload(index: int) -> None:
+        response = await workbench.client.put(
+            f"/conversations/{conversation_id}/files",
+            files=[("files", (f"file-{index}.bin", file_content, "application/octet-stream"))],
+        )
+        response.raise_for_status()
+
+    workbench.check(await run_workload("upload_file_256kb", upload, file_count, concurrency=10))
+
+    async def download(index: int) -> None:
+        response = await workbench.client.get(f"/conversations/{conversation_id}/files/file-{index % file_count}.bin")
+        response.raise_for_status()
+        assert len(response.content) == len(file_content)
+
+    workbench.check(await run_workload("download_file_256kb", download, workbench.operations(500), concurrency=10))
+
+
+async def test_export_import_benchmark(benchmark_workbench: BenchmarkWorkbench) -> None:
+    workbench = benchmark_workbench
+    conversation_id = await workbench.create_conversation()
+    await _seed_messages(conversation_id, sender_id=workbench.user.id, count=10_000)
+    for index in range(10):
+        response = await workbench.client.put(
+            f"/conversations/{conversation_id}/files",
+            files=[("files", (f"file-{index}.bin", os.urandom(256 * 1024), "application/octet-stream"))],
+        )
+        response.raise_for_status()
+
+    exported = b""
+
+    async def export(_: int) -> None:
+        nonlocal exported
+        response = await workbench.client.get("/conversations/export", params={"id": str(conversation_id)})
+        response.raise_for_status()
+        exported = response.content
+
+    workbench.check(await run_workload("export_conversation_10k_messages", export, workbench.operations(10)))
+
+    async def import_(_: int) -> None:
+        response = await workbench.client.post(
+            "/conversations/import", files={"from_export": ("export.zip", exported, "application/zip")}
+        )
+        response.raise_for_status()
+        assert len(workbench_model.ConversationImportResult.model_validate(response.json()).conversation_ids) == 1
+
+    workbench.check(await run_workload("import_conversation_10k_messages", import_, workbench.operations(10)))
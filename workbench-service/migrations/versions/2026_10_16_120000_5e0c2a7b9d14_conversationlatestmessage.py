@@ -0,0 +1,46 @@
+"""conversationlatestmessage
+
+Revision ID: 5e0c2a7b9d14
+Revises: 3763629295ad
+Create Date: 2026-10-16 12:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+import sqlmodel
+import sqlmodel.sql.sqltypes
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "5e0c2a7b9d14"
+down_revision: Union[str, None] = "3763629295ad"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "conversationlatestmessage",
+        sa.Column("conversation_id", sa.Uuid(), nullable=False),
+        sa.Column("message_type", sqlmodel.sql.sqltypes.AutoString(), nullable=False),
+        sa.Column("sequence", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(
+            ["conversation_id"],
+            ["conversation.conversation_id"],
+            name="fk_conversationlatestmessage_conversation_id_conversation",
+            ondelete="CASCADE",
+        ),
+        sa.PrimaryKeyConstraint("conversation_id", "message_type"),
+    )
+
+    op.execute(
+        "insert into conversationlatestmessage (conversation_id, message_type, sequence)"
+        " select conversation_id, message_type, max(sequence) from conversationmessage"
+        " group by conversation_id, message_type"
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("conversationlatestmessage")
@@ -0,0 +1,37 @@
+"""index conversationmessage sequence
+
+Revision ID: 8b1f4d6e2a37
+Revises: 5e0c2a7b9d14
+Create Date: 2026-10-16 13:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "8b1f4d6e2a37"
+down_revision: Union[str, None] = "5e0c2a7b9d14"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_conversationmessage_conversation_id_sequence",
+        "conversationmessage",
+        ["conversation_id", "sequence"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_conversationmessage_conversation_id_message_type_sequence",
+        "conversationmessage",
+        ["conversation_id", "message_type", "sequence"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_conversationmessage_conversation_id_message_type_sequence", table_name="conversationmessage")
+    op.drop_index("ix_conversationmessage_conversation_id_sequence", table_name="conversationmessage")
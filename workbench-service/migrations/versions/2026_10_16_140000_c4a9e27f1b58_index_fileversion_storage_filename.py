@@ -0,0 +1,25 @@
+"""index fileversion storage_filename
+
+Revision ID: c4a9e27f1b58
+Revises: 8b1f4d6e2a37
+Create Date: 2026-10-16 14:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "c4a9e27f1b58"
+down_revision: Union[str, None] = "8b1f4d6e2a37"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(op.f("ix_fileversion_storage_filename"), "fileversion", ["storage_filename"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_fileversion_storage_filename"), table_name="fileversion")
@@ -1,10 +1,12 @@
-from typing import Annotated
+from typing import Annotated, Literal, Self
 
-from pydantic import Field, HttpUrl
+from pydantic import Field, HttpUrl, model_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
+from semantic_workbench_api_model.connection_pool import ConnectionPoolSettings
 
 from .files import StorageSettings
 from .logging_config import LoggingSettings
+from .metrics import MetricsSettings
 
 
 class DBSettings(BaseSettings):
@@ -15,6 +17,12 @@ class DBSettings(BaseSettings):
     alembic_config_path: str = "./alembic.ini"
 
 
+class EventBusSettings(BaseSettings):
+    backend: Literal["memory", "postgresql"] = "memory"
+    postgresql_channel: str = "workbench_conversation_events"
+    postgresql_publish_pool_size: int = 5
+
+
 class ApiKeySettings(BaseSettings):
     key_vault_url: HttpUrl | None = None
 
@@ -39,11 +47,42 @@ class WebServiceSettings(BaseSettings):
 
     assistant_service_online_check_interval_seconds: float = 10.0
 
+    # the connection pool shared by all clients of assistant services
+    http_connection_pool: ConnectionPoolSettings = ConnectionPoolSettings()
+
+    # the number of recent events kept per conversation for replay to reconnecting SSE clients (Last-Event-ID); the
+    # replay is queued for the client at once, so it must fit in sse_subscriber_queue_size
+    sse_replay_events_per_conversation: int = 500
+    sse_replay_max_conversations: int = 10_000
+
+    # the number of undelivered events buffered per SSE client, and what happens when a client falls further behind
+    sse_subscriber_queue_size: int = 1_000
+    sse_subscriber_overflow_policy: Literal["drop_oldest", "disconnect"] = "disconnect"
+
+    # cache of the online, active assistant participants per conversation, used when forwarding events
+    active_assistant_index_max_conversations: int = 10_000
+    active_assistant_index_ttl_seconds: float = 60.0
+
+    # events queued for an assistant are forwarded in batches of up to this size; after the first event of a batch,
+    # wait up to the linger time for more (0 sends whatever accumulated while the previous request was in flight)
+    assistant_event_batch_max_size: int = 100
+    assistant_event_batch_linger_seconds: float = 0.0
+
     azure_openai_endpoint: Annotated[str, Field(validation_alias="azure_openai_endpoint")] = ""
     azure_openai_deployment: Annotated[str, Field(validation_alias="azure_openai_deployment")] = "gpt-4o-mini"
     azure_openai_model: Annotated[str, Field(validation_alias="azure_openai_model")] = "gpt-4o-mini"
     azure_openai_api_version: Annotated[str, Field(validation_alias="azure_openai_api_version")] = "2025-02-01-preview"
 
+    @model_validator(mode="after")
+    def _replay_fits_subscriber_queue(self) -> Self:
+        if self.sse_replay_events_per_conversation > self.sse_subscriber_queue_size:
+            raise ValueError(
+                f"sse_replay_events_per_conversation ({self.sse_replay_events_per_conversation}) must not exceed"
+                f" sse_subscriber_queue_size ({self.sse_subscriber_queue_size}), as a full replay would overflow the"
+                " subscriber queue"
+            )
+        return self
+
 
 class AzureSpeechSettings(BaseSettings):
     model_config = SettingsConfigDict(
@@ -60,11 +99,13 @@ class Settings(BaseSettings):
     )
 
     db: DBSettings = DBSettings()
+    event_bus: EventBusSettings = EventBusSettings()
     storage: StorageSettings = StorageSettings()
     logging: LoggingSettings = LoggingSettings()
     service: WebServiceSettings = WebServiceSettings()
     azure_speech: AzureSpeechSettings = AzureSpeechSettings()
     auth: AuthSettings = AuthSettings()
+    metrics: MetricsSettings = MetricsSettings()
 
 
 if __name__ == "__main__":
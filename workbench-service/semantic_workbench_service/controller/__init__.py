@@ -1,4 +1,5 @@
 from . import participant, user
+from .active_assistant_index import ActiveAssistantIndex
 from .assistant import AssistantController
 from .assistant_service_client_pool import AssistantServiceClientPool
 from .assistant_service_registration import AssistantServiceRegistrationController
@@ -15,6 +16,7 @@ from .file import FileController
 from .user import UserController
 
 __all__ = [
+    "ActiveAssistantIndex",
     "AssistantController",
     "AssistantServiceRegistrationController",
     "AssistantServiceClientPool",
@@ -0,0 +1,139 @@
+import logging
+import uuid
+from typing import AsyncContextManager, Callable
+
+import cachetools
+from semantic_workbench_api_model.workbench_model import (
+    ConversationEvent,
+    ConversationEventType,
+    ParticipantRole,
+)
+from sqlalchemy.orm import joinedload
+from sqlmodel import col, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from .. import db
+
+logger = logging.getLogger(__name__)
+
+
+class ActiveAssistantIndex:
+    """
+    In-memory index of the active assistant participants, whose assistant service is online, for each conversation,
+    and of the assistant records (with their service registration) that events are forwarded to. Used to forward
+    conversation events to assistants without querying the database per event.
+
+    Entries are invalidated by the controllers that change assistant participants, assistants and assistant service
+    registrations, and by participant events from other nodes. The TTL bounds staleness for any change that is not
+    observed.
+    """
+
+    def __init__(
+        self,
+        get_session: Callable[[], AsyncContextManager[AsyncSession]],
+        max_conversations: int = 10_000,
+        ttl_seconds: float = 60.0,
+    ) -> None:
+        self._get_session = get_session
+        self._cache: cachetools.TTLCache[uuid.UUID, frozenset[uuid.UUID]] = cachetools.TTLCache(
+            maxsize=max_conversations, ttl=ttl_seconds
+        )
+        self._assistants: cachetools.TTLCache[uuid.UUID, db.Assistant] = cachetools.TTLCache(
+            maxsize=max_conversations, ttl=ttl_seconds
+        )
+        # incremented on every invalidation, so a lookup that raced with an invalidation is not cached
+        self._generation = 0
+
+    async def assistant_ids(self, conversation_id: uuid.UUID) -> frozenset[uuid.UUID]:
+        assistant_ids = self._cache.get(conversation_id)
+        if assistant_ids is not None:
+            return assistant_ids
+
+        generation = self._generation
+        async with self._get_session() as session:
+            assistant_ids = frozenset(
+                (
+                    await session.exec(
+                        select(db.Assistant.assistant_id)
+                        .join(
+                            db.AssistantParticipant,
+                            col(db.Assistant.assistant_id) == col(db.AssistantParticipant.assistant_id),
+                        )
+                        .join(db.AssistantServiceRegistration)
+                        .where(col(db.AssistantServiceRegistration.assistant_service_online).is_(True))
+                        .where(col(db.AssistantParticipant.active_participant).is_(True))
+                        .where(db.AssistantParticipant.conversation_id == conversation_id)
+                    )
+                ).all()
+            )
+
+        if generation == self._generation:
+            self._cache[conversation_id] = assistant_ids
+
+        return assistant_ids
+
+    async def assistant(self, assistant_id: uuid.UUID) -> db.Assistant | None:
+        """
+        Returns the assistant, with its service registration loaded, or None if it does not exist.
+        """
+        assistant = self._assistants.get(assistant_id)
+        if assistant is not None:
+            return assistant
+
+        generation = self._generation
+        async with self._get_session() as session:
+            assistant = (
+                await session.exec(
+                    select(db.Assistant)
+                    .where(db.Assistant.assistant_id == assistant_id)
+                    .options(joinedload(db.Assistant.related_assistant_service_registration, innerjoin=True))
+                )
+            ).one_or_none()
+
+        if assistant is not None and generation == self._generation:
+            self._assistants[assistant_id] = assistant
+
+        return assistant
+
+    def invalidate(self, conversation_id: uuid.UUID) -> None:
+        self._generation += 1
+        self._cache.pop(conversation_id, None)
+
+    def invalidate_assistant(self, assistant_id: uuid.UUID) -> None:
+        self._generation += 1
+        self._assistants.pop(assistant_id, None)
+
+    def invalidate_all(self) -> None:
+        self._generation += 1
+        self._cache.clear()
+        self._assistants.clear()
+
+    def observe_event(self, event: ConversationEvent) -> None:
+        """
+        Invalidates the conversation when a participant event shows an assistant joining, leaving, or changing
+        online status. Other participant updates, such as status messages, leave the entry in place.
+        """
+        if event.event not in (ConversationEventType.participant_created, ConversationEventType.participant_updated):
+            return
+
+        participant = event.data.get("participant") or {}
+        if participant.get("role") != ParticipantRole.assistant:
+            return
+
+        assistant_ids = self._cache.get(event.conversation_id)
+        if assistant_ids is None:
+            return
+
+        try:
+            assistant_id = uuid.UUID(participant.get("id", ""))
+        except ValueError:
+            return
+
+        is_active = bool(participant.get("active_participant")) and bool(participant.get("online"))
+        if is_active != (assistant_id in assistant_ids):
+            logger.debug(
+                "invalidating active assistants; conversation_id: %s, assistant_id: %s",
+                event.conversation_id,
+                assistant_id,
+            )
+            self.invalidate(event.conversation_id)
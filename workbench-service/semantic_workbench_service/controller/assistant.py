@@ -6,9 +6,10 @@ import pathlib
 import re
 import shutil
 import tempfile
+import time
 import uuid
 import zipfile
-from typing import IO, AsyncContextManager, Awaitable, BinaryIO, Callable, NamedTuple
+from typing import IO, AsyncContextManager, AsyncIterator, Awaitable, BinaryIO, Callable, NamedTuple
 
 import httpx
 from semantic_workbench_api_model.assistant_model import (
@@ -21,7 +22,10 @@ from semantic_workbench_api_model.assistant_model import (
     StateResponseModel,
 )
 from semantic_workbench_api_model.assistant_service_client import (
+    AssistantClient,
+    AssistantConnectionError,
     AssistantError,
+    AssistantResponseError,
 )
 from semantic_workbench_api_model.workbench_model import (
     Assistant,
@@ -34,38 +38,67 @@ from semantic_workbench_api_model.workbench_model import (
     NewConversation,
     UpdateAssistant,
 )
-from sqlalchemy.orm import joinedload
 from sqlmodel import col, select
 from sqlmodel.ext.asyncio.session import AsyncSession
 
-from .. import auth, db, files, query
-from ..event import ConversationEventQueueItem
+from .. import auth, db, files, metrics, query, zip_stream
+from ..event import ConversationEventQueueItem, UserEventQueueItem
 from . import convert, exceptions, export_import
 from . import participant as participant_
+from .active_assistant_index import ActiveAssistantIndex
 from . import user as user_
 from .assistant_service_client_pool import AssistantServiceClientPool
 
 logger = logging.getLogger(__name__)
 
+# how long an assistant service that does not support event batches is sent events one at a time, before batches
+# are tried again, in case it was upgraded
+_batch_unsupported_expiry_seconds = 600.0
+
+
+def _batch_not_delivered(error: AssistantError) -> bool:
+    """
+    Whether the assistant service certainly did not handle any event in a failed batch: the connection was never made,
+    or the service rejected the request as a whole.
+    """
+    match error:
+        case AssistantConnectionError():
+            return isinstance(error.__cause__, (httpx.ConnectError, httpx.ConnectTimeout))
+        case AssistantResponseError():
+            return httpx.codes.is_client_error(error.status_code)
+        case _:
+            return False
+
 
 ExportResult = NamedTuple(
     "ExportResult",
-    [("file_path", str), ("content_type", str), ("filename", str), ("cleanup", Callable[[], None])],
+    [("stream", AsyncIterator[bytes]), ("content_type", str), ("filename", str)],
 )
 
 
+async def _read_chunks(file: IO[bytes]) -> AsyncIterator[bytes]:
+    while chunk := await asyncio.to_thread(file.read, 100 * 1_024):
+        yield chunk
+
+
 class AssistantController:
     def __init__(
         self,
         get_session: Callable[[], AsyncContextManager[AsyncSession]],
         notify_event: Callable[[ConversationEventQueueItem], Awaitable],
+        notify_user_event: Callable[[str, UserEventQueueItem], None],
         client_pool: AssistantServiceClientPool,
         file_storage: files.Storage,
+        active_assistant_index: ActiveAssistantIndex,
     ) -> None:
         self._get_session = get_session
         self._notify_event = notify_event
+        self._notify_user_event = notify_user_event
         self._client_pool = client_pool
         self._file_storage = file_storage
+        self._active_assistant_index = active_assistant_index
+        # assistant service url -> time.monotonic() when it was found not to support event batches
+        self._batch_unsupported_service_urls: dict[str, float] = {}
 
     async def _ensure_assistant(
         self,
@@ -129,25 +162,79 @@ class AssistantController:
         )
 
     async def forward_event_to_assistant(self, assistant_id: uuid.UUID, event: ConversationEvent) -> None:
-        async with self._get_session() as session:
-            assistant = (
-                await session.exec(
-                    select(db.Assistant)
-                    .where(db.Assistant.assistant_id == assistant_id)
-                    .options(joinedload(db.Assistant.related_assistant_service_registration, innerjoin=True))
-                )
-            ).one()
+        await self.forward_events_to_assistant(assistant_id=assistant_id, events=[event])
+
+    async def forward_events_to_assistant(self, assistant_id: uuid.UUID, events: list[ConversationEvent]) -> None:
+        """
+        Forwards events, in order, to the assistant. Multiple events are sent in a single request when the assistant
+        service supports batches.
+        """
+        assistant = await self._active_assistant_index.assistant(assistant_id)
+        if assistant is None:
+            logger.warning("assistant not found for forwarding events; assistant_id: %s", assistant_id)
+            return
 
-        try:
-            await (await self._client_pool.assistant_client(assistant)).post_conversation_event(event=event)
-        except AssistantError as e:
-            if e.status_code != httpx.codes.NOT_FOUND:
-                logger.exception(
-                    "error forwarding event to assistant; assistant_id: %s, conversation_id: %s, event: %s",
-                    assistant.assistant_id,
-                    event.conversation_id,
-                    event,
-                )
+        assistant_client = await self._client_pool.assistant_client(assistant)
+        service_url = assistant.related_assistant_service_registration.assistant_service_url
+
+        if len(events) > 1 and self._supports_batches(service_url):
+            try:
+                await assistant_client.post_conversation_events(events=events)
+                metrics.assistant_forwarded_events.inc(len(events))
+                return
+
+            except AssistantError as e:
+                if e.status_code in (httpx.codes.NOT_FOUND, httpx.codes.METHOD_NOT_ALLOWED):
+                    # the batch endpoint never responds with 404 for unknown conversations, so the service predates it
+                    logger.info(
+                        "assistant service does not support event batches; assistant_service_id: %s, url: %s",
+                        assistant.assistant_service_id,
+                        service_url,
+                    )
+                    self._batch_unsupported_service_urls[service_url] = time.monotonic()
+                elif _batch_not_delivered(e):
+                    # the assistant service certainly did not handle any of the events, so send them one at a time,
+                    # so that one bad event does not lose the others
+                    logger.warning(
+                        "error forwarding event batch to assistant, sending events one at a time; assistant_id: %s,"
+                        " event count: %d",
+                        assistant.assistant_id,
+                        len(events),
+                        exc_info=True,
+                    )
+                else:
+                    # the assistant service may have handled some or all of the events, so sending them again could
+                    # deliver them twice
+                    metrics.assistant_forward_failures.inc(len(events))
+                    logger.exception(
+                        "error forwarding event batch to assistant; assistant_id: %s, event count: %d",
+                        assistant.assistant_id,
+                        len(events),
+                    )
+                    return
+
+        for event in events:
+            try:
+                await assistant_client.post_conversation_event(event=event)
+                metrics.assistant_forwarded_events.inc()
+            except AssistantError as e:
+                if e.status_code != httpx.codes.NOT_FOUND:
+                    metrics.assistant_forward_failures.inc()
+                    logger.exception(
+                        "error forwarding event to assistant; assistant_id: %s, conversation_id: %s, event: %s",
+                        assistant.assistant_id,
+                        event.conversation_id,
+                        event,
+                    )
+
+    def _supports_batches(self, service_url: str) -> bool:
+        unsupported_since = self._batch_unsupported_service_urls.get(service_url)
+        if unsupported_since is None:
+            return True
+        if time.monotonic() - unsupported_since < _batch_unsupported_expiry_seconds:
+            return False
+        del self._batch_unsupported_service_urls[service_url]
+        return True
 
     async def _remove_assistant_from_conversation(
         self,
@@ -171,6 +258,7 @@ class AssistantController:
         ):
             participant.active_participant = False
             session.add(participant)
+            self._active_assistant_index.invalidate(conversation_id)
 
             participants = await participant_.get_conversation_participants(
                 session=session, conversation_id=conversation_id, include_inactive=True
@@ -302,6 +390,8 @@ class AssistantController:
             await session.commit()
             await session.refresh(assistant)
 
+        self._active_assistant_index.invalidate_assistant(assistant_id)
+
         return await self.get_assistant(user_principal=user_principal, assistant_id=assistant.assistant_id)
 
     async def delete_assistant(
@@ -351,6 +441,8 @@ class AssistantController:
             await session.delete(assistant)
             await session.commit()
 
+        self._active_assistant_index.invalidate_assistant(assistant_id)
+
     async def get_assistants(
         self,
         user_principal: auth.UserPrincipal,
@@ -540,6 +632,7 @@ class AssistantController:
     EXPORT_WORKBENCH_FILENAME = "workbench.jsonl"
     EXPORT_ASSISTANT_DATA_FILENAME = "assistant_data.bin"
     EXPORT_ASSISTANT_CONVERSATION_DATA_FILENAME = "conversation_data.bin"
+    EXPORT_CONVERSATION_DOWNLOAD_CONCURRENCY = 4
 
     async def export_assistant(
         self,
@@ -567,101 +660,184 @@ class AssistantController:
                 f"assistant_{export_file_name}_{datetime.datetime.now(datetime.UTC).strftime('%Y%m%d%H%M%S')}"
             )
 
-            return await self._export(
-                session=session,
-                export_filename_prefix=export_file_name,
-                conversation_ids=conversation_ids,
-                assistant_ids=set((assistant_id,)),
-            )
+        return ExportResult(
+            stream=self._export(conversation_ids=conversation_ids, assistant_ids=set((assistant_id,))),
+            content_type="application/zip",
+            filename=export_file_name + ".zip",
+        )
 
     async def _export(
         self,
         conversation_ids: set[uuid.UUID],
         assistant_ids: set[uuid.UUID],
-        session: AsyncSession,
-        export_filename_prefix: str,
-    ) -> ExportResult:
-        temp_dir_path = pathlib.Path(tempfile.mkdtemp())
+    ) -> AsyncIterator[bytes]:
+        """
+        Streams the export as a zip archive, writing each record, file and assistant export into the archive as it
+        is read.
+        """
+        # read everything that is needed from the database up front, so that no session is held while the archive
+        # is streamed to the client
+        async with self._get_session() as session:
+            storage_filenames = {
+                conversation_id: await self._storage_filenames(session=session, conversation_id=conversation_id)
+                for conversation_id in conversation_ids
+            }
 
-        # write all files to a temporary directory
-        export_dir_path = temp_dir_path / "export"
-        export_dir_path.mkdir()
+            assistants = (
+                await session.exec(select(db.Assistant).where(col(db.Assistant.assistant_id).in_(assistant_ids)))
+            ).all()
 
-        # export records from database
-        with (export_dir_path / AssistantController.EXPORT_WORKBENCH_FILENAME).open("+wb") as workbench_file:
-            async for file_bytes in export_import.export_file(
-                conversation_ids=conversation_ids,
-                assistant_ids=assistant_ids,
-                session=session,
+            assistant_conversation_ids: dict[uuid.UUID, list[uuid.UUID]] = {
+                assistant.assistant_id: [] for assistant in assistants
+            }
+            for assistant_id, conversation_id in await session.exec(
+                select(db.AssistantParticipant.assistant_id, db.AssistantParticipant.conversation_id)
+                .where(col(db.AssistantParticipant.assistant_id).in_(assistant_ids))
+                .where(col(db.AssistantParticipant.conversation_id).in_(conversation_ids))
             ):
-                workbench_file.write(file_bytes)
+                assistant_conversation_ids[assistant_id].append(conversation_id)
 
-        # export files from storage
-        for conversation_id in conversation_ids:
-            source_dir = self._file_storage.path_for(namespace=str(conversation_id), filename="")
-            if not source_dir.is_dir():
-                continue
+        archive = zip_stream.ZipStreamWriter()
 
-            conversation_dir = export_dir_path / "files" / str(conversation_id)
-            conversation_dir.mkdir(parents=True)
-
-            await asyncio.to_thread(shutil.copytree, src=source_dir, dst=conversation_dir, dirs_exist_ok=True)
+        # export records from database
+        async for data in archive.write(
+            AssistantController.EXPORT_WORKBENCH_FILENAME,
+            export_import.export_file(
+                conversation_ids=conversation_ids,
+                assistant_ids=assistant_ids,
+                get_session=self._get_session,
+            ),
+        ):
+            yield data
 
-        # enumerate assistants
-        assistants = await session.exec(select(db.Assistant).where(col(db.Assistant.assistant_id).in_(assistant_ids)))
+        # export files from storage, laid out as the conversation's storage namespace
+        for conversation_id, conversation_storage_filenames in storage_filenames.items():
+            for storage_filename in conversation_storage_filenames:
+                storage_path = self._file_storage.path_for(namespace=str(conversation_id), filename=storage_filename)
+                try:
+                    async for data in archive.write(
+                        f"files/{conversation_id}/{storage_path.name}",
+                        self._file_storage.read_content(
+                            namespace=str(conversation_id), storage_filename=storage_filename
+                        ),
+                    ):
+                        yield data
+                except FileNotFoundError:
+                    logger.warning(
+                        "file content not found for export; conversation_id: %s, storage_filename: %s",
+                        conversation_id,
+                        storage_filename,
+                    )
 
+        # export assistants
         for assistant in assistants:
             assistant_client = await self._client_pool.assistant_client(assistant)
+            assistant_dir = f"assistants/{assistant.assistant_id}"
 
             # export assistant data
-            assistant_dir = export_dir_path / "assistants" / str(assistant.assistant_id)
-            assistant_dir.mkdir(parents=True)
-
-            with (assistant_dir / AssistantController.EXPORT_ASSISTANT_DATA_FILENAME).open("wb") as assistant_file:
-                async with assistant_client.get_exported_data() as response:
-                    async for chunk in response:
-                        assistant_file.write(chunk)
-
-            # enumerate assistant conversations
-            assistant_participants = await session.exec(
-                select(db.AssistantParticipant)
-                .where(db.AssistantParticipant.assistant_id == assistant.assistant_id)
-                .where(col(db.AssistantParticipant.conversation_id).in_(conversation_ids))
-            )
-
-            for assistant_participant in assistant_participants:
-                conversation_dir = assistant_dir / "conversations" / str(assistant_participant.conversation_id)
-                conversation_dir.mkdir(parents=True)
+            async with assistant_client.get_exported_data() as response:
+                async for data in archive.write(
+                    f"{assistant_dir}/{AssistantController.EXPORT_ASSISTANT_DATA_FILENAME}", response
+                ):
+                    yield data
+
+            # export assistant conversation data; the downloads run ahead of the archive, concurrently, while
+            # the archive is written in order
+            download_window = asyncio.Semaphore(AssistantController.EXPORT_CONVERSATION_DOWNLOAD_CONCURRENCY)
+            downloads = [
+                asyncio.create_task(
+                    self._download_exported_conversation_data(
+                        assistant_client=assistant_client,
+                        conversation_id=conversation_id,
+                        download_window=download_window,
+                    )
+                )
+                for conversation_id in assistant_conversation_ids[assistant.assistant_id]
+            ]
+            try:
+                for conversation_id, download in zip(assistant_conversation_ids[assistant.assistant_id], downloads):
+                    with await download as conversation_file:
+                        async for data in archive.write(
+                            f"{assistant_dir}/conversations/{conversation_id}/"
+                            f"{AssistantController.EXPORT_ASSISTANT_CONVERSATION_DATA_FILENAME}",
+                            _read_chunks(conversation_file),
+                        ):
+                            yield data
+                    download_window.release()
+            finally:
+                for download in downloads:
+                    download.cancel()
+                for result in await asyncio.gather(*downloads, return_exceptions=True):
+                    if not isinstance(result, BaseException):
+                        result.close()
+
+        yield archive.close()
+
+    async def _download_exported_conversation_data(
+        self,
+        assistant_client: AssistantClient,
+        conversation_id: uuid.UUID,
+        download_window: asyncio.Semaphore,
+    ) -> IO[bytes]:
+        """
+        Downloads the assistant's export of the conversation into a spooled temporary file, once there is room in
+        the download window. The caller releases the window once it has consumed the file.
+        """
+        await download_window.acquire()
+
+        conversation_file = tempfile.SpooledTemporaryFile(max_size=10 * 1_024 * 1_024)
+        try:
+            async with assistant_client.get_exported_conversation_data(conversation_id=conversation_id) as response:
+                async for chunk in response:
+                    conversation_file.write(chunk)
+        except BaseException:
+            conversation_file.close()
+            raise
+
+        conversation_file.seek(0)
+        return conversation_file
+
+    async def _repoint_imported_content(
+        self, session: AsyncSession, conversation_id: uuid.UUID, imported_filename: str, storage_filename: str
+    ) -> None:
+        """
+        Points the imported file versions whose content did not match the digest in their storage filename at the
+        content as it was stored. The content is locked, and stored again if a concurrent delete removed it, as in
+        FileController.upload_files.
+        """
+        imported_path = self._file_storage.path_for(namespace=str(conversation_id), filename=imported_filename)
+        async with self._file_storage.lock_content([storage_filename]):
+            await db.lock_content(session, [storage_filename])
+
+            with imported_path.open("rb") as imported_file:
+                await self._file_storage.ensure_content(storage_filename, imported_file)
+
+            version_records = (
+                await session.exec(
+                    select(db.FileVersion)
+                    .join(db.File)
+                    .where(db.File.conversation_id == conversation_id)
+                    .where(db.FileVersion.storage_filename == imported_filename)
+                )
+            ).all()
+            for version_record in version_records:
+                version_record.storage_filename = storage_filename
+                session.add(version_record)
 
-                # export assistant conversation data
-                with (conversation_dir / AssistantController.EXPORT_ASSISTANT_CONVERSATION_DATA_FILENAME).open(
-                    "wb"
-                ) as conversation_file:
-                    async with assistant_client.get_exported_conversation_data(
-                        conversation_id=assistant_participant.conversation_id
-                    ) as response:
-                        async for chunk in response:
-                            conversation_file.write(chunk)
-
-        # zip the export directory
-        zip_file_path = await asyncio.to_thread(
-            shutil.make_archive,
-            base_name=str(temp_dir_path / "zip"),
-            format="zip",
-            root_dir=export_dir_path,
-            base_dir="",
-            logger=logger,
-            verbose=True,
-        )
+            await session.commit()
 
-        def _cleanup() -> None:
-            shutil.rmtree(temp_dir_path, ignore_errors=True)
+        await asyncio.to_thread(imported_path.unlink)
 
-        return ExportResult(
-            file_path=zip_file_path,
-            content_type="application/zip",
-            filename=export_filename_prefix + ".zip",
-            cleanup=_cleanup,
+    async def _storage_filenames(self, session: AsyncSession, conversation_id: uuid.UUID) -> list[str]:
+        return list(
+            (
+                await session.exec(
+                    select(db.FileVersion.storage_filename)
+                    .join(db.File)
+                    .where(db.File.conversation_id == conversation_id)
+                    .distinct()
+                )
+            ).all()
         )
 
     async def export_conversations(
@@ -693,14 +869,14 @@ class AssistantController:
                 ).unique()
             )
 
-            return await self._export(
-                session=session,
-                export_filename_prefix=(
-                    f"semantic_workbench_conversation_export_{datetime.datetime.now(datetime.UTC).strftime('%Y%m%d%H%M%S')}"
-                ),
-                conversation_ids=conversation_ids,
-                assistant_ids=assistant_ids,
-            )
+        return ExportResult(
+            stream=self._export(conversation_ids=conversation_ids, assistant_ids=assistant_ids),
+            content_type="application/zip",
+            filename=(
+                f"semantic_workbench_conversation_export_{datetime.datetime.now(datetime.UTC).strftime('%Y%m%d%H%M%S')}"
+                ".zip"
+            ),
+        )
 
     async def import_conversations(
         self,
@@ -715,12 +891,34 @@ class AssistantController:
                 with zipfile.ZipFile(file=from_export, mode="r") as zip_file:
                     await asyncio.to_thread(zip_file.extractall, path=extraction_path)
 
+                async def _report_progress(progress: export_import.ImportProgress) -> None:
+                    logger.info(
+                        "importing conversations; user_id: %s, records: %d, conversations: %d, messages: %d",
+                        user_principal.user_id,
+                        progress.records,
+                        progress.conversations,
+                        progress.messages,
+                    )
+                    # reaches the user's /events clients that are connected to this node
+                    self._notify_user_event(
+                        user_principal.user_id,
+                        UserEventQueueItem(
+                            event="import.progress",
+                            data={
+                                "records": progress.records,
+                                "conversations": progress.conversations,
+                                "messages": progress.messages,
+                            },
+                        ),
+                    )
+
                 # import records into database
                 with (extraction_path / AssistantController.EXPORT_WORKBENCH_FILENAME).open("rb") as workbench_file:
                     import_result = await export_import.import_files(
                         session=session,
                         owner_id=user_principal.user_id,
                         files=[workbench_file],
+                        on_progress=_report_progress,
                     )
 
                 await session.commit()
@@ -734,6 +932,20 @@ class AssistantController:
                     storage_path = self._file_storage.path_for(namespace=str(new_conversation_id), filename="")
                     await asyncio.to_thread(shutil.copytree, src=files_path, dst=storage_path)
 
+                    mismatched = await self._file_storage.import_content(
+                        namespace=str(new_conversation_id),
+                        storage_filenames=await self._storage_filenames(
+                            session=session, conversation_id=new_conversation_id
+                        ),
+                    )
+                    for imported_filename, storage_filename in mismatched.items():
+                        await self._repoint_imported_content(
+                            session=session,
+                            conversation_id=new_conversation_id,
+                            imported_filename=imported_filename,
+                            storage_filename=storage_filename,
+                        )
+
                 try:
                     # enumerate assistants
                     for old_assistant_id, new_assistant_id in import_result.assistant_id_old_to_new.items():
@@ -930,7 +1142,8 @@ class AssistantController:
                     )
                     session.add(new_version)
 
-            # Copy files associated with the conversation
+            # Copy files associated with the conversation; content-addressed file content is shared by the copied
+            # FileVersion entries, so only files stored in the conversation's namespace need to be copied
             original_files_path = self._file_storage.path_for(
                 namespace=str(original_conversation.conversation_id), filename=""
             )
@@ -21,6 +21,7 @@ from .. import assistant_api_key, auth, db, settings
 from ..event import ConversationEventQueueItem
 from . import convert, exceptions
 from . import participant as participant_
+from .active_assistant_index import ActiveAssistantIndex
 from . import user as user_
 from .assistant_service_client_pool import AssistantServiceClientPool
 
@@ -34,11 +35,13 @@ class AssistantServiceRegistrationController:
         notify_event: Callable[[ConversationEventQueueItem], Awaitable],
         api_key_store: assistant_api_key.ApiKeyStore,
         client_pool: AssistantServiceClientPool,
+        active_assistant_index: ActiveAssistantIndex,
     ) -> None:
         self._get_session = get_session
         self._notify_event = notify_event
         self._api_key_store = api_key_store
         self._client_pool = client_pool
+        self._active_assistant_index = active_assistant_index
 
     @property
     def _registration_is_secured(self) -> bool:
@@ -212,6 +215,7 @@ class AssistantServiceRegistrationController:
             raise exceptions.ForbiddenError()
 
         background_task_args: Iterable = ()
+        url_changed = False
         async with self._get_session() as session:
             registration = (
                 await session.exec(
@@ -238,7 +242,8 @@ class AssistantServiceRegistrationController:
             if self._registration_is_secured and update_assistant_service_url.url.scheme != "https":
                 raise exceptions.InvalidArgumentError("url must be https")
 
-            if registration.assistant_service_url != str(update_assistant_service_url.url):
+            url_changed = registration.assistant_service_url != str(update_assistant_service_url.url)
+            if url_changed:
                 registration.assistant_service_url = str(update_assistant_service_url.url)
                 logger.info(
                     "updated assistant service url; assistant_service_id: %s, url: %s",
@@ -258,6 +263,10 @@ class AssistantServiceRegistrationController:
             await session.commit()
             await session.refresh(registration)
 
+        if background_task_args or url_changed:
+            # the service came online, or moved, so the assistants that receive events and their urls have changed
+            self._active_assistant_index.invalidate_all()
+
         return convert.assistant_service_registration_from_db(
             registration, include_api_key_name=self._registration_is_secured
         ), background_task_args
@@ -340,6 +349,8 @@ class AssistantServiceRegistrationController:
             assistant_service_ids = result.scalars().all()
             await session.commit()
 
+        self._active_assistant_index.invalidate_all()
+
         for assistant_service_id in assistant_service_ids:
             await self._update_participants(assistant_service_id=assistant_service_id)
 
@@ -361,6 +372,7 @@ class AssistantServiceRegistrationController:
 
             await session.delete(registration)
             await session.commit()
+            self._active_assistant_index.invalidate_all()
 
             await self._api_key_store.delete(registration.api_key_name)
 
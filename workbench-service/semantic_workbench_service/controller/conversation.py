@@ -1,3 +1,5 @@
+import base64
+import collections
 import datetime
 import logging
 import openai_client
@@ -21,6 +23,7 @@ from semantic_workbench_api_model.workbench_model import (
     MessageType,
     NewConversation,
     NewConversationMessage,
+    NewConversationMessageDelta,
     ParticipantRole,
     UpdateConversation,
     UpdateParticipant,
@@ -32,6 +35,7 @@ from .. import auth, db, query, settings
 from ..event import ConversationEventQueueItem
 from . import assistant, convert, exceptions
 from . import participant as participant_
+from .active_assistant_index import ActiveAssistantIndex
 from . import user as user_
 
 logger = logging.getLogger(__name__)
@@ -56,16 +60,42 @@ The maximum number of times a conversation can be automatically retitled.
 """
 
 
+def _encode_conversation_cursor(conversation: db.Conversation) -> str:
+    cursor = f"{conversation.created_datetime.isoformat()}|{conversation.conversation_id}"
+    return base64.urlsafe_b64encode(cursor.encode("utf-8")).decode("ascii")
+
+
+def _decode_conversation_cursor(cursor: str) -> tuple[datetime.datetime, uuid.UUID]:
+    try:
+        created_datetime, conversation_id = base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8").split("|")
+        return datetime.datetime.fromisoformat(created_datetime), uuid.UUID(conversation_id)
+    except ValueError as e:
+        raise exceptions.InvalidArgumentError(detail="invalid cursor") from e
+
+
+def _encode_message_cursor(message: db.ConversationMessage) -> str:
+    return base64.urlsafe_b64encode(str(message.sequence).encode("utf-8")).decode("ascii")
+
+
+def _decode_message_cursor(cursor: str) -> int:
+    try:
+        return int(base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8"))
+    except ValueError as e:
+        raise exceptions.InvalidArgumentError(detail="invalid cursor") from e
+
+
 class ConversationController:
     def __init__(
         self,
         get_session: Callable[[], AsyncContextManager[AsyncSession]],
         notify_event: Callable[[ConversationEventQueueItem], Awaitable],
         assistant_controller: assistant.AssistantController,
+        active_assistant_index: ActiveAssistantIndex,
     ) -> None:
         self._get_session = get_session
         self._notify_event = notify_event
         self._assistant_controller = assistant_controller
+        self._active_assistant_index = active_assistant_index
 
     async def create_conversation(
         self,
@@ -149,6 +179,16 @@ class ConversationController:
         ).all()
         assistants_map = {assistant.assistant_id: assistant for assistant in assistants}
 
+        user_participants_by_conversation: dict[uuid.UUID, list[db.UserParticipant]] = collections.defaultdict(list)
+        for user_participant in user_participants:
+            user_participants_by_conversation[user_participant.conversation_id].append(user_participant)
+
+        assistant_participants_by_conversation: dict[uuid.UUID, list[db.AssistantParticipant]] = (
+            collections.defaultdict(list)
+        )
+        for assistant_participant in assistant_participants:
+            assistant_participants_by_conversation[assistant_participant.conversation_id].append(assistant_participant)
+
         def merge() -> Iterable[
             tuple[
                 db.Conversation,
@@ -162,16 +202,10 @@ class ConversationController:
         ]:
             for conversation, latest_message, latest_message_has_debug, permission in conversation_projections:
                 conversation_id = conversation.conversation_id
-                conversation_user_participants = (
-                    up for up in user_participants if up.conversation_id == conversation_id
-                )
-                conversation_assistant_participants = (
-                    ap for ap in assistant_participants if ap.conversation_id == conversation_id
-                )
                 yield (
                     conversation,
-                    conversation_user_participants,
-                    conversation_assistant_participants,
+                    user_participants_by_conversation.get(conversation_id, []),
+                    assistant_participants_by_conversation.get(conversation_id, []),
                     assistants_map,
                     latest_message,
                     latest_message_has_debug,
@@ -185,26 +219,55 @@ class ConversationController:
         principal: auth.ActorPrincipal,
         latest_message_types: set[MessageType],
         include_all_owned: bool = False,
+        limit: int | None = None,
+        before: str | None = None,
     ) -> ConversationList:
+        """
+        Lists the conversations, newest first. When a limit is given, the list is paged: the next page is requested
+        with the `next_cursor` of the current page as `before`.
+        """
         async with self._get_session() as session:
             include_all_owned = include_all_owned and isinstance(principal, auth.UserPrincipal)
 
-            conversation_projections = (
-                await session.exec(
-                    query.select_conversation_projections_for(
-                        principal=principal,
-                        include_all_owned=include_all_owned,
-                        include_observer=True,
-                        latest_message_types=latest_message_types,
-                    ).order_by(col(db.Conversation.created_datetime).desc())
+            select_query = query.select_conversation_projections_for(
+                principal=principal,
+                include_all_owned=include_all_owned,
+                include_observer=True,
+                latest_message_types=latest_message_types,
+            )
+
+            if before is not None:
+                before_created_datetime, before_conversation_id = _decode_conversation_cursor(before)
+                select_query = select_query.where(
+                    or_(
+                        col(db.Conversation.created_datetime) < before_created_datetime,
+                        and_(
+                            col(db.Conversation.created_datetime) == before_created_datetime,
+                            col(db.Conversation.conversation_id) < before_conversation_id,
+                        ),
+                    )
                 )
-            ).all()
+
+            select_query = select_query.order_by(
+                col(db.Conversation.created_datetime).desc(), col(db.Conversation.conversation_id).desc()
+            )
+
+            if limit is not None:
+                # fetch one more than the limit to learn whether there is a next page
+                select_query = select_query.limit(limit + 1)
+
+            conversation_projections = (await session.exec(select_query)).all()
+
+            next_cursor = None
+            if limit is not None and len(conversation_projections) > limit:
+                conversation_projections = conversation_projections[:limit]
+                next_cursor = _encode_conversation_cursor(conversation_projections[-1][0])
 
             projections_with_participants = await self._projections_with_participants(
                 session=session, conversation_projections=conversation_projections
             )
 
-            return convert.conversation_list_from_db(models=projections_with_participants)
+            return convert.conversation_list_from_db(models=projections_with_participants, next_cursor=next_cursor)
 
     async def get_assistant_conversations(
         self,
@@ -533,6 +596,9 @@ class ConversationController:
                     await session.commit()
                     await session.refresh(participant)
 
+                if active_participant_changed:
+                    self._active_assistant_index.invalidate(conversation.conversation_id)
+
                 if active_participant_changed and participant.active_participant:
                     try:
                         await self._assistant_controller.connect_assistant_to_conversation(
@@ -548,6 +614,7 @@ class ConversationController:
                         )
                         session.add(original_participant)
                         await session.commit()
+                        self._active_assistant_index.invalidate(conversation.conversation_id)
                         raise
 
                 if active_participant_changed and not participant.active_participant:
@@ -771,6 +838,35 @@ class ConversationController:
 
         return message_response, background_task
 
+    async def send_message_delta(
+        self,
+        assistant_principal: auth.AssistantPrincipal,
+        conversation_id: uuid.UUID,
+        message_id: uuid.UUID,
+        delta: NewConversationMessageDelta,
+    ) -> None:
+        """
+        Delivers partial content of a message to the conversation's SSE clients. Nothing is written to the database;
+        the active assistant index authorizes the assistant, so deltas do not query it either, once cached.
+        """
+        if assistant_principal.assistant_id not in await self._active_assistant_index.assistant_ids(conversation_id):
+            raise exceptions.NotFoundError()
+
+        await self._notify_event(
+            ConversationEventQueueItem(
+                event=ConversationEvent(
+                    conversation_id=conversation_id,
+                    event=ConversationEventType.message_delta,
+                    data={
+                        "message_id": message_id,
+                        "participant_id": str(assistant_principal.assistant_id),
+                        "content": delta.content,
+                    },
+                ),
+                event_audience={"user"},
+            )
+        )
+
     def _message_candidate_for_retitling(self, message: db.ConversationMessage) -> bool:
         """Check if the message is a candidate for retitling the conversation."""
         if message.sender_participant_role != ParticipantRole.user.value:
@@ -964,8 +1060,15 @@ class ConversationController:
         message_types: list[MessageType] | None = None,
         before: uuid.UUID | None = None,
         after: uuid.UUID | None = None,
+        before_cursor: str | None = None,
+        after_cursor: str | None = None,
         limit: int = 100,
     ) -> ConversationMessageList:
+        """
+        Lists the latest messages, up to the limit, in sequence order. Older messages are requested with the
+        `next_cursor` of the list as `before_cursor`. Unlike `before` and `after`, which look up the sequence of the
+        boundary message, cursors carry the sequence and so do not need the extra query.
+        """
         async with self._get_session() as session:
             conversation = (
                 await session.exec(
@@ -1018,14 +1121,33 @@ class ConversationController:
                 if boundary is not None:
                     select_query = select_query.where(db.ConversationMessage.sequence > boundary.sequence)
 
+            if before_cursor is not None:
+                select_query = select_query.where(
+                    db.ConversationMessage.sequence < _decode_message_cursor(before_cursor)
+                )
+
+            if after_cursor is not None:
+                select_query = select_query.where(
+                    db.ConversationMessage.sequence > _decode_message_cursor(after_cursor)
+                )
+
+            # fetch one more than the limit to learn whether there are older messages
             messages = list(
                 (
-                    await session.exec(select_query.order_by(col(db.ConversationMessage.sequence).desc()).limit(limit))
+                    await session.exec(
+                        select_query.order_by(col(db.ConversationMessage.sequence).desc()).limit(limit + 1)
+                    )
                 ).all()
             )
+
+            next_cursor = None
+            if len(messages) > limit:
+                messages = messages[:limit]
+                next_cursor = _encode_message_cursor(messages[-1][0])
+
             messages.reverse()
 
-            return convert.conversation_message_list_from_db(messages)
+            return convert.conversation_message_list_from_db(messages, next_cursor=next_cursor)
 
     async def delete_message(
         self,
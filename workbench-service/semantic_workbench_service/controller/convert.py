@@ -184,8 +184,10 @@ def conversation_list_from_db(
             str,
         ]
     ],
+    next_cursor: str | None = None,
 ) -> ConversationList:
     return ConversationList(
+        next_cursor=next_cursor,
         conversations=[
             conversation_from_db(
                 model=conversation,
@@ -197,7 +199,7 @@ def conversation_list_from_db(
                 permission=permission,
             )
             for conversation, user_participants, assistant_participants, assistants, latest_message, latest_message_has_debug, permission in models
-        ]
+        ],
     )
 
 
@@ -259,8 +261,12 @@ def conversation_message_from_db(model: db.ConversationMessage, has_debug: bool)
 
 def conversation_message_list_from_db(
     models: Iterable[tuple[db.ConversationMessage, bool]],
+    next_cursor: str | None = None,
 ) -> ConversationMessageList:
-    return ConversationMessageList(messages=[conversation_message_from_db(m, debug) for m, debug in models])
+    return ConversationMessageList(
+        next_cursor=next_cursor,
+        messages=[conversation_message_from_db(m, debug) for m, debug in models],
+    )
 
 
 def conversation_message_debug_from_db(model: db.ConversationMessageDebug) -> ConversationMessageDebug:
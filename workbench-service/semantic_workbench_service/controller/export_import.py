@@ -3,12 +3,11 @@ import datetime
 import re
 import tempfile
 import uuid
-from operator import or_
-from typing import IO, Any, AsyncGenerator, Generator, Iterable, Iterator
+from typing import IO, Any, AsyncContextManager, AsyncGenerator, Awaitable, Callable, Generator, Iterable, Iterator
 
 from attr import dataclass
 from pydantic import BaseModel
-from sqlalchemy import ScalarResult, func
+from sqlalchemy import ScalarResult, update
 from sqlmodel import SQLModel, col, select
 from sqlmodel.ext.asyncio.session import AsyncSession
 
@@ -33,8 +32,27 @@ def _lines_from(records: Iterator[_Record]) -> Generator[bytes, None, None]:
 async def export_file(
     conversation_ids: set[uuid.UUID],
     assistant_ids: set[uuid.UUID],
-    session: AsyncSession,
+    get_session: Callable[[], AsyncContextManager[AsyncSession]],
 ) -> AsyncGenerator[bytes, None]:
+    """
+    Exports the records as JSON lines. The records are written to a temporary file, and the session closed, before
+    the lines are yielded, so that no session is held while the export is streamed.
+    """
+    with tempfile.TemporaryFile() as f:
+        async with get_session() as session:
+            await _write_records(f, conversation_ids=conversation_ids, assistant_ids=assistant_ids, session=session)
+
+        f.seek(0)
+        for line in iter(lambda: f.readline(), b""):
+            yield line
+
+
+async def _write_records(
+    f: IO[bytes],
+    conversation_ids: set[uuid.UUID],
+    assistant_ids: set[uuid.UUID],
+    session: AsyncSession,
+) -> None:
     assistants = await session.exec(
         select(db.Assistant)
         .where(col(db.Assistant.assistant_id).in_(assistant_ids))
@@ -97,24 +115,20 @@ async def export_file(
             for record in source:
                 yield _model_record(record)
 
-    with tempfile.TemporaryFile() as f:
-        f.writelines(
-            _lines_from(
-                _records(
-                    assistants,
-                    conversations,
-                    messages,
-                    message_debugs,
-                    user_participants,
-                    assistant_participants,
-                    files,
-                    file_versions,
-                )
+    f.writelines(
+        _lines_from(
+            _records(
+                assistants,
+                conversations,
+                messages,
+                message_debugs,
+                user_participants,
+                assistant_participants,
+                files,
+                file_versions,
             )
         )
-        f.seek(0)
-        for line in iter(lambda: f.readline(), b""):
-            yield line
+    )
 
 
 @dataclass
@@ -126,7 +140,53 @@ class ImportResult:
     file_id_old_to_new: dict[uuid.UUID, uuid.UUID]
 
 
-async def import_files(session: AsyncSession, owner_id: str, files: Iterable[IO[bytes]]) -> ImportResult:
+@dataclass
+class ImportProgress:
+    records: int = 0
+    conversations: int = 0
+    messages: int = 0
+
+
+class _NameSuffixes:
+    """
+    Counts the names in use, so that an imported name that is already in use can be given a " (n)" suffix, where n
+    is the number of names that are the same or the same with a suffix, without a query per name.
+    """
+
+    def __init__(self, names: Iterable[str]) -> None:
+        self._counts: collections.Counter[str] = collections.Counter()
+        for name in names:
+            self._add(name)
+
+    def _add(self, name: str) -> None:
+        name = name.lower()
+        self._counts[name] += 1
+        match = re.match(r"^(.*) \(\d+\)$", name)
+        if match:
+            self._counts[match.group(1)] += 1
+
+    def unique(self, name: str) -> str:
+        existing_count = self._counts[name.lower()]
+        if existing_count > 0:
+            name = f"{name} ({existing_count})"
+        self._add(name)
+        return name
+
+
+_import_batch_size = 1_000
+
+
+async def import_files(
+    session: AsyncSession,
+    owner_id: str,
+    files: Iterable[IO[bytes]],
+    on_progress: Callable[[ImportProgress], Awaitable[None]] | None = None,
+    batch_size: int = _import_batch_size,
+) -> ImportResult:
+    """
+    Imports the records of an export, flushing them to the database in batches of batch_size records. on_progress,
+    if given, is called after each batch.
+    """
     result = ImportResult(
         assistant_id_old_to_new={},
         conversation_id_old_to_new={},
@@ -145,30 +205,10 @@ async def import_files(session: AsyncSession, owner_id: str, files: Iterable[IO[
                 assistant.assistant_id = result.assistant_id_old_to_new[assistant.assistant_id]
                 assistant.owner_id = owner_id
 
-                like_expression = re.sub(r"([?%_])", r"\\\1", assistant.name.lower())
-                like_expression = f"{like_expression} (%)"
-                existing_count = 0
-                for possible_match in await session.exec(
-                    select(db.Assistant)
-                    .where(db.Assistant.owner_id == owner_id)
-                    .where(
-                        or_(
-                            func.lower(col(db.Assistant.name)).like(like_expression),
-                            func.lower(col(db.Assistant.name)) == assistant.name.lower(),
-                        )
-                    )
-                ):
-                    if possible_match.name.lower() == assistant.name.lower():
-                        existing_count += 1
-                        continue
-                    name = possible_match.name.lower().replace(assistant.name.lower(), "", 1)
-                    if re.match(r"^ \(\d+\)$", name):
-                        existing_count += 1
-
-                if existing_count > 0:
-                    assistant.name = f"{assistant.name} ({existing_count})"
+                assistant.name = assistant_names.unique(assistant.name)
 
                 session.add(assistant)
+                pending_assistant_ids.add(assistant.assistant_id)
 
             case db.AssistantParticipant.__name__:
                 participant = db.AssistantParticipant.model_validate(record.data)
@@ -181,6 +221,9 @@ async def import_files(session: AsyncSession, owner_id: str, files: Iterable[IO[
                 assistant_id = result.assistant_id_old_to_new.get(participant.assistant_id)
                 if assistant_id is not None:
                     participant.assistant_id = assistant_id
+                if participant.assistant_id in pending_assistant_ids:
+                    # inserting an assistant participant reads its assistant, which must be flushed first
+                    await _flush()
                 session.add(participant)
 
             case db.UserParticipant.__name__:
@@ -193,9 +236,8 @@ async def import_files(session: AsyncSession, owner_id: str, files: Iterable[IO[
                 participant.active_participant = False
                 participant.status = None
 
-                await db.insert_if_not_exists(
-                    session, db.User(user_id=participant.user_id, name="unknown imported user", service_user=False)
-                )
+                if participant.user_id not in known_user_ids:
+                    pending_user_ids.add(participant.user_id)
 
                 session.add(participant)
 
@@ -207,31 +249,10 @@ async def import_files(session: AsyncSession, owner_id: str, files: Iterable[IO[
                 conversation.created_datetime = datetime.datetime.now(datetime.UTC)
                 conversation.owner_id = owner_id
 
-                like_expression = re.sub(r"([?%_])", r"\\\1", conversation.title.lower())
-                like_expression = f"{like_expression} (%)"
-                existing_count = 0
-                for possible_match in await session.exec(
-                    select(db.Conversation)
-                    .where(db.Conversation.owner_id == owner_id)
-                    .where(
-                        or_(
-                            func.lower(col(db.Conversation.title)).like(like_expression),
-                            func.lower(col(db.Conversation.title)) == conversation.title.lower(),
-                        )
-                    )
-                ):
-                    if possible_match.title.lower() == conversation.title.lower():
-                        existing_count += 1
-                        continue
-
-                    name = possible_match.title.lower().replace(conversation.title.lower(), "", 1)
-                    if re.match(r"^ \(\d+\)$", name):
-                        existing_count += 1
-
-                if existing_count > 0:
-                    conversation.title = f"{conversation.title} ({existing_count})"
+                conversation.title = conversation_titles.unique(conversation.title)
 
                 session.add(conversation)
+                progress.conversations += 1
 
             case db.ConversationMessage.__name__:
                 record.data.pop("sequence", None)
@@ -248,6 +269,7 @@ async def import_files(session: AsyncSession, owner_id: str, files: Iterable[IO[
                     if assistant_id is not None:
                         message.sender_participant_id = str(assistant_id)
                 session.add(message)
+                progress.messages += 1
 
             case db.ConversationMessageDebug.__name__:
                 message_debug = db.ConversationMessageDebug.model_validate(record.data)
@@ -281,14 +303,56 @@ async def import_files(session: AsyncSession, owner_id: str, files: Iterable[IO[
                         file_version.participant_id = str(assistant_id)
                 session.add(file_version)
 
+    async def _ensure_users() -> None:
+        # user participants require their user to exist
+        if not pending_user_ids:
+            return
+
+        existing_user_ids = set(
+            (await session.exec(select(db.User.user_id).where(col(db.User.user_id).in_(pending_user_ids)))).all()
+        )
+        for user_id in pending_user_ids - existing_user_ids:
+            await db.insert_if_not_exists(
+                session, db.User(user_id=user_id, name="unknown imported user", service_user=False)
+            )
+
+        known_user_ids.update(pending_user_ids)
+        pending_user_ids.clear()
+
+    async def _flush() -> None:
+        await _ensure_users()
+        # the records of a batch are inserted together, as a multi-row INSERT per table
+        await session.flush()
+        pending_assistant_ids.clear()
+        # the imported records are not used again, so don't hold every record of the import in memory
+        session.expunge_all()
+        if on_progress is not None:
+            await on_progress(progress)
+
+    assistant_names = _NameSuffixes(
+        (await session.exec(select(db.Assistant.name).where(db.Assistant.owner_id == owner_id))).all()
+    )
+    conversation_titles = _NameSuffixes(
+        (await session.exec(select(db.Conversation.title).where(db.Conversation.owner_id == owner_id))).all()
+    )
+    known_user_ids: set[str] = set()
+    pending_user_ids: set[str] = set()
+    pending_assistant_ids: set[uuid.UUID] = set()
+    progress = ImportProgress()
+
     for file in files:
         for line in iter(lambda: file.readline(), b""):
             record = _Record.model_validate_json(line.decode("utf-8"))
             await _process_record(record)
-            await session.flush()
+            progress.records += 1
+            if progress.records % batch_size == 0:
+                await _flush()
+
+    await _flush()
 
     # ensure the owner is a participant in all conversations
-    for _, conversation_id in result.conversation_id_old_to_new.items():
+    conversation_ids = list(result.conversation_id_old_to_new.values())
+    for conversation_id in conversation_ids:
         await db.insert_if_not_exists(
             session,
             db.UserParticipant(
@@ -299,17 +363,15 @@ async def import_files(session: AsyncSession, owner_id: str, files: Iterable[IO[
             ),
         )
 
-        importing_user_participant = (
-            await session.exec(
-                select(db.UserParticipant)
-                .where(db.UserParticipant.conversation_id == conversation_id)
-                .where(db.UserParticipant.user_id == owner_id)
-                .with_for_update()
-            )
-        ).one()
-        importing_user_participant.conversation_permission = "read_write"
-        importing_user_participant.active_participant = True
-        session.add(importing_user_participant)
+    # the owner may have been an imported participant, which are imported inactive
+    if conversation_ids:
+        conn = await session.connection()
+        await conn.execute(
+            update(db.UserParticipant)
+            .where(col(db.UserParticipant.user_id) == owner_id)
+            .where(col(db.UserParticipant.conversation_id).in_(conversation_ids))
+            .values(conversation_permission="read_write", active_participant=True)
+        )
 
     await session.flush()
 
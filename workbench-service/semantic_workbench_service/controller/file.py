@@ -2,10 +2,9 @@ import uuid
 from typing import (
     Any,
     AsyncContextManager,
+    AsyncIterator,
     Awaitable,
     Callable,
-    Generator,
-    Iterable,
     NamedTuple,
 )
 
@@ -24,7 +23,7 @@ from ..event import ConversationEventQueueItem
 from . import convert, exceptions
 
 DownloadFileResult = NamedTuple(
-    "DownloadFileResult", [("filename", str), ("content_type", str), ("stream", Iterable[bytes])]
+    "DownloadFileResult", [("filename", str), ("content_type", str), ("stream", AsyncIterator[bytes])]
 )
 
 
@@ -97,47 +96,54 @@ class FileController:
                     role = "assistant"
                     participant_id = str(principal.assistant_id)
 
-            file_record_and_versions: list[tuple[db.File, db.FileVersion]] = []
-
-            for file_record, upload_file in file_record_and_uploads:
-                file_record.current_version += 1
-                new_version = db.FileVersion(
-                    file_id=file_record.file_id,
-                    participant_role=role,
-                    participant_id=participant_id,
-                    version=file_record.current_version,
-                    content_type=upload_file.content_type or "",
-                    file_size=upload_file.size or 0,
-                    meta_data=file_metadata.get(file_record.filename, {}),
-                    storage_filename=f"{file_record.file_id.hex}_{file_record.current_version}",
-                )
-                file_record_and_versions.append((file_record, new_version))
+            # identical content is stored once, whichever conversation or file it is uploaded to
+            storage_filenames = [
+                await self._file_storage.write_content(upload_file.file) for _, upload_file in file_record_and_uploads
+            ]
 
-                self._file_storage.write_file(
-                    namespace=str(conversation_id),
-                    filename=new_version.storage_filename,
-                    content=upload_file.file,
-                )
-                session.add(file_record)
-                session.add(new_version)
+            file_record_and_versions: list[tuple[db.File, db.FileVersion]] = []
 
-                await self._notify_event(
-                    ConversationEventQueueItem(
-                        event=ConversationEvent(
-                            conversation_id=conversation_id,
-                            event=(
-                                ConversationEventType.file_created
-                                if new_version.version == 1
-                                else ConversationEventType.file_updated
+            # a concurrent delete_file may have deleted content that was already stored, and unreferenced, before the
+            # file versions referencing it are committed, so the content is locked, and stored again if deleted
+            async with self._file_storage.lock_content(storage_filenames):
+                await db.lock_content(session, storage_filenames)
+
+                for (file_record, upload_file), storage_filename in zip(file_record_and_uploads, storage_filenames):
+                    await self._file_storage.ensure_content(storage_filename, upload_file.file)
+
+                    file_record.current_version += 1
+                    new_version = db.FileVersion(
+                        file_id=file_record.file_id,
+                        participant_role=role,
+                        participant_id=participant_id,
+                        version=file_record.current_version,
+                        content_type=upload_file.content_type or "",
+                        file_size=upload_file.size or 0,
+                        meta_data=file_metadata.get(file_record.filename, {}),
+                        storage_filename=storage_filename,
+                    )
+                    file_record_and_versions.append((file_record, new_version))
+
+                    session.add(file_record)
+                    session.add(new_version)
+
+                    await self._notify_event(
+                        ConversationEventQueueItem(
+                            event=ConversationEvent(
+                                conversation_id=conversation_id,
+                                event=(
+                                    ConversationEventType.file_created
+                                    if new_version.version == 1
+                                    else ConversationEventType.file_updated
+                                ),
+                                data={
+                                    "file": convert.file_from_db((file_record, new_version)).model_dump(),
+                                },
                             ),
-                            data={
-                                "file": convert.file_from_db((file_record, new_version)).model_dump(),
-                            },
-                        ),
+                        )
                     )
-                )
 
-            await session.commit()
+                await session.commit()
 
             return convert.file_list_from_db(file_record_and_versions)
 
@@ -243,20 +249,15 @@ class FileController:
 
             file_record, version_record = file_records
 
-        def generator_wrapper() -> Generator[bytes, Any, None]:
-            with self._file_storage.read_file(
-                namespace=str(conversation_id),
-                filename=version_record.storage_filename,
-            ) as file:
-                for chunk in iter(lambda: file.read(100 * 1_024), b""):
-                    yield chunk
-
         filename = file_record.filename.split("/")[-1]
 
         return DownloadFileResult(
             filename=filename,
             content_type=version_record.content_type,
-            stream=generator_wrapper(),
+            stream=self._file_storage.read_content(
+                namespace=str(conversation_id),
+                storage_filename=version_record.storage_filename,
+            ),
         )
 
     async def delete_file(
@@ -297,16 +298,37 @@ class FileController:
             ).all()
 
             for version_record in version_records:
-                self._file_storage.delete_file(
-                    namespace=str(conversation_id),
-                    filename=version_record.storage_filename,
-                )
                 await session.delete(version_record)
             await session.commit()
 
             await session.delete(file_record)
             await session.commit()
 
+            # content-addressed content is shared by every file version with the same content, in any conversation,
+            # so it is only deleted once the last version referencing it is deleted; the lock keeps upload_files from
+            # referencing it again until it is
+            storage_filenames = {version_record.storage_filename for version_record in version_records}
+            async with self._file_storage.lock_content(storage_filenames):
+                await db.lock_content(session, storage_filenames)
+
+                still_referenced = set(
+                    (
+                        await session.exec(
+                            select(db.FileVersion.storage_filename)
+                            .where(col(db.FileVersion.storage_filename).in_(storage_filenames))
+                            .distinct()
+                        )
+                    ).all()
+                )
+
+                for storage_filename in storage_filenames - still_referenced:
+                    await self._file_storage.delete_content(
+                        namespace=str(conversation_id),
+                        storage_filename=storage_filename,
+                    )
+
+                await session.commit()
+
         await self._notify_event(
             ConversationEventQueueItem(
                 event=ConversationEvent(
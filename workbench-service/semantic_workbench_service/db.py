@@ -1,9 +1,10 @@
 import datetime
 import logging
 import pathlib
+import time
 import uuid
 from contextlib import asynccontextmanager
-from typing import Annotated, Any, AsyncIterator
+from typing import Annotated, Any, AsyncIterator, Iterable
 from urllib.parse import urlparse
 
 import sqlalchemy
@@ -12,10 +13,10 @@ import sqlalchemy.orm
 import sqlalchemy.orm.attributes
 from sqlalchemy.dialects import postgresql
 from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
-from sqlmodel import Field, Relationship, Session, SQLModel, select
+from sqlmodel import Field, Relationship, Session, SQLModel, col, select
 from sqlmodel.ext.asyncio.session import AsyncSession
 
-from . import service_user_principals
+from . import files, metrics, service_user_principals
 from .config import DBSettings
 
 # Download DB Browser for SQLite to view the database
@@ -300,6 +301,37 @@ class ConversationMessage(SQLModel, table=True):
     # this relationship is needed to enforce correct INSERT order by SQLModel
     related_conversation: Conversation = Relationship()
 
+    __table_args__ = (
+        sqlalchemy.Index("ix_conversationmessage_conversation_id_sequence", "conversation_id", "sequence"),
+        sqlalchemy.Index(
+            "ix_conversationmessage_conversation_id_message_type_sequence",
+            "conversation_id",
+            "message_type",
+            "sequence",
+        ),
+    )
+
+
+class ConversationLatestMessage(SQLModel, table=True):
+    """
+    The sequence of the latest message of each message type in a conversation, maintained as messages are inserted
+    and deleted, so that conversation lists do not aggregate over all messages.
+    """
+
+    conversation_id: uuid.UUID = Field(
+        sa_column=sqlalchemy.Column(
+            sqlalchemy.ForeignKey(
+                "conversation.conversation_id",
+                name="fk_conversationlatestmessage_conversation_id_conversation",
+                ondelete="CASCADE",
+            ),
+            nullable=False,
+            primary_key=True,
+        ),
+    )
+    message_type: str = Field(primary_key=True)
+    sequence: int
+
 
 class ConversationMessageDebug(SQLModel, table=True):
     message_id: uuid.UUID = Field(
@@ -363,7 +395,7 @@ class FileVersion(SQLModel, table=True):
     meta_data: dict[str, Any] = Field(sa_column=sqlalchemy.Column("metadata", sqlalchemy.JSON), default={})
     content_type: str
     file_size: int
-    storage_filename: str
+    storage_filename: str = Field(index=True)
 
     # this relationship is needed to enforce correct INSERT order by SQLModel
     related_file: File = Relationship()
@@ -423,6 +455,8 @@ async def create_engine(settings: DBSettings) -> AsyncIterator[AsyncEngine]:
         })
 
     engine = create_async_engine(db_url, **kw_args)
+    if metrics.enabled:
+        _measure_queries(engine)
 
     try:
         yield engine
@@ -430,6 +464,33 @@ async def create_engine(settings: DBSettings) -> AsyncIterator[AsyncEngine]:
         await engine.dispose()
 
 
+_measured_statements = {"SELECT", "INSERT", "UPDATE", "DELETE"}
+
+
+def _measure_queries(engine: AsyncEngine) -> None:
+    """
+    Times each statement executed by the engine, by statement type. Only installed when metrics are enabled.
+    """
+
+    def before_cursor_execute(conn: sqlalchemy.Connection, *args: Any) -> None:
+        conn.info.setdefault("query_start_times", []).append(time.perf_counter())
+
+    def after_cursor_execute(conn: sqlalchemy.Connection, cursor: Any, statement: str, *args: Any) -> None:
+        duration = time.perf_counter() - conn.info["query_start_times"].pop()
+        statement_type = statement.lstrip()[:6].upper()
+        if statement_type not in _measured_statements:
+            statement_type = "OTHER"
+        metrics.db_query_seconds.labels(statement=statement_type).observe(duration)
+
+    def handle_error(context: sqlalchemy.engine.ExceptionContext) -> None:
+        if context.connection is not None and context.connection.info.get("query_start_times"):
+            context.connection.info["query_start_times"].pop()
+
+    sqlalchemy.event.listen(engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+    sqlalchemy.event.listen(engine.sync_engine, "after_cursor_execute", after_cursor_execute)
+    sqlalchemy.event.listen(engine.sync_engine, "handle_error", handle_error)
+
+
 @sqlalchemy.event.listens_for(Session, "before_flush")
 def _session_before_flush(session: Session, flush_context, instances) -> None:  # noqa: ANN001, ARG001
     for obj in session.dirty:
@@ -443,6 +504,65 @@ def _session_before_flush(session: Session, flush_context, instances) -> None:
         obj.on_insert(session)
 
 
+@sqlalchemy.event.listens_for(Session, "after_flush")
+def _session_after_flush(session: Session, flush_context) -> None:  # noqa: ANN001, ARG001
+    inserted_messages = [obj for obj in session.new if isinstance(obj, ConversationMessage)]
+    deleted_messages = [obj for obj in session.deleted if isinstance(obj, ConversationMessage)]
+    if inserted_messages or deleted_messages:
+        _update_latest_messages(session, inserted=inserted_messages, deleted=deleted_messages)
+
+
+def _update_latest_messages(
+    session: Session, inserted: list[ConversationMessage], deleted: list[ConversationMessage]
+) -> None:
+    """
+    Keeps ConversationLatestMessage in step with the messages inserted and deleted in a flush.
+    """
+    connection = session.connection()
+
+    latest_sequences: dict[tuple[uuid.UUID, str], int] = {}
+    for message in inserted:
+        key = (message.conversation_id, message.message_type)
+        latest_sequences[key] = max(latest_sequences.get(key, message.sequence), message.sequence)
+
+    for (conversation_id, message_type), sequence in latest_sequences.items():
+        # the upsert keeps the greater sequence, in case a concurrent transaction committed a later message first
+        statement = postgresql.insert(ConversationLatestMessage).values(
+            conversation_id=conversation_id, message_type=message_type, sequence=sequence
+        )
+        connection.execute(
+            statement.on_conflict_do_update(
+                index_elements=["conversation_id", "message_type"],
+                set_={
+                    "sequence": sqlalchemy.case(
+                        (
+                            statement.excluded.sequence > col(ConversationLatestMessage.sequence),
+                            statement.excluded.sequence,
+                        ),
+                        else_=col(ConversationLatestMessage.sequence),
+                    )
+                },
+            )
+        )
+
+    for conversation_id, message_type in {(message.conversation_id, message.message_type) for message in deleted}:
+        latest_sequence = connection.execute(
+            sqlalchemy.select(sqlalchemy.func.max(col(ConversationMessage.sequence)))
+            .where(col(ConversationMessage.conversation_id) == conversation_id)
+            .where(col(ConversationMessage.message_type) == message_type)
+        ).scalar_one_or_none()
+
+        pointer = sqlalchemy.and_(
+            col(ConversationLatestMessage.conversation_id) == conversation_id,
+            col(ConversationLatestMessage.message_type) == message_type,
+        )
+        if latest_sequence is None:
+            connection.execute(sqlalchemy.delete(ConversationLatestMessage).where(pointer))
+            continue
+
+        connection.execute(sqlalchemy.update(ConversationLatestMessage).where(pointer).values(sequence=latest_sequence))
+
+
 async def bootstrap_db(engine: AsyncEngine, settings: DBSettings) -> None:
     logger.info("bootstrapping database")
     await _ensure_schema(engine=engine, settings=settings)
@@ -530,8 +650,9 @@ async def create_session(engine: AsyncEngine) -> AsyncIterator[AsyncSession]:
         autocommit=False,
         autoflush=False,
     )
-    async with session_maker() as async_session:
-        yield async_session
+    with metrics.db_session_seconds.time():
+        async with session_maker() as async_session:
+            yield async_session
 
 
 async def insert_if_not_exists(session: AsyncSession, model: SQLModel) -> bool:
@@ -548,3 +669,19 @@ async def insert_if_not_exists(session: AsyncSession, model: SQLModel) -> bool:
     conn = await session.connection()
     result = await conn.execute(statement)
     return result.rowcount > 0
+
+
+async def lock_content(session: AsyncSession, storage_filenames: Iterable[str]) -> None:
+    """
+    Takes transaction-scoped advisory locks on content-addressed content, serializing, across service instances,
+    adding file versions that reference the content with deleting the content once unreferenced. The locks are
+    released when the transaction commits or rolls back. SQLite has no advisory locks; files.Storage.lock_content
+    serializes them within the process.
+    """
+    if session.get_bind().dialect.name != "postgresql":
+        return
+
+    for storage_filename in sorted({f for f in storage_filenames if files.is_content_addressed(f)}):
+        await session.exec(
+            select(sqlalchemy.func.pg_advisory_xact_lock(sqlalchemy.func.hashtextextended(storage_filename, 0)))
+        )
@@ -1,4 +1,4 @@
-from typing import Literal
+from typing import Any, Literal
 
 from pydantic import BaseModel
 from semantic_workbench_api_model.workbench_model import ConversationEvent
@@ -7,3 +7,12 @@ from semantic_workbench_api_model.workbench_model import ConversationEvent
 class ConversationEventQueueItem(BaseModel):
     event: ConversationEvent
     event_audience: set[Literal["user", "assistant"]] = set(["user", "assistant"])
+
+
+class UserEventQueueItem(BaseModel):
+    """
+    An event for the SSE clients of a user, sent on the user's /events stream.
+    """
+
+    event: str
+    data: dict[str, Any]
@@ -0,0 +1,257 @@
+import asyncio
+import json
+import logging
+import uuid
+from typing import Awaitable, Callable, Protocol, Self
+
+import asyncpg
+
+from .config import DBSettings, EventBusSettings
+from .event import ConversationEventQueueItem
+
+logger = logging.getLogger(__name__)
+
+EventHandler = Callable[[ConversationEventQueueItem], Awaitable[None]]
+
+
+class EventBus(Protocol):
+    """
+    Delivers published events to the handler on every node (worker process or replica) of the service.
+    """
+
+    async def __aenter__(self) -> Self: ...
+
+    async def __aexit__(self, exc_type, exc_value, traceback) -> None: ...
+
+    async def publish(self, queue_item: ConversationEventQueueItem) -> None: ...
+
+    @property
+    def healthy(self) -> bool:
+        """
+        Whether events published on other nodes are being received.
+        """
+        ...
+
+
+class InMemoryEventBus(EventBus):
+    """
+    Delivers events to the handler in the current process only. Suitable for a single worker.
+    """
+
+    def __init__(self, handler: EventHandler) -> None:
+        self._handler = handler
+
+    async def __aenter__(self) -> Self:
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback) -> None:
+        pass
+
+    async def publish(self, queue_item: ConversationEventQueueItem) -> None:
+        await self._handler(queue_item)
+
+    @property
+    def healthy(self) -> bool:
+        return True
+
+
+# postgresql NOTIFY payloads must be shorter than 8000 bytes; leave room for the envelope header
+_notification_chunk_size = 7_500
+
+# the delay before retrying to reconnect a lost LISTEN connection, doubling up to the maximum
+_reconnect_initial_delay_seconds = 1.0
+_reconnect_max_delay_seconds = 30.0
+
+
+def encode_notifications(node_id: str, queue_item: ConversationEventQueueItem) -> list[str]:
+    """
+    Encodes the queue item as one or more NOTIFY payloads of the form
+    "{node_id}:{message_id}:{chunk_index}:{chunk_count}:{chunk}".
+    """
+    # json.dumps escapes non-ascii characters, so the character count equals the byte count
+    payload = json.dumps(queue_item.model_dump(mode="json"))
+    chunks = [payload[i : i + _notification_chunk_size] for i in range(0, len(payload), _notification_chunk_size)]
+    message_id = uuid.uuid4().hex
+    return [f"{node_id}:{message_id}:{index}:{len(chunks)}:{chunk}" for index, chunk in enumerate(chunks)]
+
+
+class NotificationAssembler:
+    """
+    Reassembles NOTIFY payloads produced by encode_notifications into queue items.
+    """
+
+    def __init__(self, max_pending: int = 1_000) -> None:
+        self._pending: dict[str, list[str | None]] = {}
+        self._max_pending = max_pending
+
+    def add(self, notification: str) -> tuple[str, ConversationEventQueueItem | None]:
+        node_id, message_id, chunk_index, chunk_count, chunk = notification.split(":", 4)
+        count = int(chunk_count)
+        if count == 1:
+            return node_id, self._parse(chunk)
+
+        if message_id not in self._pending:
+            if len(self._pending) >= self._max_pending:
+                # drop the oldest incomplete message rather than grow without bound
+                self._pending.pop(next(iter(self._pending)))
+            self._pending[message_id] = [None] * count
+
+        chunks = self._pending[message_id]
+        chunks[int(chunk_index)] = chunk
+        if any(c is None for c in chunks):
+            return node_id, None
+
+        del self._pending[message_id]
+        return node_id, self._parse("".join(c or "" for c in chunks))
+
+    @staticmethod
+    def _parse(payload: str) -> ConversationEventQueueItem:
+        return ConversationEventQueueItem.model_validate_json(payload)
+
+
+class PostgresEventBus(EventBus):
+    """
+    Fans events out to every node connected to the same postgresql database using LISTEN/NOTIFY.
+
+    Events are delivered to the local handler directly on publish; notifications that originate from this
+    node are ignored by the listener.
+
+    If the LISTEN connection is lost, it is reconnected, with backoff. Notifications sent while it is down are not
+    received, so the bus reports itself unhealthy until it is reconnected.
+    """
+
+    def __init__(self, handler: EventHandler, db_settings: DBSettings, settings: EventBusSettings) -> None:
+        self._handler = handler
+        self._dsn = db_settings.url.replace("postgresql+asyncpg://", "postgresql://")
+        self._ssl_mode = db_settings.postgresql_ssl_mode
+        self._channel = settings.postgresql_channel
+        self._publish_pool_size = settings.postgresql_publish_pool_size
+        self._node_id = uuid.uuid4().hex
+        self._assembler = NotificationAssembler()
+        self._received: asyncio.Queue[ConversationEventQueueItem] = asyncio.Queue()
+        self._listen_connection: asyncpg.Connection | None = None
+        self._listen_connection_lost = asyncio.Event()
+        self._publish_pool: asyncpg.Pool | None = None
+        self._dispatch_task: asyncio.Task | None = None
+        self._reconnect_task: asyncio.Task | None = None
+
+    async def __aenter__(self) -> Self:
+        logger.info("starting postgresql event bus; channel: %s, node_id: %s", self._channel, self._node_id)
+        self._publish_pool = await asyncpg.create_pool(
+            dsn=self._dsn, ssl=self._ssl_mode, min_size=1, max_size=self._publish_pool_size
+        )
+        await self._listen()
+        self._reconnect_task = asyncio.create_task(self._reconnect(), name="event_bus_reconnect")
+        self._dispatch_task = asyncio.create_task(self._dispatch(), name="event_bus_dispatch")
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback) -> None:
+        for task in (self._reconnect_task, self._dispatch_task):
+            if task is not None:
+                task.cancel()
+                await asyncio.gather(task, return_exceptions=True)
+
+        if self._listen_connection is not None:
+            await self._listen_connection.close()
+
+        if self._publish_pool is not None:
+            await self._publish_pool.close()
+
+    async def publish(self, queue_item: ConversationEventQueueItem) -> None:
+        await self._handler(queue_item)
+
+        if self._publish_pool is None:
+            raise RuntimeError("event bus has not been started")
+
+        notifications = encode_notifications(self._node_id, queue_item)
+        async with self._publish_pool.acquire() as connection, connection.transaction():
+            # notifications sent within one transaction are delivered together and in order
+            for notification in notifications:
+                await connection.execute("SELECT pg_notify($1, $2)", self._channel, notification)
+
+    @property
+    def healthy(self) -> bool:
+        return self._listen_connection is not None and not self._listen_connection.is_closed()
+
+    async def _listen(self) -> None:
+        listen_connection: asyncpg.Connection = await asyncpg.connect(dsn=self._dsn, ssl=self._ssl_mode)
+        try:
+            self._listen_connection_lost.clear()
+            listen_connection.add_termination_listener(self._on_listen_connection_terminated)
+            await listen_connection.add_listener(self._channel, self._on_notification)
+        except BaseException:
+            await listen_connection.close()
+            raise
+        self._listen_connection = listen_connection
+
+    def _on_listen_connection_terminated(self, connection: asyncpg.Connection) -> None:
+        self._listen_connection_lost.set()
+
+    async def _reconnect(self) -> None:
+        while True:
+            await self._listen_connection_lost.wait()
+            self._listen_connection = None
+            logger.warning(
+                "event bus listen connection lost, reconnecting; events published by other nodes are not received"
+                " until reconnected; channel: %s, node_id: %s",
+                self._channel,
+                self._node_id,
+            )
+
+            delay = _reconnect_initial_delay_seconds
+            while True:
+                try:
+                    await self._listen()
+                    break
+                except Exception:
+                    logger.exception(
+                        "error reconnecting event bus listen connection, retrying in %.1fs; channel: %s",
+                        delay,
+                        self._channel,
+                    )
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, _reconnect_max_delay_seconds)
+
+            logger.info(
+                "event bus listen connection reconnected; channel: %s, node_id: %s", self._channel, self._node_id
+            )
+
+    def _on_notification(self, connection: asyncpg.Connection, pid: int, channel: str, payload: str) -> None:
+        # events published by this node were already delivered to the handler
+        if payload.startswith(f"{self._node_id}:"):
+            return
+
+        try:
+            _, queue_item = self._assembler.add(payload)
+        except Exception:
+            logger.exception("error decoding event bus notification; channel: %s", channel)
+            return
+
+        if queue_item is None:
+            return
+
+        self._received.put_nowait(queue_item)
+
+    async def _dispatch(self) -> None:
+        while True:
+            queue_item = await self._received.get()
+            try:
+                await self._handler(queue_item)
+            except Exception:
+                logger.exception(
+                    "exception handling event from event bus; conversation_id: %s, event: %s, id: %s",
+                    queue_item.event.conversation_id,
+                    queue_item.event.event,
+                    queue_item.event.id,
+                )
+
+
+def create(handler: EventHandler, settings: EventBusSettings, db_settings: DBSettings) -> EventBus:
+    match settings.backend:
+        case "postgresql":
+            logger.info("creating PostgresEventBus; channel: %s", settings.postgresql_channel)
+            return PostgresEventBus(handler=handler, db_settings=db_settings, settings=settings)
+
+        case _:
+            logger.info("creating InMemoryEventBus")
+            return InMemoryEventBus(handler=handler)
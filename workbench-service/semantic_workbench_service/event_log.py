@@ -0,0 +1,69 @@
+import collections
+import itertools
+import uuid
+
+import cachetools
+from semantic_workbench_api_model.workbench_model import ConversationEvent
+
+
+class _EventRingBuffer:
+    def __init__(self, max_events: int) -> None:
+        self._max_events = max_events
+        self._next_sequence = 0
+        self._events: collections.deque[tuple[int, ConversationEvent]] = collections.deque()
+        self._sequence_by_event_id: dict[str, int] = {}
+
+    def append(self, event: ConversationEvent) -> None:
+        sequence = self._next_sequence
+        self._next_sequence += 1
+
+        self._events.append((sequence, event))
+        self._sequence_by_event_id[event.id] = sequence
+
+        if len(self._events) > self._max_events:
+            _, evicted = self._events.popleft()
+            self._sequence_by_event_id.pop(evicted.id, None)
+
+    def events_after(self, event_id: str) -> list[ConversationEvent] | None:
+        sequence = self._sequence_by_event_id.get(event_id)
+        if sequence is None:
+            return None
+
+        # sequences in the buffer are contiguous, so the offset of an event is its distance from the oldest
+        offset = sequence - self._events[0][0] + 1
+        return [event for _, event in itertools.islice(self._events, offset, None)]
+
+
+class ConversationEventLog:
+    """
+    Bounded, in-memory log of the most recent events per conversation, used to replay events that an SSE client
+    missed while reconnecting (identified by the SSE Last-Event-ID header).
+
+    Every node receives all user-audience events through the event bus, so a client can resume on any node.
+    """
+
+    def __init__(self, max_events_per_conversation: int, max_conversations: int) -> None:
+        self._max_events_per_conversation = max_events_per_conversation
+        self._buffers: cachetools.LRUCache[uuid.UUID, _EventRingBuffer] = cachetools.LRUCache(maxsize=max_conversations)
+
+    def append(self, event: ConversationEvent) -> None:
+        if self._max_events_per_conversation <= 0:
+            return
+
+        buffer = self._buffers.get(event.conversation_id)
+        if buffer is None:
+            buffer = _EventRingBuffer(max_events=self._max_events_per_conversation)
+            self._buffers[event.conversation_id] = buffer
+
+        buffer.append(event)
+
+    def events_after(self, conversation_id: uuid.UUID, event_id: str) -> list[ConversationEvent] | None:
+        """
+        Returns the events recorded after the event with the given id, oldest first, or None if the event is no
+        longer (or was never) in the log.
+        """
+        buffer = self._buffers.get(conversation_id)
+        if buffer is None:
+            return None
+
+        return buffer.events_after(event_id)
@@ -1,22 +1,243 @@
+import asyncio
 import hashlib
 import logging
+import os
 import pathlib
-from contextlib import contextmanager
-from typing import BinaryIO, Iterator
+import tempfile
+import time
+import weakref
+from contextlib import AsyncExitStack, asynccontextmanager, contextmanager
+from typing import Any, AsyncGenerator, AsyncIterator, BinaryIO, Iterable, Iterator, Literal, Protocol
 
 from pydantic_settings import BaseSettings
 
+from . import metrics
+
 logger = logging.getLogger(__name__)
 
 
 class StorageSettings(BaseSettings):
     root: str = ".data/files"
 
+    # where file content is stored; "s3" requires the boto3 package
+    content_backend: Literal["local", "s3"] = "local"
+    s3_bucket: str = ""
+    # for S3-compatible services other than AWS, such as MinIO
+    s3_endpoint_url: str = ""
+    s3_prefix: str = "content/"
+
+
+_chunk_size = 100 * 1_024
+
+CONTENT_ADDRESSED_PREFIX = "sha256:"
+"""
+The prefix of the storage filename of file versions whose content is stored, once per distinct content, in the
+content store under the sha256 digest of the content.
+"""
+
+
+def is_content_addressed(storage_filename: str) -> bool:
+    return storage_filename.startswith(CONTENT_ADDRESSED_PREFIX)
+
+
+def _digest_of(storage_filename: str) -> str:
+    return storage_filename.removeprefix(CONTENT_ADDRESSED_PREFIX)
+
+
+class ContentStore(Protocol):
+    """
+    Stores file content under the sha256 digest of the content, so that identical content is stored once.
+    """
+
+    async def put(self, content: BinaryIO) -> str:
+        """Stores the content, if not already stored, and returns its digest."""
+        ...
+
+    async def exists(self, digest: str) -> bool: ...
+
+    def read(self, digest: str) -> AsyncIterator[bytes]: ...
+
+    async def delete(self, digest: str) -> None: ...
+
+
+class LocalContentStore(ContentStore):
+    """
+    Stores content in the local file system. Blocking file operations run in worker threads.
+    """
+
+    def __init__(self, root: pathlib.Path) -> None:
+        self._root = root
+
+    def _path(self, digest: str) -> pathlib.Path:
+        return self._root / digest[:2] / digest
+
+    def _put(self, content: BinaryIO) -> str:
+        self._root.mkdir(parents=True, exist_ok=True)
+        digest = hashlib.sha256()
+        # spool into the store's directory, so that the move into place is a rename
+        with tempfile.NamedTemporaryFile(dir=self._root, prefix=".upload-", delete=False) as temp_file:
+            try:
+                for chunk in iter(lambda: content.read(_chunk_size), b""):
+                    digest.update(chunk)
+                    temp_file.write(chunk)
+            except BaseException:
+                temp_file.close()
+                os.unlink(temp_file.name)
+                raise
+
+        path = self._path(digest.hexdigest())
+        if path.exists():
+            os.unlink(temp_file.name)
+            return digest.hexdigest()
+
+        path.parent.mkdir(exist_ok=True)
+        os.replace(temp_file.name, path)
+        return digest.hexdigest()
+
+    async def put(self, content: BinaryIO) -> str:
+        return await asyncio.to_thread(self._put, content)
+
+    async def exists(self, digest: str) -> bool:
+        return await asyncio.to_thread(self._path(digest).exists)
+
+    async def read(self, digest: str) -> AsyncIterator[bytes]:
+        file = await asyncio.to_thread(open, self._path(digest), "rb")
+        try:
+            while chunk := await asyncio.to_thread(file.read, _chunk_size):
+                yield chunk
+        finally:
+            await asyncio.to_thread(file.close)
+
+    async def delete(self, digest: str) -> None:
+        await asyncio.to_thread(self._path(digest).unlink, missing_ok=True)
+
+
+class S3ContentStore(ContentStore):
+    """
+    Stores content in an S3-compatible bucket. boto3 calls run in worker threads.
+    """
+
+    def __init__(self, settings: StorageSettings) -> None:
+        try:
+            import boto3
+        except ImportError as e:
+            raise RuntimeError("the s3 content backend requires the boto3 package to be installed") from e
+
+        self._client: Any = boto3.client("s3", endpoint_url=settings.s3_endpoint_url or None)
+        self._bucket = settings.s3_bucket
+        self._prefix = settings.s3_prefix
+
+    def _key(self, digest: str) -> str:
+        return f"{self._prefix}{digest}"
+
+    def _exists(self, digest: str) -> bool:
+        from botocore.exceptions import ClientError
+
+        try:
+            self._client.head_object(Bucket=self._bucket, Key=self._key(digest))
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey"):
+                return False
+            raise
+        return True
+
+    def _put(self, content: BinaryIO) -> str:
+        digest = hashlib.sha256()
+        # the digest, and so the key, is only known once the content has been read
+        with tempfile.SpooledTemporaryFile(max_size=10 * 1_024 * 1_024) as spooled:
+            for chunk in iter(lambda: content.read(_chunk_size), b""):
+                digest.update(chunk)
+                spooled.write(chunk)
+
+            if self._exists(digest.hexdigest()):
+                return digest.hexdigest()
+
+            spooled.seek(0)
+            self._client.upload_fileobj(spooled, self._bucket, self._key(digest.hexdigest()))
+
+        return digest.hexdigest()
+
+    async def put(self, content: BinaryIO) -> str:
+        return await asyncio.to_thread(self._put, content)
+
+    async def exists(self, digest: str) -> bool:
+        return await asyncio.to_thread(self._exists, digest)
+
+    async def read(self, digest: str) -> AsyncIterator[bytes]:
+        from botocore.exceptions import ClientError
+
+        try:
+            response = await asyncio.to_thread(self._client.get_object, Bucket=self._bucket, Key=self._key(digest))
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey"):
+                raise FileNotFoundError(digest) from e
+            raise
+
+        body = response["Body"]
+        try:
+            while chunk := await asyncio.to_thread(body.read, _chunk_size):
+                yield chunk
+        finally:
+            await asyncio.to_thread(body.close)
+
+    async def delete(self, digest: str) -> None:
+        await asyncio.to_thread(self._client.delete_object, Bucket=self._bucket, Key=self._key(digest))
+
+
+def create_content_store(settings: StorageSettings) -> ContentStore:
+    match settings.content_backend:
+        case "s3":
+            logger.info("creating S3ContentStore; bucket: %s, prefix: %s", settings.s3_bucket, settings.s3_prefix)
+            return S3ContentStore(settings)
+
+        case _:
+            return LocalContentStore(pathlib.Path(settings.root) / "content")
+
+
+class _CountingReader:
+    """
+    Counts the bytes read from a file-like object.
+    """
+
+    def __init__(self, content: BinaryIO) -> None:
+        self._content = content
+        self.bytes_read = 0
+
+    def read(self, size: int = -1) -> bytes:
+        chunk = self._content.read(size)
+        self.bytes_read += len(chunk)
+        return chunk
+
+
+async def _measure_reads(chunks: AsyncGenerator[bytes, None]) -> AsyncIterator[bytes]:
+    """
+    Measures the bytes read and the time spent reading them, excluding the time the consumer spends between chunks.
+    """
+    bytes_read = 0
+    duration = 0.0
+    try:
+        while True:
+            start = time.perf_counter()
+            try:
+                chunk = await anext(chunks)
+            except StopAsyncIteration:
+                break
+            finally:
+                duration += time.perf_counter() - start
+            bytes_read += len(chunk)
+            yield chunk
+    finally:
+        await chunks.aclose()
+        metrics.file_storage_seconds.labels(operation="read").observe(duration)
+        metrics.file_storage_bytes.labels(operation="read").inc(bytes_read)
+
 
 class Storage:
     def __init__(self, settings: StorageSettings):
         self.root = pathlib.Path(settings.root)
         self._initialized = False
+        self._content_store = create_content_store(settings)
+        self._content_locks: weakref.WeakValueDictionary[str, asyncio.Lock] = weakref.WeakValueDictionary()
 
     def _ensure_initialized(self):
         if self._initialized:
@@ -48,7 +269,7 @@ class Storage:
     def write_file(self, namespace: str, filename: str, content: BinaryIO) -> None:
         file_path = self._file_path(namespace, filename, mkdir=True)
         with open(file_path, "wb") as f:
-            for chunk in iter(lambda: content.read(100 * 1_024), b""):
+            for chunk in iter(lambda: content.read(_chunk_size), b""):
                 f.write(chunk)
 
     def delete_file(self, namespace: str, filename: str) -> None:
@@ -60,3 +281,121 @@ class Storage:
         file_path = self._file_path(namespace, filename)
         with open(file_path, "rb") as f:
             yield f
+
+    async def write_content(self, content: BinaryIO) -> str:
+        """
+        Stores the content in the content store and returns the storage filename for it.
+        """
+        if not metrics.enabled:
+            digest = await self._content_store.put(content)
+            return f"{CONTENT_ADDRESSED_PREFIX}{digest}"
+
+        counting_content = _CountingReader(content)
+        with metrics.file_storage_seconds.labels(operation="write").time():
+            digest = await self._content_store.put(counting_content)  # type: ignore[arg-type]
+        metrics.file_storage_bytes.labels(operation="write").inc(counting_content.bytes_read)
+        return f"{CONTENT_ADDRESSED_PREFIX}{digest}"
+
+    async def ensure_content(self, storage_filename: str, content: BinaryIO) -> None:
+        """
+        Stores the content again if it was deleted after write_content stored it, by a delete that found no file
+        version referencing it yet. Callers hold lock_content for the storage filename.
+        """
+        if not is_content_addressed(storage_filename):
+            return
+        if await self._content_store.exists(_digest_of(storage_filename)):
+            return
+
+        await asyncio.to_thread(content.seek, 0)
+        await self.write_content(content)
+
+    @asynccontextmanager
+    async def lock_content(self, storage_filenames: Iterable[str]) -> AsyncIterator[None]:
+        """
+        Serializes, within this process, adding file versions that reference content-addressed content with deleting
+        the content once unreferenced. Writers hold the lock from ensure_content until the file versions are committed,
+        and deleters from checking for references until the content is deleted. db.lock_content does the same across
+        processes.
+        """
+        locks: list[asyncio.Lock] = []
+        for storage_filename in sorted({f for f in storage_filenames if is_content_addressed(f)}):
+            lock = self._content_locks.get(storage_filename)
+            if lock is None:
+                lock = self._content_locks[storage_filename] = asyncio.Lock()
+            locks.append(lock)
+
+        async with AsyncExitStack() as stack:
+            for lock in locks:
+                await stack.enter_async_context(lock)
+            yield
+
+    def read_content(self, namespace: str, storage_filename: str) -> AsyncIterator[bytes]:
+        """
+        Reads the content of a file version, whether content-addressed or stored in the namespace.
+        """
+        chunks = self._read_content(namespace, storage_filename)
+        if not metrics.enabled:
+            return chunks
+        return _measure_reads(chunks)
+
+    async def _read_content(self, namespace: str, storage_filename: str) -> AsyncGenerator[bytes, None]:
+        if is_content_addressed(storage_filename):
+            async for chunk in self._content_store.read(_digest_of(storage_filename)):
+                yield chunk
+            return
+
+        file = await asyncio.to_thread(open, self._file_path(namespace, storage_filename), "rb")
+        try:
+            while chunk := await asyncio.to_thread(file.read, _chunk_size):
+                yield chunk
+        finally:
+            await asyncio.to_thread(file.close)
+
+    async def delete_content(self, namespace: str, storage_filename: str) -> None:
+        """
+        Deletes the content of a file version. Content-addressed content may be shared by other file versions, so
+        callers must only delete it once it is no longer referenced.
+        """
+        if is_content_addressed(storage_filename):
+            await self._content_store.delete(_digest_of(storage_filename))
+            return
+
+        await asyncio.to_thread(self.delete_file, namespace, storage_filename)
+
+    async def import_content(self, namespace: str, storage_filenames: Iterable[str]) -> dict[str, str]:
+        """
+        Moves content-addressed content, copied into the namespace directory from an export, into the content store.
+        Exports lay out content-addressed content as path_for lays out a namespace.
+
+        Content that does not hash to the digest in its storage filename is stored under its own digest, and left in
+        the namespace directory. Returns their storage filenames, mapped to the storage filenames they were stored
+        under, for the caller to point the file versions at.
+        """
+        mismatched: dict[str, str] = {}
+        for storage_filename in storage_filenames:
+            if not is_content_addressed(storage_filename):
+                continue
+
+            file_path = self.path_for(namespace=namespace, filename=storage_filename)
+            if not await asyncio.to_thread(file_path.exists):
+                continue
+
+            file = await asyncio.to_thread(open, file_path, "rb")
+            try:
+                digest = await self._content_store.put(file)
+            finally:
+                await asyncio.to_thread(file.close)
+
+            if digest != _digest_of(storage_filename):
+                logger.warning(
+                    "imported file content does not match its digest; namespace: %s, storage_filename: %s, digest: %s",
+                    namespace,
+                    storage_filename,
+                    digest,
+                )
+                mismatched[storage_filename] = f"{CONTENT_ADDRESSED_PREFIX}{digest}"
+                continue
+
+            await asyncio.to_thread(file_path.unlink)
+
+        return mismatched
@@ -0,0 +1,230 @@
+"""
+Prometheus metrics for the hot paths of the service: event notification, SSE subscribers, forwarding of events to
+assistants, database sessions and queries, file content storage, and authentication.
+
+Metrics are disabled by default. Until `configure` enables them, the instruments are shared no-op objects, and the
+database hooks are not installed, so instrumented code costs an attribute lookup and an empty call. Enabling them
+requires the prometheus-client package. The metrics are served in the Prometheus text format, which OpenTelemetry
+collectors can also scrape.
+"""
+
+import contextlib
+from typing import Any, Callable, Iterator
+
+from pydantic_settings import BaseSettings
+
+from .sse import SubscriberRegistry
+
+
+class MetricsSettings(BaseSettings):
+    # requires the prometheus-client package
+    enabled: bool = False
+    # served without authentication, for scrapers
+    exposition_path: str = "/metrics"
+    # adds a series per conversation with SSE subscribers, labeled with the conversation id; the number of series
+    # grows with the number of conversations open in clients
+    sse_subscribers_per_conversation: bool = False
+
+
+class _NoopInstrument:
+    """
+    Stands in for every instrument while metrics are disabled.
+    """
+
+    def labels(self, *args: Any, **kwargs: Any) -> "_NoopInstrument":
+        return self
+
+    def inc(self, amount: float = 1) -> None:
+        pass
+
+    def observe(self, amount: float) -> None:
+        pass
+
+    def set_function(self, function: Callable[[], float]) -> None:
+        pass
+
+    def time(self) -> contextlib.nullcontext:
+        return _null_context
+
+
+_null_context = contextlib.nullcontext()
+_noop = _NoopInstrument()
+
+enabled = False
+settings = MetricsSettings()
+_registry: Any = None
+
+notify_event_seconds: Any = _noop
+assistant_forward_seconds: Any = _noop
+assistant_forwarded_events: Any = _noop
+assistant_forward_failures: Any = _noop
+assistant_event_queue_depth: Any = _noop
+event_bus_healthy: Any = _noop
+db_session_seconds: Any = _noop
+db_query_seconds: Any = _noop
+file_storage_bytes: Any = _noop
+file_storage_seconds: Any = _noop
+auth_seconds: Any = _noop
+
+
+def configure(metrics_settings: MetricsSettings) -> None:
+    """
+    Creates the instruments, in a registry of their own, if metrics are enabled. Otherwise resets them to no-ops.
+    """
+    global enabled, settings, _registry
+    global notify_event_seconds, assistant_forward_seconds, assistant_forwarded_events, assistant_forward_failures
+    global assistant_event_queue_depth, event_bus_healthy, db_session_seconds, db_query_seconds, file_storage_bytes
+    global file_storage_seconds, auth_seconds
+
+    settings = metrics_settings
+    enabled = metrics_settings.enabled
+    if not enabled:
+        _registry = None
+        notify_event_seconds = assistant_forward_seconds = assistant_forwarded_events = _noop
+        assistant_forward_failures = assistant_event_queue_depth = event_bus_healthy = _noop
+        db_session_seconds = db_query_seconds = _noop
+        file_storage_bytes = file_storage_seconds = auth_seconds = _noop
+        return
+
+    try:
+        import prometheus_client
+    except ImportError as e:
+        raise RuntimeError("metrics require the prometheus-client package to be installed") from e
+
+    _registry = prometheus_client.CollectorRegistry()
+    Counter, Gauge, Histogram = prometheus_client.Counter, prometheus_client.Gauge, prometheus_client.Histogram
+
+    notify_event_seconds = Histogram(
+        "workbench_notify_event_seconds",
+        "Time to publish a conversation event to SSE clients and enqueue it for assistants.",
+        ["event"],
+        registry=_registry,
+    )
+    assistant_forward_seconds = Histogram(
+        "workbench_assistant_forward_seconds",
+        "Time to forward a batch of events to an assistant.",
+        registry=_registry,
+    )
+    assistant_forwarded_events = Counter(
+        "workbench_assistant_forwarded_events", "Events forwarded to assistants.", registry=_registry
+    )
+    assistant_forward_failures = Counter(
+        "workbench_assistant_forward_failures", "Events that failed to forward to assistants.", registry=_registry
+    )
+    assistant_event_queue_depth = Gauge(
+        "workbench_assistant_event_queue_depth",
+        "Events waiting to be forwarded to assistants.",
+        registry=_registry,
+    )
+    event_bus_healthy = Gauge(
+        "workbench_event_bus_healthy",
+        "1 while events published on other nodes are being received, 0 while the event bus is reconnecting.",
+        registry=_registry,
+    )
+    db_session_seconds = Histogram(
+        "workbench_db_session_seconds", "Time database sessions are held open.", registry=_registry
+    )
+    db_query_seconds = Histogram(
+        "workbench_db_query_seconds",
+        "Time to execute database statements, by statement type.",
+        ["statement"],
+        registry=_registry,
+    )
+    file_storage_bytes = Counter(
+        "workbench_file_storage_bytes", "Bytes of file content written and read.", ["operation"], registry=_registry
+    )
+    file_storage_seconds = Histogram(
+        "workbench_file_storage_seconds",
+        "Time to write or read file content.",
+        ["operation"],
+        registry=_registry,
+    )
+    auth_seconds = Histogram(
+        "workbench_auth_seconds", "Time to authenticate a request in the auth middleware.", registry=_registry
+    )
+
+
+def register_sse_subscribers(stream: str, subscriber_registry: SubscriberRegistry) -> None:
+    """
+    Reports the subscribers of an SSE stream (ex. "conversation" or "user"), and their queue depths, when scraped,
+    rather than tracking them on every publish.
+    """
+    if not enabled:
+        return
+    _registry.register(_SubscriberCollector(stream, subscriber_registry))
+
+
+class _SubscriberCollector:
+    def __init__(self, stream: str, subscriber_registry: SubscriberRegistry) -> None:
+        self._stream = stream
+        self._subscriber_registry = subscriber_registry
+
+    def collect(self) -> Iterator[Any]:
+        from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+
+        subscribers = GaugeMetricFamily("workbench_sse_subscribers", "Connected SSE subscribers.", labels=["stream"])
+        keys = GaugeMetricFamily(
+            "workbench_sse_subscribed_keys", "Conversations or users with SSE subscribers.", labels=["stream"]
+        )
+        max_subscribers_per_key = GaugeMetricFamily(
+            "workbench_sse_max_subscribers_per_key",
+            "The most SSE subscribers to a single conversation or user.",
+            labels=["stream"],
+        )
+        queued_events = GaugeMetricFamily(
+            "workbench_sse_queued_events", "Events waiting to be sent to SSE subscribers.", labels=["stream"]
+        )
+        max_queue_depth = GaugeMetricFamily(
+            "workbench_sse_max_queue_depth", "The most events waiting for a single SSE subscriber.", labels=["stream"]
+        )
+        dropped_events = CounterMetricFamily(
+            "workbench_sse_dropped_events",
+            "Events dropped from the queues of SSE subscribers that fell behind.",
+            labels=["stream"],
+        )
+        evicted_subscribers = CounterMetricFamily(
+            "workbench_sse_evicted_subscribers",
+            "SSE subscribers disconnected for falling behind.",
+            labels=["stream"],
+        )
+        per_key = None
+        if settings.sse_subscribers_per_conversation and self._stream == "conversation":
+            per_key = GaugeMetricFamily(
+                "workbench_sse_conversation_subscribers",
+                "Connected SSE subscribers per conversation.",
+                labels=["conversation_id"],
+            )
+
+        subscriber_count = key_count = most_subscribers = queued = deepest = 0
+        for key, queues in self._subscriber_registry.items():
+            key_count += 1
+            subscriber_count += len(queues)
+            most_subscribers = max(most_subscribers, len(queues))
+            for queue in queues:
+                depth = queue.qsize()
+                queued += depth
+                deepest = max(deepest, depth)
+            if per_key is not None:
+                per_key.add_metric([str(key)], len(queues))
+
+        subscribers.add_metric([self._stream], subscriber_count)
+        keys.add_metric([self._stream], key_count)
+        max_subscribers_per_key.add_metric([self._stream], most_subscribers)
+        queued_events.add_metric([self._stream], queued)
+        max_queue_depth.add_metric([self._stream], deepest)
+        dropped_events.add_metric([self._stream], self._subscriber_registry.stats.dropped_events)
+        evicted_subscribers.add_metric([self._stream], self._subscriber_registry.stats.evicted_subscribers)
+
+        yield from (subscribers, keys, max_subscribers_per_key, queued_events, max_queue_depth)
+        yield from (dropped_events, evicted_subscribers)
+        if per_key is not None:
+            yield per_key
+
+
+def exposition() -> tuple[bytes, str]:
+    """
+    The current metrics in the Prometheus text format, and the content type to serve them with.
+    """
+    import prometheus_client
+
+    return prometheus_client.generate_latest(_registry), prometheus_client.CONTENT_TYPE_LATEST
@@ -13,7 +13,7 @@ from semantic_workbench_api_model import workbench_service_client
 from starlette.middleware.base import BaseHTTPMiddleware, RequestResponseEndpoint
 from starlette.types import ASGIApp
 
-from . import auth, settings
+from . import auth, metrics, settings
 
 logger = logging.getLogger(__name__)
 
@@ -143,7 +143,8 @@ class AuthMiddleware(BaseHTTPMiddleware):
             return await call_next(request)
 
         try:
-            principal = await principal_from_request(request, api_key_source=self.api_key_source)
+            with metrics.auth_seconds.time():
+                principal = await principal_from_request(request, api_key_source=self.api_key_source)
 
             if principal is None:
                 raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Not authenticated")
@@ -131,37 +131,27 @@ def select_conversation_projections_for(
         select_query=select_query,
     )
 
-    latest_message_subquery = (
-        select(
-            db.ConversationMessage.conversation_id,
-            func.max(db.ConversationMessage.sequence).label("latest_message_sequence"),
-        )
-        .where(col(db.ConversationMessage.message_type).in_(latest_message_types))
-        .group_by(col(db.ConversationMessage.conversation_id))
-        .subquery()
+    # the latest message is looked up, per conversation, through the maintained latest message of each type
+    latest_message_sequence = (
+        select(func.max(db.ConversationLatestMessage.sequence))
+        .where(db.ConversationLatestMessage.conversation_id == db.Conversation.conversation_id)
+        .where(col(db.ConversationLatestMessage.message_type).in_(latest_message_types))
+        .correlate(db.Conversation)
+        .scalar_subquery()
     )
 
-    return (
-        query.join_from(
-            db.Conversation,
-            latest_message_subquery,
-            onclause=col(db.Conversation.conversation_id) == col(latest_message_subquery.c.conversation_id),
-            isouter=True,
-        )
-        .join_from(
-            db.Conversation,
-            db.ConversationMessage,
-            onclause=and_(
-                col(db.Conversation.conversation_id) == col(db.ConversationMessage.conversation_id),
-                col(db.ConversationMessage.sequence) == col(latest_message_subquery.c.latest_message_sequence),
-            ),
-            isouter=True,
-        )
-        .join_from(
-            db.ConversationMessage,
-            db.ConversationMessageDebug,
-            isouter=True,
-        )
+    return query.join_from(
+        db.Conversation,
+        db.ConversationMessage,
+        onclause=and_(
+            col(db.Conversation.conversation_id) == col(db.ConversationMessage.conversation_id),
+            col(db.ConversationMessage.sequence) == latest_message_sequence,
+        ),
+        isouter=True,
+    ).join_from(
+        db.ConversationMessage,
+        db.ConversationMessageDebug,
+        isouter=True,
     )
 
 
@@ -4,7 +4,6 @@ import datetime
 import json
 import logging
 import uuid
-from collections import defaultdict
 from contextlib import asynccontextmanager
 from typing import (
     Annotated,
@@ -16,13 +15,13 @@ from typing import (
 )
 
 import asgi_correlation_id
-import starlette.background
 from asgi_correlation_id import CorrelationIdMiddleware
 from fastapi import (
     BackgroundTasks,
     FastAPI,
     File,
     Form,
+    Header,
     HTTPException,
     Query,
     Request,
@@ -31,7 +30,8 @@ from fastapi import (
     status,
 )
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse, StreamingResponse
+from fastapi.responses import StreamingResponse
+from semantic_workbench_api_model import connection_pool
 from semantic_workbench_api_model.assistant_model import (
     ConfigPutRequestModel,
     ConfigResponseModel,
@@ -68,6 +68,7 @@ from semantic_workbench_api_model.workbench_model import (
     NewAssistantServiceRegistration,
     NewConversation,
     NewConversationMessage,
+    NewConversationMessageDelta,
     NewConversationShare,
     ParticipantRole,
     UpdateAssistant,
@@ -85,8 +86,20 @@ from sse_starlette import EventSourceResponse, ServerSentEvent
 
 from semantic_workbench_service import azure_speech
 
-from . import assistant_api_key, auth, controller, db, files, middleware, settings
-from .event import ConversationEventQueueItem
+from . import (
+    assistant_api_key,
+    auth,
+    controller,
+    db,
+    event_bus,
+    event_log,
+    files,
+    metrics,
+    middleware,
+    settings,
+    sse,
+)
+from .event import ConversationEventQueueItem, UserEventQueueItem
 
 logger = logging.getLogger(__name__)
 
@@ -95,17 +108,33 @@ def init(
     app: FastAPI,
     register_lifespan_handler: Callable[[Callable[[], AsyncContextManager[None]]], None],
 ) -> None:
+    metrics.configure(settings.metrics)
+
     api_key_store = assistant_api_key.get_store()
     stop_signal: asyncio.Event = asyncio.Event()
 
-    conversation_sse_queues_lock = asyncio.Lock()
-    conversation_sse_queues: dict[uuid.UUID, set[asyncio.Queue[ConversationEvent]]] = defaultdict(set)
+    conversation_sse_subscribers = sse.SubscriberRegistry[uuid.UUID, ConversationEvent](
+        queue_size=settings.service.sse_subscriber_queue_size,
+        overflow_policy=settings.service.sse_subscriber_overflow_policy,
+    )
+    conversation_event_log = event_log.ConversationEventLog(
+        max_events_per_conversation=settings.service.sse_replay_events_per_conversation,
+        max_conversations=settings.service.sse_replay_max_conversations,
+    )
 
-    user_sse_queues_lock = asyncio.Lock()
-    user_sse_queues: dict[str, set[asyncio.Queue[uuid.UUID]]] = defaultdict(set)
+    user_sse_subscribers = sse.SubscriberRegistry[str, UserEventQueueItem](
+        queue_size=settings.service.sse_subscriber_queue_size,
+        overflow_policy=settings.service.sse_subscriber_overflow_policy,
+    )
 
     assistant_event_queues: dict[uuid.UUID, asyncio.Queue[ConversationEvent]] = {}
 
+    metrics.register_sse_subscribers("conversation", conversation_sse_subscribers)
+    metrics.register_sse_subscribers("user", user_sse_subscribers)
+    metrics.assistant_event_queue_depth.set_function(
+        lambda: sum(queue.qsize() for queue in assistant_event_queues.values())
+    )
+
     background_tasks: set[asyncio.Task] = set()
 
     def _controller_get_session() -> AsyncContextManager[AsyncSession]:
@@ -114,32 +143,61 @@ def init(
     async def _forward_events_to_assistant(
         assistant_id: uuid.UUID, event_queue: asyncio.Queue[ConversationEvent]
     ) -> NoReturn:
+        max_batch_size = max(1, settings.service.assistant_event_batch_max_size)
+        linger_seconds = settings.service.assistant_event_batch_linger_seconds
+
         while True:
+            batch: list[ConversationEvent] = []
             try:
-                event = await event_queue.get()
+                batch.append(await event_queue.get())
                 event_queue.task_done()
 
-                asgi_correlation_id.correlation_id.set(event.correlation_id)
+                # coalesce the events that are already queued, and optionally linger for more, into one request
+                loop = asyncio.get_running_loop()
+                deadline = loop.time() + linger_seconds
+                while len(batch) < max_batch_size:
+                    if not event_queue.empty():
+                        batch.append(event_queue.get_nowait())
+                        event_queue.task_done()
+                        continue
+
+                    remaining = deadline - loop.time()
+                    if remaining <= 0:
+                        break
+                    try:
+                        async with asyncio.timeout(remaining):
+                            batch.append(await event_queue.get())
+                            event_queue.task_done()
+                    except TimeoutError:
+                        break
+
+                asgi_correlation_id.correlation_id.set(batch[-1].correlation_id)
 
                 start_time = datetime.datetime.now(datetime.UTC)
 
-                await assistant_controller.forward_event_to_assistant(assistant_id=assistant_id, event=event)
+                with metrics.assistant_forward_seconds.time():
+                    await assistant_controller.forward_events_to_assistant(assistant_id=assistant_id, events=batch)
 
                 end_time = datetime.datetime.now(datetime.UTC)
                 logger.debug(
-                    "forwarded event to assistant; assistant_id: %s, conversation_id: %s, event_id: %s,"
-                    " duration: %s, time since event: %s",
+                    "forwarded events to assistant; assistant_id: %s, event count: %d, first event_id: %s,"
+                    " duration: %s, time since first event: %s",
                     assistant_id,
-                    event.conversation_id,
-                    event.id,
+                    len(batch),
+                    batch[0].id,
                     end_time - start_time,
-                    end_time - event.timestamp,
+                    end_time - batch[0].timestamp,
                 )
 
             except Exception:
+                metrics.assistant_forward_failures.inc(len(batch))
                 logger.exception("exception in _forward_events_to_assistant")
 
     async def _notify_event(queue_item: ConversationEventQueueItem) -> None:
+        with metrics.notify_event_seconds.labels(event=queue_item.event.event).time():
+            await _notify_event_unmeasured(queue_item)
+
+    async def _notify_event_unmeasured(queue_item: ConversationEventQueueItem) -> None:
         if stop_signal.is_set():
             logger.warning(
                 "ignoring event due to stop signal; conversation_id: %s, event: %s, id: %s",
@@ -158,44 +216,10 @@ def init(
         )
 
         if "user" in queue_item.event_audience:
-            async with conversation_sse_queues_lock:
-                for queue in conversation_sse_queues.get(queue_item.event.conversation_id, {}):
-                    await queue.put(queue_item.event)
-            logger.debug(
-                "enqueued event for SSE; conversation_id: %s, event: %s, event_id: %s",
-                queue_item.event.conversation_id,
-                queue_item.event.event,
-                queue_item.event.id,
-            )
-
-            if queue_item.event.event in [
-                ConversationEventType.message_created,
-                ConversationEventType.message_deleted,
-                ConversationEventType.conversation_updated,
-                ConversationEventType.participant_created,
-                ConversationEventType.participant_updated,
-            ]:
-                task = asyncio.create_task(
-                    _notify_user_event(queue_item.event.conversation_id), name="notify_user_event"
-                )
-                background_tasks.add(task)
-                task.add_done_callback(background_tasks.discard)
+            await conversation_event_bus.publish(queue_item)
 
         if "assistant" in queue_item.event_audience:
-            async with _controller_get_session() as session:
-                assistant_ids = (
-                    await session.exec(
-                        select(db.Assistant.assistant_id)
-                        .join(
-                            db.AssistantParticipant,
-                            col(db.Assistant.assistant_id) == col(db.AssistantParticipant.assistant_id),
-                        )
-                        .join(db.AssistantServiceRegistration)
-                        .where(col(db.AssistantServiceRegistration.assistant_service_online).is_(True))
-                        .where(col(db.AssistantParticipant.active_participant).is_(True))
-                        .where(db.AssistantParticipant.conversation_id == queue_item.event.conversation_id)
-                    )
-                ).all()
+            assistant_ids = await active_assistant_index.assistant_ids(queue_item.event.conversation_id)
 
             for assistant_id in assistant_ids:
                 if assistant_id not in assistant_event_queues:
@@ -216,8 +240,41 @@ def init(
                     assistant_id,
                 )
 
+    async def _notify_user_sse_event(queue_item: ConversationEventQueueItem) -> None:
+        """
+        Delivers an event to the SSE clients connected to this node. Called by the event bus on every node.
+        """
+        if queue_item.event.event == ConversationEventType.message_delta:
+            # deltas are transient: they are not replayed to reconnecting clients, whose replay they would crowd out
+            # of the event log, as the message created event that follows them carries the full content
+            conversation_sse_subscribers.publish(queue_item.event.conversation_id, queue_item.event)
+            return
+
+        active_assistant_index.observe_event(queue_item.event)
+
+        # neither call awaits, so subscribers that replay from the log see each event exactly once
+        conversation_event_log.append(queue_item.event)
+        conversation_sse_subscribers.publish(queue_item.event.conversation_id, queue_item.event)
+        logger.debug(
+            "enqueued event for SSE; conversation_id: %s, event: %s, event_id: %s",
+            queue_item.event.conversation_id,
+            queue_item.event.event,
+            queue_item.event.id,
+        )
+
+        if queue_item.event.event in [
+            ConversationEventType.message_created,
+            ConversationEventType.message_deleted,
+            ConversationEventType.conversation_updated,
+            ConversationEventType.participant_created,
+            ConversationEventType.participant_updated,
+        ]:
+            task = asyncio.create_task(_notify_user_event(queue_item.event.conversation_id), name="notify_user_event")
+            background_tasks.add(task)
+            task.add_done_callback(background_tasks.discard)
+
     async def _notify_user_event(conversation_id: uuid.UUID) -> None:
-        listening_user_ids = set(user_sse_queues.keys())
+        listening_user_ids = user_sse_subscribers.keys()
         async with _controller_get_session() as session:
             active_user_participants = (
                 await session.exec(
@@ -232,27 +289,42 @@ def init(
         if not active_user_participants:
             return
 
-        async with user_sse_queues_lock:
-            for user_id in active_user_participants:
-                for queue in user_sse_queues.get(user_id, {}):
-                    await queue.put(conversation_id)
-                    logger.debug(
-                        "enqueued event for user SSE; user_id: %s, conversation_id: %s", user_id, conversation_id
-                    )
+        for user_id in active_user_participants:
+            user_sse_subscribers.publish(
+                user_id, UserEventQueueItem(event="message.created", data={"conversation_id": str(conversation_id)})
+            )
+            logger.debug("enqueued event for user SSE; user_id: %s, conversation_id: %s", user_id, conversation_id)
+
+    conversation_event_bus = event_bus.create(
+        handler=_notify_user_sse_event, settings=settings.event_bus, db_settings=settings.db
+    )
+    metrics.event_bus_healthy.set_function(lambda: float(conversation_event_bus.healthy))
 
     assistant_client_pool = controller.AssistantServiceClientPool(api_key_store=api_key_store)
 
+    active_assistant_index = controller.ActiveAssistantIndex(
+        get_session=_controller_get_session,
+        max_conversations=settings.service.active_assistant_index_max_conversations,
+        ttl_seconds=settings.service.active_assistant_index_ttl_seconds,
+    )
+
     assistant_service_registration_controller = controller.AssistantServiceRegistrationController(
         get_session=_controller_get_session,
         notify_event=_notify_event,
         api_key_store=api_key_store,
         client_pool=assistant_client_pool,
+        active_assistant_index=active_assistant_index,
     )
 
+    anonymous_paths = set(settings.service.anonymous_paths)
+    if metrics.enabled:
+        # for scrapers
+        anonymous_paths.add(settings.metrics.exposition_path)
+
     app.add_middleware(
         middleware.AuthMiddleware,
         exclude_methods={"OPTIONS"},
-        exclude_paths=set(settings.service.anonymous_paths),
+        exclude_paths=anonymous_paths,
         api_key_source=assistant_service_registration_controller.api_key_source,
     )
     app.add_middleware(
@@ -265,17 +337,22 @@ def init(
     )
     app.add_middleware(CorrelationIdMiddleware)
 
+    file_storage = files.Storage(settings.storage)
+
     user_controller = controller.UserController(get_session=_controller_get_session)
     assistant_controller = controller.AssistantController(
         get_session=_controller_get_session,
         notify_event=_notify_event,
+        notify_user_event=user_sse_subscribers.publish,
         client_pool=assistant_client_pool,
-        file_storage=files.Storage(settings.storage),
+        file_storage=file_storage,
+        active_assistant_index=active_assistant_index,
     )
     conversation_controller = controller.ConversationController(
         get_session=_controller_get_session,
         notify_event=_notify_event,
         assistant_controller=assistant_controller,
+        active_assistant_index=active_assistant_index,
     )
     conversation_share_controller = controller.ConversationShareController(
         get_session=_controller_get_session,
@@ -285,12 +362,14 @@ def init(
     file_controller = controller.FileController(
         get_session=_controller_get_session,
         notify_event=_notify_event,
-        file_storage=files.Storage(settings.storage),
+        file_storage=file_storage,
     )
 
     @asynccontextmanager
     async def _lifespan() -> AsyncIterator[None]:
-        async with db.create_engine(settings.db) as engine:
+        connection_pool.configure(settings.service.http_connection_pool)
+
+        async with db.create_engine(settings.db) as engine, conversation_event_bus:
             await db.bootstrap_db(engine, settings=settings.db)
 
             app.state.db_engine = engine
@@ -313,6 +392,8 @@ def init(
                 with contextlib.suppress(asyncio.CancelledError):
                     await asyncio.gather(*background_tasks, return_exceptions=True)
 
+                await connection_pool.aclose()
+
     register_lifespan_handler(_lifespan)
 
     async def _update_assistant_service_online_status() -> NoReturn:
@@ -326,8 +407,18 @@ def init(
 
     @app.get("/")
     async def root() -> Response:
+        # unhealthy while events published on other nodes are not being received
+        if not conversation_event_bus.healthy:
+            return Response(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, content="event bus disconnected")
         return Response(status_code=status.HTTP_200_OK, content="")
 
+    if metrics.enabled:
+
+        @app.get(settings.metrics.exposition_path, include_in_schema=False)
+        async def get_metrics() -> Response:
+            content, media_type = metrics.exposition()
+            return Response(content=content, media_type=media_type)
+
     @app.get("/users")
     async def list_users(
         user_ids: list[str] = Query(alias="id"),
@@ -476,14 +567,13 @@ def init(
     async def export_assistant(
         user_principal: auth.DependsUserPrincipal,
         assistant_id: uuid.UUID,
-    ) -> FileResponse:
+    ) -> StreamingResponse:
         result = await assistant_controller.export_assistant(user_principal=user_principal, assistant_id=assistant_id)
 
-        return FileResponse(
-            path=result.file_path,
+        return StreamingResponse(
+            result.stream,
             media_type=result.content_type,
-            filename=result.filename,
-            background=starlette.background.BackgroundTask(result.cleanup),
+            headers={"Content-Disposition": f'attachment; filename="{result.filename}"'},
         )
 
     @app.get(
@@ -493,16 +583,15 @@ def init(
     async def export_conversations(
         user_principal: auth.DependsUserPrincipal,
         conversation_ids: list[uuid.UUID] = Query(alias="id"),
-    ) -> FileResponse:
+    ) -> StreamingResponse:
         result = await assistant_controller.export_conversations(
             user_principal=user_principal, conversation_ids=set(conversation_ids)
         )
 
-        return FileResponse(
-            path=result.file_path,
+        return StreamingResponse(
+            result.stream,
             media_type=result.content_type,
-            filename=result.filename,
-            background=starlette.background.BackgroundTask(result.cleanup),
+            headers={"Content-Disposition": f'attachment; filename="{result.filename}"'},
         )
 
     @app.post("/conversations/import")
@@ -616,7 +705,10 @@ def init(
 
     @app.get("/conversations/{conversation_id}/events")
     async def conversation_server_sent_events(
-        conversation_id: uuid.UUID, request: Request, principal: auth.DependsActorPrincipal
+        conversation_id: uuid.UUID,
+        request: Request,
+        principal: auth.DependsActorPrincipal,
+        last_event_id: Annotated[str | None, Header()] = None,
     ) -> EventSourceResponse:
         # ensure the principal has access to the conversation
         await conversation_controller.get_conversation(
@@ -634,14 +726,30 @@ def init(
             principal_id,
             conversation_id,
         )
-        event_queue = asyncio.Queue[ConversationEvent]()
-
-        async with conversation_sse_queues_lock:
-            queues = conversation_sse_queues[conversation_id]
-            queues.add(event_queue)
+        event_queue = conversation_sse_subscribers.subscribe(conversation_id)
+
+        # events are appended to the log and published without awaiting, so the replayed events and the events
+        # that arrive on the queue neither overlap nor leave a gap
+        missed_events_lost = False
+        if last_event_id:
+            missed_events = conversation_event_log.events_after(conversation_id, last_event_id)
+            if missed_events is None:
+                logger.info(
+                    "last event id not found in event log, client must reload; conversation_id: %s, last_event_id: %s",
+                    conversation_id,
+                    last_event_id,
+                )
+                missed_events_lost = True
+            for missed_event in missed_events or []:
+                event_queue.put_nowait(missed_event)
 
         async def event_generator() -> AsyncIterator[ServerSentEvent]:
             try:
+                if missed_events_lost:
+                    # the events missed since the last event id are no longer in the event log, so they cannot be
+                    # replayed; the client reloads the conversation instead, and the stream continues from here
+                    yield ServerSentEvent(event="reload", data=json.dumps({"reason": "last event id not found"}))
+
                 while True:
                     if stop_signal.is_set():
                         logger.debug("sse stopping due to signal; conversation_id: %s", conversation_id)
@@ -664,8 +772,24 @@ def init(
                         except asyncio.TimeoutError:
                             continue
 
+                        if conversation_event is None:
+                            logger.warning(
+                                "sse client evicted for falling behind; %s: %s, conversation_id: %s",
+                                principal_id_type,
+                                principal_id,
+                                conversation_id,
+                            )
+                            # no id is sent, so the client reconnects with the last event id it received and
+                            # the missed events are replayed from the event log
+                            yield ServerSentEvent(event="resync", data=json.dumps({"reason": "slow consumer"}))
+                            break
+
                         server_sent_event = ServerSentEvent(
-                            id=conversation_event.id,
+                            # deltas are not in the event log, so they are sent without an id, leaving the client's
+                            # last event id on an event that can be resumed from
+                            id=conversation_event.id
+                            if conversation_event.event != ConversationEventType.message_delta
+                            else None,
                             event=conversation_event.event.value,
                             data=conversation_event.model_dump_json(include={"timestamp", "data"}),
                             retry=1000,
@@ -686,11 +810,7 @@ def init(
                         logger.exception("error sending event to sse client; conversation_id: %s", conversation_id)
 
             finally:
-                queues.discard(event_queue)
-                if len(queues) == 0:
-                    async with conversation_sse_queues_lock:
-                        if len(queues) == 0:
-                            conversation_sse_queues.pop(conversation_id, None)
+                conversation_sse_subscribers.unsubscribe(conversation_id, event_queue)
 
         return EventSourceResponse(event_generator(), sep="\n")
 
@@ -700,11 +820,7 @@ def init(
     ) -> EventSourceResponse:
         logger.debug("client connected to user events sse; user_id: %s", user_principal.user_id)
 
-        event_queue = asyncio.Queue[uuid.UUID]()
-
-        async with user_sse_queues_lock:
-            queues = user_sse_queues[user_principal.user_id]
-            queues.add(event_queue)
+        event_queue = user_sse_subscribers.subscribe(user_principal.user_id)
 
         async def event_generator() -> AsyncIterator[ServerSentEvent]:
             try:
@@ -726,31 +842,35 @@ def init(
                     try:
                         try:
                             async with asyncio.timeout(1):
-                                conversation_id = await event_queue.get()
+                                user_event = await event_queue.get()
                         except asyncio.TimeoutError:
                             continue
 
+                        if user_event is None:
+                            logger.warning(
+                                "user sse client evicted for falling behind; user_id: %s", user_principal.user_id
+                            )
+                            yield ServerSentEvent(event="resync", data=json.dumps({"reason": "slow consumer"}))
+                            break
+
                         server_sent_event = ServerSentEvent(
                             id=uuid.uuid4().hex,
-                            event="message.created",
-                            data=json.dumps({"conversation_id": str(conversation_id)}),
+                            event=user_event.event,
+                            data=json.dumps(user_event.data),
                             retry=1000,
                         )
                         yield server_sent_event
                         logger.debug(
                             "sent event to user sse client; user_id: %s, event: %s",
                             user_principal.user_id,
+                            user_event.event,
                         )
 
                     except Exception:
                         logger.exception("error sending event to sse client; user_id: %s", user_principal.user_id)
 
             finally:
-                queues.discard(event_queue)
-                if len(queues) == 0:
-                    async with conversation_sse_queues_lock:
-                        if len(queues) == 0:
-                            user_sse_queues.pop(user_principal.user_id, None)
+                user_sse_subscribers.unsubscribe(user_principal.user_id, event_queue)
 
         return EventSourceResponse(event_generator(), sep="\n")
 
@@ -779,11 +899,15 @@ def init(
         principal: auth.DependsActorPrincipal,
         include_inactive: bool = False,
         latest_message_types: Annotated[list[MessageType], Query(alias="latest_message_type")] = [MessageType.chat],
+        limit: Annotated[int | None, Query(gt=0, le=500)] = None,
+        before: Annotated[str | None, Query()] = None,
     ) -> ConversationList:
         return await conversation_controller.get_conversations(
             principal=principal,
             include_all_owned=include_inactive,
             latest_message_types=set(latest_message_types),
+            limit=limit,
+            before=before,
         )
 
     @app.get("/conversations/{conversation_id}")
@@ -872,6 +996,8 @@ def init(
         message_types: Annotated[list[MessageType] | None, Query(alias="message_type")] = None,
         before: Annotated[uuid.UUID | None, Query()] = None,
         after: Annotated[uuid.UUID | None, Query()] = None,
+        before_cursor: Annotated[str | None, Query()] = None,
+        after_cursor: Annotated[str | None, Query()] = None,
         limit: Annotated[int, Query(lte=500)] = 100,
     ) -> ConversationMessageList:
         return await conversation_controller.get_messages(
@@ -882,6 +1008,8 @@ def init(
             message_types=message_types,
             before=before,
             after=after,
+            before_cursor=before_cursor,
+            after_cursor=after_cursor,
             limit=limit,
         )
 
@@ -901,6 +1029,23 @@ def init(
             background_tasks.add_task(*task_args)
         return response
 
+    @app.post(
+        "/conversations/{conversation_id}/messages/{message_id}/deltas",
+        status_code=status.HTTP_204_NO_CONTENT,
+    )
+    async def send_message_delta(
+        conversation_id: uuid.UUID,
+        message_id: uuid.UUID,
+        delta: NewConversationMessageDelta,
+        assistant_principal: auth.DependsAssistantPrincipal,
+    ) -> None:
+        await conversation_controller.send_message_delta(
+            assistant_principal=assistant_principal,
+            conversation_id=conversation_id,
+            message_id=message_id,
+            delta=delta,
+        )
+
     @app.get(
         "/conversations/{conversation_id}/messages/{message_id}",
     )
@@ -0,0 +1,109 @@
+import asyncio
+from dataclasses import dataclass
+from typing import Generic, Hashable, Literal, TypeVar
+
+KeyT = TypeVar("KeyT", bound=Hashable)
+ItemT = TypeVar("ItemT")
+
+OverflowPolicy = Literal["drop_oldest", "disconnect"]
+
+
+@dataclass
+class SubscriberStats:
+    dropped_events: int = 0
+    evicted_subscribers: int = 0
+
+
+class SubscriberQueue(Generic[ItemT]):
+    """
+    Bounded queue for a single SSE subscriber. Publishing never blocks; when the queue is full the overflow policy
+    either drops the oldest queued item or evicts the subscriber.
+    """
+
+    def __init__(self, maxsize: int, overflow_policy: OverflowPolicy, stats: SubscriberStats) -> None:
+        # one extra slot is reserved for the eviction sentinel
+        self._queue: asyncio.Queue[ItemT | None] = asyncio.Queue(maxsize=maxsize + 1)
+        self._maxsize = maxsize
+        self._overflow_policy = overflow_policy
+        self._stats = stats
+        self.evicted = False
+
+    def qsize(self) -> int:
+        return self._queue.qsize()
+
+    def put_nowait(self, item: ItemT) -> None:
+        if self.evicted:
+            return
+
+        if self._queue.qsize() < self._maxsize:
+            self._queue.put_nowait(item)
+            return
+
+        match self._overflow_policy:
+            case "drop_oldest":
+                self._queue.get_nowait()
+                self._queue.put_nowait(item)
+                self._stats.dropped_events += 1
+
+            case "disconnect":
+                self.evict()
+
+    def evict(self) -> None:
+        if self.evicted:
+            return
+
+        self.evicted = True
+        self._stats.evicted_subscribers += 1
+
+        # release the queued items and wake the subscriber
+        while not self._queue.empty():
+            self._queue.get_nowait()
+        self._queue.put_nowait(None)
+
+    async def get(self) -> ItemT | None:
+        """
+        Returns the next item, or None if the subscriber has been evicted.
+        """
+        return await self._queue.get()
+
+
+class SubscriberRegistry(Generic[KeyT, ItemT]):
+    """
+    Tracks SSE subscriber queues by key (ex. conversation id or user id).
+
+    The subscribers for each key are held in an immutable tuple that is replaced on subscribe and unsubscribe, so
+    publishers iterate over a snapshot without taking a lock, and no operation awaits.
+    """
+
+    def __init__(self, queue_size: int, overflow_policy: OverflowPolicy) -> None:
+        self._queue_size = queue_size
+        self._overflow_policy: OverflowPolicy = overflow_policy
+        self._subscribers: dict[KeyT, tuple[SubscriberQueue[ItemT], ...]] = {}
+        self.stats = SubscriberStats()
+
+    def subscribe(self, key: KeyT) -> SubscriberQueue[ItemT]:
+        queue = SubscriberQueue[ItemT](
+            maxsize=self._queue_size, overflow_policy=self._overflow_policy, stats=self.stats
+        )
+        self._subscribers[key] = (*self._subscribers.get(key, ()), queue)
+        return queue
+
+    def unsubscribe(self, key: KeyT, queue: SubscriberQueue[ItemT]) -> None:
+        remaining = tuple(q for q in self._subscribers.get(key, ()) if q is not queue)
+        if remaining:
+            self._subscribers[key] = remaining
+            return
+        self._subscribers.pop(key, None)
+
+    def publish(self, key: KeyT, item: ItemT) -> None:
+        for queue in self._subscribers.get(key, ()):
+            queue.put_nowait(item)
+
+    def items(self) -> list[tuple[KeyT, tuple[SubscriberQueue[ItemT], ...]]]:
+        return list(self._subscribers.items())
+
+    def keys(self) -> set[KeyT]:
+        return set(self._subscribers.keys())
+
+    def subscriber_count(self, key: KeyT) -> int:
+        return len(self._subscribers.get(key, ()))
@@ -0,0 +1,77 @@
+import asyncio
+import io
+import zipfile
+from typing import AsyncIterable, AsyncIterator
+
+
+class _Sink(io.RawIOBase):
+    """
+    An unseekable, write-only stream that buffers what is written until it is drained. zipfile writes data
+    descriptors after each entry when the stream is unseekable, so nothing written is ever revisited.
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._buffer = bytearray()
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, b) -> int:  # noqa: ANN001
+        self._buffer += b
+        self._position += len(b)
+        return len(b)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        data = bytes(self._buffer)
+        self._buffer.clear()
+        return data
+
+
+class ZipStreamWriter:
+    """
+    Writes a zip archive incrementally, yielding the bytes of the archive as each entry is written, so that an
+    archive can be streamed without staging its entries or the archive on disk.
+    """
+
+    def __init__(self) -> None:
+        self._sink = _Sink()
+        self._zip_file = zipfile.ZipFile(self._sink, mode="w", compression=zipfile.ZIP_DEFLATED)
+
+    async def write(self, name: str, chunks: AsyncIterable[bytes]) -> AsyncIterator[bytes]:
+        """
+        Writes an entry with the content of the chunks. The first chunk is read before the entry is started, so if
+        reading it raises, the archive is left without the entry.
+        """
+        iterator = aiter(chunks)
+        first_chunk = await anext(iterator, None)
+
+        # the size is not known up front, so allow for entries larger than 4 GiB
+        entry = self._zip_file.open(name, mode="w", force_zip64=True)
+        try:
+            if first_chunk is not None:
+                # compression runs in a worker thread to keep the event loop responsive
+                await asyncio.to_thread(entry.write, first_chunk)
+                if data := self._sink.drain():
+                    yield data
+
+            async for chunk in iterator:
+                await asyncio.to_thread(entry.write, chunk)
+                if data := self._sink.drain():
+                    yield data
+        finally:
+            await asyncio.to_thread(entry.close)
+
+        if data := self._sink.drain():
+            yield data
+
+    def close(self) -> bytes:
+        """
+        Finishes the archive, returning its remaining bytes.
+        """
+        self._zip_file.close()
+        return self._sink.drain()
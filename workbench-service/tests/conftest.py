@@ -74,6 +74,13 @@ def pytest_addoption(parser: pytest.Parser):
         choices=["sqlite", "postgresql"],
         default=env_var("WORKBENCH_PYTEST_DBTYPE") or "sqlite",
     )
+    parser.addoption(
+        "--storagetype",
+        action="store",
+        help="file content storage type",
+        choices=["local", "s3"],
+        default=env_var("WORKBENCH_PYTEST_STORAGETYPE") or "local",
+    )
 
 
 @pytest.fixture(scope="session")
@@ -161,11 +168,46 @@ async def db_settings(db_type: str, echo_sql: bool, request: pytest.FixtureReque
 
 
 @pytest.fixture
-def storage_settings() -> Iterator[files.StorageSettings]:
+def storage_type(request: pytest.FixtureRequest) -> str:
+    return request.config.option.storagetype
+
+
+@pytest.fixture
+def storage_settings(
+    storage_type: str, request: pytest.FixtureRequest, monkeypatch: pytest.MonkeyPatch
+) -> Iterator[files.StorageSettings]:
     storage_settings = semantic_workbench_service.settings.storage.model_copy()
 
     with tempfile.TemporaryDirectory() as temp_dir:
         storage_settings.root = temp_dir
+
+        if storage_type == "s3":
+            # use a MinIO bucket in a docker container as a local stand-in for S3
+            boto3 = pytest.importorskip("boto3")
+            docker_services = request.getfixturevalue("docker_services")
+            docker_ip = request.getfixturevalue("docker_ip")
+            endpoint_url = f"http://{docker_ip}:{docker_services.port_for('minio', 9000)}"
+            # the credentials match the defaults in docker-compose.yaml
+            monkeypatch.setenv("AWS_ACCESS_KEY_ID", os.environ.get("AWS_ACCESS_KEY_ID", "minioadmin"))
+            monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", os.environ.get("AWS_SECRET_ACCESS_KEY", "minioadmin"))
+            monkeypatch.setenv("AWS_DEFAULT_REGION", os.environ.get("AWS_DEFAULT_REGION", "us-east-1"))
+
+            s3_client = boto3.client("s3", endpoint_url=endpoint_url)
+
+            def minio_is_up() -> bool:
+                try:
+                    s3_client.list_buckets()
+                except Exception:
+                    return False
+                return True
+
+            docker_services.wait_until_responsive(timeout=30.0, pause=0.1, check=minio_is_up)
+
+            storage_settings.content_backend = "s3"
+            storage_settings.s3_endpoint_url = endpoint_url
+            storage_settings.s3_bucket = f"workbench-test-{uuid.uuid4().hex}"
+            s3_client.create_bucket(Bucket=storage_settings.s3_bucket)
+
         yield storage_settings
 
 
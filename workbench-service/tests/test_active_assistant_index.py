@@ -0,0 +1,95 @@
+import uuid
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
+from semantic_workbench_api_model.workbench_model import ConversationEvent, ConversationEventType
+from semantic_workbench_service.controller import ActiveAssistantIndex
+
+
+class _FakeSession:
+    def __init__(self, assistant_ids: list[uuid.UUID]) -> None:
+        self.assistant_ids = assistant_ids
+        self.query_count = 0
+
+    async def exec(self, statement):  # noqa: ANN001
+        self.query_count += 1
+        assistant_ids = list(self.assistant_ids)
+
+        class _Result:
+            def all(self) -> list[uuid.UUID]:
+                return assistant_ids
+
+        return _Result()
+
+
+def _index_for(session: _FakeSession) -> ActiveAssistantIndex:
+    @asynccontextmanager
+    async def get_session() -> AsyncIterator[_FakeSession]:
+        yield session
+
+    return ActiveAssistantIndex(get_session=get_session)  # type: ignore[arg-type]
+
+
+def _participant_event(
+    conversation_id: uuid.UUID, assistant_id: uuid.UUID, active_participant: bool, status: str | None = None
+) -> ConversationEvent:
+    return ConversationEvent(
+        conversation_id=conversation_id,
+        event=ConversationEventType.participant_updated,
+        data={
+            "participant": {
+                "role": "assistant",
+                "id": str(assistant_id),
+                "active_participant": active_participant,
+                "online": True,
+                "status": status,
+            }
+        },
+    )
+
+
+async def test_assistant_ids_are_cached_until_invalidated() -> None:
+    assistant_id = uuid.uuid4()
+    conversation_id = uuid.uuid4()
+    session = _FakeSession([assistant_id])
+    index = _index_for(session)
+
+    assert await index.assistant_ids(conversation_id) == {assistant_id}
+    assert await index.assistant_ids(conversation_id) == {assistant_id}
+    assert session.query_count == 1
+
+    session.assistant_ids = []
+    index.invalidate(conversation_id)
+    assert await index.assistant_ids(conversation_id) == set()
+    assert session.query_count == 2
+
+    index.invalidate_all()
+    await index.assistant_ids(conversation_id)
+    assert session.query_count == 3
+
+
+async def test_observe_event_ignores_status_updates() -> None:
+    assistant_id = uuid.uuid4()
+    conversation_id = uuid.uuid4()
+    session = _FakeSession([assistant_id])
+    index = _index_for(session)
+
+    await index.assistant_ids(conversation_id)
+    index.observe_event(_participant_event(conversation_id, assistant_id, active_participant=True, status="thinking"))
+    await index.assistant_ids(conversation_id)
+
+    assert session.query_count == 1
+
+
+async def test_observe_event_invalidates_when_assistant_leaves() -> None:
+    assistant_id = uuid.uuid4()
+    conversation_id = uuid.uuid4()
+    session = _FakeSession([assistant_id])
+    index = _index_for(session)
+
+    await index.assistant_ids(conversation_id)
+    session.assistant_ids = []
+    index.observe_event(_participant_event(conversation_id, assistant_id, active_participant=False))
+
+    assert await index.assistant_ids(conversation_id) == set()
+    assert session.query_count == 2
@@ -0,0 +1,113 @@
+import uuid
+from unittest.mock import AsyncMock, Mock
+
+import httpx
+import pytest
+from semantic_workbench_api_model.assistant_service_client import (
+    AssistantConnectionError,
+    AssistantError,
+    AssistantResponseError,
+)
+from semantic_workbench_api_model.workbench_model import ConversationEvent, ConversationEventType
+from semantic_workbench_service.controller import assistant as assistant_controller
+
+_request = httpx.Request("POST", "http://testassistantservice/events")
+
+
+def _connection_error(error: httpx.RequestError) -> AssistantConnectionError:
+    # as raised by the assistant client
+    try:
+        raise AssistantConnectionError(error) from error
+    except AssistantConnectionError as e:
+        return e
+
+
+def _events(count: int) -> list[ConversationEvent]:
+    conversation_id = uuid.uuid4()
+    return [
+        ConversationEvent(conversation_id=conversation_id, event=ConversationEventType.message_created, data={})
+        for _ in range(count)
+    ]
+
+
+def _controller(assistant_client: Mock) -> assistant_controller.AssistantController:
+    assistant = Mock()
+    assistant.related_assistant_service_registration.assistant_service_url = "http://testassistantservice"
+
+    active_assistant_index = Mock()
+    active_assistant_index.assistant = AsyncMock(return_value=assistant)
+    client_pool = Mock()
+    client_pool.assistant_client = AsyncMock(return_value=assistant_client)
+
+    return assistant_controller.AssistantController(
+        get_session=Mock(),
+        notify_event=AsyncMock(),
+        notify_user_event=Mock(),
+        client_pool=client_pool,
+        file_storage=Mock(),
+        active_assistant_index=active_assistant_index,
+    )
+
+
+@pytest.mark.parametrize(
+    "error",
+    [
+        _connection_error(httpx.ConnectError("connection refused", request=_request)),
+        _connection_error(httpx.ConnectTimeout("timed out", request=_request)),
+        AssistantResponseError(httpx.Response(status_code=422, request=_request)),
+    ],
+)
+async def test_forward_events_falls_back_to_single_events_when_batch_not_delivered(error: AssistantError) -> None:
+    assistant_client = Mock()
+    assistant_client.post_conversation_events = AsyncMock(side_effect=error)
+    assistant_client.post_conversation_event = AsyncMock()
+    controller = _controller(assistant_client)
+
+    events = _events(3)
+    await controller.forward_events_to_assistant(assistant_id=uuid.uuid4(), events=events)
+
+    assert [call.kwargs["event"] for call in assistant_client.post_conversation_event.call_args_list] == events
+
+    # a failed batch is not taken to mean that batches are unsupported
+    await controller.forward_events_to_assistant(assistant_id=uuid.uuid4(), events=events)
+    assert assistant_client.post_conversation_events.call_count == 2
+
+
+@pytest.mark.parametrize(
+    "error",
+    [
+        _connection_error(httpx.ReadTimeout("timed out", request=_request)),
+        _connection_error(httpx.RemoteProtocolError("connection reset", request=_request)),
+        AssistantResponseError(httpx.Response(status_code=500, request=_request)),
+    ],
+)
+async def test_forward_events_does_not_resend_batch_that_may_have_been_delivered(error: AssistantError) -> None:
+    assistant_client = Mock()
+    assistant_client.post_conversation_events = AsyncMock(side_effect=error)
+    assistant_client.post_conversation_event = AsyncMock()
+    controller = _controller(assistant_client)
+
+    await controller.forward_events_to_assistant(assistant_id=uuid.uuid4(), events=_events(3))
+
+    assistant_client.post_conversation_event.assert_not_called()
+
+
+async def test_forward_events_retries_batches_after_expiry() -> None:
+    assistant_client = Mock()
+    assistant_client.post_conversation_events = AsyncMock(side_effect=AssistantError(status_code=404))
+    assistant_client.post_conversation_event = AsyncMock()
+    controller = _controller(assistant_client)
+
+    await controller.forward_events_to_assistant(assistant_id=uuid.uuid4(), events=_events(2))
+    await controller.forward_events_to_assistant(assistant_id=uuid.uuid4(), events=_events(2))
+    assert assistant_client.post_conversation_events.call_count == 1
+    assert assistant_client.post_conversation_event.call_count == 4
+
+    # the assistant service may have been upgraded since
+    controller._batch_unsupported_service_urls["http://testassistantservice"] -= (
+        assistant_controller._batch_unsupported_expiry_seconds
+    )
+    assistant_client.post_conversation_events.side_effect = None
+    await controller.forward_events_to_assistant(assistant_id=uuid.uuid4(), events=_events(2))
+    assert assistant_client.post_conversation_events.call_count == 2
+    assert assistant_client.post_conversation_event.call_count == 4
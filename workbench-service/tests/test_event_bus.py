@@ -0,0 +1,188 @@
+import asyncio
+import logging
+import time
+import uuid
+
+import pytest
+from semantic_workbench_api_model.workbench_model import ConversationEvent, ConversationEventType
+from semantic_workbench_service import event_bus
+from semantic_workbench_service.config import DBSettings, EventBusSettings
+from semantic_workbench_service.event import ConversationEventQueueItem
+
+logger = logging.getLogger(__name__)
+
+
+def _queue_item(conversation_id: uuid.UUID, data: dict | None = None) -> ConversationEventQueueItem:
+    return ConversationEventQueueItem(
+        event=ConversationEvent(
+            conversation_id=conversation_id,
+            event=ConversationEventType.message_created,
+            data=data or {},
+        ),
+        event_audience={"user"},
+    )
+
+
+@pytest.mark.parametrize("content", ["small", "large ✓ " * 5_000])
+def test_notification_encoding_round_trip(content: str) -> None:
+    queue_item = _queue_item(uuid.uuid4(), data={"content": content})
+
+    notifications = event_bus.encode_notifications("node", queue_item)
+    assert all(len(notification.encode("utf-8")) < 8000 for notification in notifications)
+
+    assembler = event_bus.NotificationAssembler()
+    results = [assembler.add(notification) for notification in notifications]
+
+    assert [node_id for node_id, _ in results] == ["node"] * len(notifications)
+    assert all(item is None for _, item in results[:-1])
+    assert results[-1][1] == queue_item
+
+
+async def test_in_memory_event_bus_delivers_to_handler() -> None:
+    received: list[ConversationEventQueueItem] = []
+
+    async def handler(queue_item: ConversationEventQueueItem) -> None:
+        received.append(queue_item)
+
+    bus = event_bus.create(handler=handler, settings=EventBusSettings(), db_settings=DBSettings())
+    assert isinstance(bus, event_bus.InMemoryEventBus)
+
+    queue_item = _queue_item(uuid.uuid4())
+    async with bus:
+        await bus.publish(queue_item)
+
+    assert received == [queue_item]
+
+
+async def test_postgresql_event_bus_multi_worker_load(db_type: str, db_settings: DBSettings) -> None:
+    """
+    Simulates several service workers, each with its own event bus, publishing concurrently. Every worker
+    must receive every event, in publish order per publishing worker.
+    """
+    if db_type != "postgresql":
+        pytest.skip("requires --dbtype postgresql")
+
+    worker_count = 4
+    events_per_worker = 250
+    expected_total = worker_count * events_per_worker
+
+    settings = EventBusSettings(backend="postgresql", postgresql_channel=f"test_{uuid.uuid4().hex}")
+    received: list[list[ConversationEventQueueItem]] = [[] for _ in range(worker_count)]
+    all_received = [asyncio.Event() for _ in range(worker_count)]
+
+    def handler_for(worker: int):
+        async def handler(queue_item: ConversationEventQueueItem) -> None:
+            received[worker].append(queue_item)
+            if len(received[worker]) == expected_total:
+                all_received[worker].set()
+
+        return handler
+
+    buses = [
+        event_bus.create(handler=handler_for(worker), settings=settings, db_settings=db_settings)
+        for worker in range(worker_count)
+    ]
+
+    conversation_ids = [uuid.uuid4() for _ in range(worker_count)]
+
+    async def publish_all(worker: int) -> None:
+        for index in range(events_per_worker):
+            await buses[worker].publish(_queue_item(conversation_ids[worker], data={"index": index}))
+
+    for bus in buses:
+        await bus.__aenter__()
+    try:
+        start = time.perf_counter()
+        await asyncio.gather(*(publish_all(worker) for worker in range(worker_count)))
+        async with asyncio.timeout(30):
+            await asyncio.gather(*(event.wait() for event in all_received))
+        elapsed = time.perf_counter() - start
+    finally:
+        for bus in buses:
+            await bus.__aexit__(None, None, None)
+
+    logger.warning(
+        "event bus load; workers: %d, events published: %d, deliveries: %d, elapsed: %.2fs, deliveries/s: %.0f",
+        worker_count,
+        expected_total,
+        expected_total * worker_count,
+        elapsed,
+        expected_total * worker_count / elapsed,
+    )
+
+    for worker_received in received:
+        for conversation_id in conversation_ids:
+            indexes = [
+                item.event.data["index"] for item in worker_received if item.event.conversation_id == conversation_id
+            ]
+            assert indexes == list(range(events_per_worker))
+
+
+class _FakeConnection:
+    def __init__(self) -> None:
+        self.closed = False
+        self.termination_listeners: list = []
+
+    def add_termination_listener(self, callback) -> None:
+        self.termination_listeners.append(callback)
+
+    async def add_listener(self, channel: str, callback) -> None:
+        pass
+
+    def is_closed(self) -> bool:
+        return self.closed
+
+    async def close(self) -> None:
+        self.terminate()
+
+    def terminate(self) -> None:
+        self.closed = True
+        for callback in self.termination_listeners:
+            callback(self)
+
+
+class _FakePool:
+    async def close(self) -> None:
+        pass
+
+
+async def test_postgresql_event_bus_reconnects_listen_connection(monkeypatch: pytest.MonkeyPatch) -> None:
+    connections: list[_FakeConnection] = []
+    connect_failures = 1
+
+    async def connect(**kwargs) -> _FakeConnection:
+        # the first reconnect attempt fails, as if the database were still unavailable
+        nonlocal connect_failures
+        if connections and connect_failures:
+            connect_failures -= 1
+            raise ConnectionRefusedError()
+        connections.append(_FakeConnection())
+        return connections[-1]
+
+    async def create_pool(**kwargs) -> _FakePool:
+        return _FakePool()
+
+    async def handler(queue_item: ConversationEventQueueItem) -> None:
+        pass
+
+    monkeypatch.setattr(event_bus.asyncpg, "connect", connect)
+    monkeypatch.setattr(event_bus.asyncpg, "create_pool", create_pool)
+    monkeypatch.setattr(event_bus, "_reconnect_initial_delay_seconds", 0.01)
+
+    bus = event_bus.create(
+        handler=handler,
+        settings=EventBusSettings(backend="postgresql"),
+        db_settings=DBSettings(url="postgresql://localhost/workbench"),
+    )
+    async with bus:
+        assert bus.healthy
+
+        connections[0].terminate()
+        assert not bus.healthy
+
+        async with asyncio.timeout(5):
+            while not bus.healthy:
+                await asyncio.sleep(0.01)
+
+    assert len(connections) == 2
+    assert connections[1].closed
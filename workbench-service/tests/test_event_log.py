@@ -0,0 +1,49 @@
+import uuid
+
+from semantic_workbench_api_model.workbench_model import ConversationEvent, ConversationEventType
+from semantic_workbench_service.event_log import ConversationEventLog
+
+
+def _event(conversation_id: uuid.UUID) -> ConversationEvent:
+    return ConversationEvent(conversation_id=conversation_id, event=ConversationEventType.message_created)
+
+
+def test_events_after_returns_missed_events() -> None:
+    event_log = ConversationEventLog(max_events_per_conversation=10, max_conversations=10)
+    conversation_id = uuid.uuid4()
+    other_conversation_id = uuid.uuid4()
+
+    events = [_event(conversation_id) for _ in range(5)]
+    for event in events:
+        event_log.append(event)
+        event_log.append(_event(other_conversation_id))
+
+    assert event_log.events_after(conversation_id, events[1].id) == events[2:]
+    assert event_log.events_after(conversation_id, events[-1].id) == []
+    assert event_log.events_after(conversation_id, "unknown") is None
+    assert event_log.events_after(uuid.uuid4(), events[1].id) is None
+
+
+def test_events_after_evicted_event_is_unknown() -> None:
+    event_log = ConversationEventLog(max_events_per_conversation=3, max_conversations=10)
+    conversation_id = uuid.uuid4()
+
+    events = [_event(conversation_id) for _ in range(5)]
+    for event in events:
+        event_log.append(event)
+
+    assert event_log.events_after(conversation_id, events[1].id) is None
+    assert event_log.events_after(conversation_id, events[2].id) == events[3:]
+
+
+def test_least_recently_used_conversations_are_evicted() -> None:
+    event_log = ConversationEventLog(max_events_per_conversation=3, max_conversations=2)
+    conversation_ids = [uuid.uuid4() for _ in range(3)]
+
+    events = [_event(conversation_id) for conversation_id in conversation_ids]
+    for event in events:
+        event_log.append(event)
+
+    assert event_log.events_after(conversation_ids[0], events[0].id) is None
+    assert event_log.events_after(conversation_ids[1], events[1].id) == []
+    assert event_log.events_after(conversation_ids[2], events[2].id) == []
@@ -0,0 +1,13 @@
+from semantic_workbench_service.controller import export_import
+
+
+def test_name_suffixes() -> None:
+    names = export_import._NameSuffixes(["Report", "report (1)", "Other", "Other (x)", "Notes (2) (3)"])
+
+    assert names.unique("report") == "report (2)"
+    assert names.unique("Report") == "Report (3)"
+    assert names.unique("other") == "other (1)"
+    assert names.unique("New") == "New"
+    assert names.unique("New") == "New (1)"
+    assert names.unique("Notes (2)") == "Notes (2) (1)"
+    assert names.unique("Notes") == "Notes"
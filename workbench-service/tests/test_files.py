@@ -1,4 +1,7 @@
+import asyncio
+import hashlib
 import io
+import pathlib
 import uuid
 
 import pytest
@@ -42,3 +45,121 @@ def test_write_read_delete_file(storage_settings: files.StorageSettings) -> None
 
     with pytest.raises(FileNotFoundError), file_storage.read_file(namespace=conversation_id, filename=filename) as f:
         pass
+
+
+async def test_write_content_deduplicates(storage_settings: files.StorageSettings) -> None:
+    file_storage = files.Storage(settings=storage_settings)
+
+    storage_filename = await file_storage.write_content(io.BytesIO(b"content"))
+    assert files.is_content_addressed(storage_filename)
+    assert storage_filename == "sha256:" + hashlib.sha256(b"content").hexdigest()
+
+    assert await file_storage.write_content(io.BytesIO(b"content")) == storage_filename
+    assert await file_storage.write_content(io.BytesIO(b"other content")) != storage_filename
+
+    if storage_settings.content_backend == "local":
+        content_path = pathlib.Path(storage_settings.root) / "content"
+        content_files = [path for path in content_path.rglob("*") if path.is_file()]
+        assert len(content_files) == 2
+
+
+async def test_write_read_delete_content(storage_settings: files.StorageSettings) -> None:
+    file_storage = files.Storage(settings=storage_settings)
+
+    # larger than one read chunk
+    file_content = b"0123456789" * 50_000
+    storage_filename = await file_storage.write_content(io.BytesIO(file_content))
+
+    chunks = [chunk async for chunk in file_storage.read_content(namespace="", storage_filename=storage_filename)]
+    assert len(chunks) > 1
+    assert b"".join(chunks) == file_content
+
+    await file_storage.delete_content(namespace="", storage_filename=storage_filename)
+
+    with pytest.raises(FileNotFoundError):
+        async for _ in file_storage.read_content(namespace="", storage_filename=storage_filename):
+            pass
+
+
+async def test_read_content_of_namespaced_file(storage_settings: files.StorageSettings) -> None:
+    file_storage = files.Storage(settings=storage_settings)
+
+    conversation_id = uuid.uuid4().hex
+    file_storage.write_file(namespace=conversation_id, filename="file_1", content=io.BytesIO(b"content"))
+
+    chunks = [chunk async for chunk in file_storage.read_content(namespace=conversation_id, storage_filename="file_1")]
+    assert b"".join(chunks) == b"content"
+
+
+async def test_import_content(storage_settings: files.StorageSettings) -> None:
+    file_storage = files.Storage(settings=storage_settings)
+
+    storage_filename = "sha256:" + hashlib.sha256(b"content").hexdigest()
+
+    # imports find content-addressed content in the namespace directory, as exported
+    conversation_id = uuid.uuid4().hex
+    file_storage.write_file(namespace=conversation_id, filename=storage_filename, content=io.BytesIO(b"content"))
+
+    assert await file_storage.import_content(namespace=conversation_id, storage_filenames=[storage_filename]) == {}
+
+    assert not file_storage.file_exists(namespace=conversation_id, filename=storage_filename)
+    chunks = [chunk async for chunk in file_storage.read_content(namespace="", storage_filename=storage_filename)]
+    assert b"".join(chunks) == b"content"
+
+
+async def test_import_content_not_matching_digest(storage_settings: files.StorageSettings) -> None:
+    file_storage = files.Storage(settings=storage_settings)
+
+    storage_filename = "sha256:" + hashlib.sha256(b"content").hexdigest()
+
+    conversation_id = uuid.uuid4().hex
+    file_storage.write_file(namespace=conversation_id, filename=storage_filename, content=io.BytesIO(b"tampered"))
+
+    mismatched = await file_storage.import_content(namespace=conversation_id, storage_filenames=[storage_filename])
+
+    # stored under its own digest, and left for the caller to point the file versions at it
+    assert mismatched == {storage_filename: "sha256:" + hashlib.sha256(b"tampered").hexdigest()}
+    assert file_storage.file_exists(namespace=conversation_id, filename=storage_filename)
+    chunks = [
+        chunk async for chunk in file_storage.read_content(namespace="", storage_filename=mismatched[storage_filename])
+    ]
+    assert b"".join(chunks) == b"tampered"
+
+
+async def test_ensure_content(storage_settings: files.StorageSettings) -> None:
+    file_storage = files.Storage(settings=storage_settings)
+
+    content = io.BytesIO(b"content")
+    storage_filename = await file_storage.write_content(content)
+
+    # deleted by a concurrent delete, before the file version referencing it was committed
+    await file_storage.delete_content(namespace="", storage_filename=storage_filename)
+    await file_storage.ensure_content(storage_filename, content)
+
+    chunks = [chunk async for chunk in file_storage.read_content(namespace="", storage_filename=storage_filename)]
+    assert b"".join(chunks) == b"content"
+
+
+async def test_lock_content(storage_settings: files.StorageSettings) -> None:
+    file_storage = files.Storage(settings=storage_settings)
+
+    storage_filename = await file_storage.write_content(io.BytesIO(b"content"))
+    other_storage_filename = await file_storage.write_content(io.BytesIO(b"other content"))
+    events: list[str] = []
+
+    async def hold(name: str, storage_filenames: list[str]) -> None:
+        async with file_storage.lock_content(storage_filenames):
+            events.append(f"{name} locked")
+            await asyncio.sleep(0.01)
+            events.append(f"{name} released")
+
+    await asyncio.gather(
+        hold("upload", [storage_filename, "file_1"]),
+        hold("delete", [other_storage_filename, storage_filename]),
+    )
+    assert events == ["upload locked", "upload released", "delete locked", "delete released"]
+
+    # other content is not serialized
+    events.clear()
+    await asyncio.gather(hold("upload", [storage_filename]), hold("delete", [other_storage_filename]))
+    assert events == ["upload locked", "delete locked", "upload released", "delete released"]
@@ -0,0 +1,64 @@
+from typing import Iterator
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from semantic_workbench_service import metrics, settings
+
+from .types import MockUser
+
+
+@pytest.fixture
+def metrics_enabled(monkeypatch: pytest.MonkeyPatch) -> Iterator[None]:
+    monkeypatch.setattr(settings, "metrics", metrics.MetricsSettings(enabled=True))
+    yield
+    metrics.configure(metrics.MetricsSettings())
+
+
+@pytest.mark.usefixtures("metrics_enabled")
+def test_metrics_endpoint(workbench_service: FastAPI, test_user: MockUser) -> None:
+    with TestClient(app=workbench_service, headers=test_user.authorization_headers) as client:
+        http_response = client.post("/conversations", json={"title": "test-conversation"})
+        assert httpx.codes.is_success(http_response.status_code)
+        conversation_id = http_response.json()["id"]
+
+        http_response = client.post(f"/conversations/{conversation_id}/messages", json={"content": "hello"})
+        assert httpx.codes.is_success(http_response.status_code)
+
+        http_response = client.put(
+            f"/conversations/{conversation_id}/files", files=[("files", ("test.txt", "hello world\n", "text/plain"))]
+        )
+        assert httpx.codes.is_success(http_response.status_code)
+
+        http_response = client.get(f"/conversations/{conversation_id}/files/test.txt")
+        assert httpx.codes.is_success(http_response.status_code)
+
+        # scraped without authentication
+        http_response = client.get("/metrics", headers={"Authorization": ""})
+        assert httpx.codes.is_success(http_response.status_code)
+        assert http_response.headers["content-type"].startswith("text/plain")
+
+        exposition = http_response.text
+        for sample in [
+            'workbench_notify_event_seconds_count{event="message.created"}',
+            'workbench_db_query_seconds_count{statement="SELECT"}',
+            'workbench_db_query_seconds_count{statement="INSERT"}',
+            "workbench_db_session_seconds_count",
+            'workbench_file_storage_bytes_total{operation="write"} 12.0',
+            'workbench_file_storage_bytes_total{operation="read"} 12.0',
+            "workbench_auth_seconds_count",
+            'workbench_sse_subscribers{stream="conversation"} 0.0',
+            "workbench_assistant_event_queue_depth 0.0",
+            "workbench_event_bus_healthy 1.0",
+        ]:
+            assert sample in exposition
+
+
+def test_metrics_disabled(workbench_service: FastAPI, test_user: MockUser) -> None:
+    assert not metrics.enabled
+    assert metrics.notify_event_seconds.labels(event="message.created").time() is metrics.auth_seconds.time()
+
+    with TestClient(app=workbench_service, headers=test_user.authorization_headers) as client:
+        http_response = client.get("/metrics")
+        assert http_response.status_code == httpx.codes.NOT_FOUND
@@ -0,0 +1,72 @@
+import asyncio
+import time
+
+import pytest
+from pydantic import ValidationError
+from semantic_workbench_service import sse
+from semantic_workbench_service.config import WebServiceSettings
+
+
+async def test_drop_oldest_policy_keeps_newest_items() -> None:
+    registry = sse.SubscriberRegistry[str, int](queue_size=3, overflow_policy="drop_oldest")
+    queue = registry.subscribe("key")
+
+    for item in range(5):
+        registry.publish("key", item)
+
+    assert [await queue.get() for _ in range(3)] == [2, 3, 4]
+    assert registry.stats.dropped_events == 2
+    assert registry.stats.evicted_subscribers == 0
+
+
+async def test_disconnect_policy_evicts_slow_subscriber() -> None:
+    registry = sse.SubscriberRegistry[str, int](queue_size=3, overflow_policy="disconnect")
+    slow_queue = registry.subscribe("key")
+    fast_queue = registry.subscribe("key")
+
+    for item in range(5):
+        registry.publish("key", item)
+        assert await fast_queue.get() == item
+
+    assert slow_queue.evicted
+    assert await slow_queue.get() is None
+    assert not fast_queue.evicted
+    assert registry.stats.evicted_subscribers == 1
+
+
+def test_unsubscribe_removes_key_with_last_subscriber() -> None:
+    registry = sse.SubscriberRegistry[str, int](queue_size=3, overflow_policy="disconnect")
+    first = registry.subscribe("key")
+    second = registry.subscribe("key")
+
+    registry.unsubscribe("key", first)
+    assert registry.subscriber_count("key") == 1
+    assert registry.keys() == {"key"}
+
+    registry.unsubscribe("key", second)
+    assert registry.subscriber_count("key") == 0
+    assert registry.keys() == set()
+
+
+async def test_publish_does_not_block_on_stalled_subscribers() -> None:
+    subscriber_count = 1_000
+    registry = sse.SubscriberRegistry[str, int](queue_size=100, overflow_policy="disconnect")
+    queues = [registry.subscribe("key") for _ in range(subscriber_count)]
+
+    start = time.perf_counter()
+    async with asyncio.timeout(10):
+        for item in range(200):
+            registry.publish("key", item)
+    elapsed = time.perf_counter() - start
+
+    # nobody consumed, so every subscriber overflowed and was evicted, releasing its buffered events
+    assert all(queue.evicted and queue.qsize() == 1 for queue in queues)
+    assert registry.stats.evicted_subscribers == subscriber_count
+    assert elapsed < 5
+
+
+def test_replay_must_fit_subscriber_queue() -> None:
+    WebServiceSettings(sse_replay_events_per_conversation=100, sse_subscriber_queue_size=100)
+
+    with pytest.raises(ValidationError, match="sse_subscriber_queue_size"):
+        WebServiceSettings(sse_replay_events_per_conversation=101, sse_subscriber_queue_size=100)
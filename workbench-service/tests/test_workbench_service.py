@@ -7,6 +7,7 @@ import re
 import time
 from unittest.mock import AsyncMock, Mock
 import uuid
+import zipfile
 
 import httpx
 import openai_client
@@ -18,6 +19,8 @@ from fastapi.testclient import TestClient
 from pydantic import HttpUrl
 from pytest_httpx import HTTPXMock
 from semantic_workbench_api_model import workbench_model, workbench_service_client
+from semantic_workbench_service import sse
+from semantic_workbench_service.event import UserEventQueueItem
 
 
 from .types import MockUser
@@ -808,6 +811,26 @@ def test_create_conversation_send_user_message(workbench_service: FastAPI, test_
         message = messages.messages[1]
         assert message.id == message_log_id
 
+        # page through messages with cursors
+        http_response = client.get(f"/conversations/{conversation_id}/messages", params={"limit": 2})
+        assert httpx.codes.is_success(http_response.status_code)
+        messages = workbench_model.ConversationMessageList.model_validate(http_response.json())
+        assert [m.id for m in messages.messages] == [message_two_id, message_log_id]
+        assert messages.next_cursor is not None
+
+        http_response = client.get(
+            f"/conversations/{conversation_id}/messages", params={"limit": 2, "before_cursor": messages.next_cursor}
+        )
+        assert httpx.codes.is_success(http_response.status_code)
+        messages = workbench_model.ConversationMessageList.model_validate(http_response.json())
+        assert [m.id for m in messages.messages] == [message_id]
+        assert messages.next_cursor is None
+
+        http_response = client.get(
+            f"/conversations/{conversation_id}/messages", params={"before_cursor": "not-a-cursor"}
+        )
+        assert http_response.status_code == httpx.codes.BAD_REQUEST
+
         # get messages by type
         http_response = client.get(f"/conversations/{conversation_id}/messages", params={"message_type": "chat"})
         assert httpx.codes.is_success(http_response.status_code)
@@ -841,6 +864,71 @@ def test_create_conversation_send_user_message(workbench_service: FastAPI, test_
         assert conversation.latest_message is not None
         assert conversation.latest_message.id == message_log_id
 
+        # deleting the latest chat message makes the previous one the latest
+        http_response = client.delete(f"/conversations/{conversation_id}/messages/{message_two_id}")
+        assert httpx.codes.is_success(http_response.status_code)
+
+        http_response = client.get(f"/conversations/{conversation_id}")
+        assert httpx.codes.is_success(http_response.status_code)
+        conversation = workbench_model.Conversation.model_validate(http_response.json())
+        assert conversation.latest_message is not None
+        assert conversation.latest_message.id == message_id
+
+        http_response = client.get(f"/conversations/{conversation_id}", params={"latest_message_type": ["chat", "log"]})
+        assert httpx.codes.is_success(http_response.status_code)
+        conversation = workbench_model.Conversation.model_validate(http_response.json())
+        assert conversation.latest_message is not None
+        assert conversation.latest_message.id == message_log_id
+
+        http_response = client.delete(f"/conversations/{conversation_id}/messages/{message_id}")
+        assert httpx.codes.is_success(http_response.status_code)
+
+        http_response = client.get(f"/conversations/{conversation_id}")
+        assert httpx.codes.is_success(http_response.status_code)
+        conversation = workbench_model.Conversation.model_validate(http_response.json())
+        assert conversation.latest_message is None
+
+
+def test_list_conversations_paged(workbench_service: FastAPI, test_user: MockUser):
+    with TestClient(app=workbench_service, headers=test_user.authorization_headers) as client:
+        conversation_ids = []
+        for index in range(5):
+            http_response = client.post("/conversations", json={"title": f"test-conversation-{index}"})
+            assert httpx.codes.is_success(http_response.status_code)
+            conversation_id = http_response.json()["id"]
+            conversation_ids.append(conversation_id)
+
+            http_response = client.post(f"/conversations/{conversation_id}/messages", json={"content": f"{index}"})
+            assert httpx.codes.is_success(http_response.status_code)
+
+        http_response = client.get("/conversations")
+        assert httpx.codes.is_success(http_response.status_code)
+        conversations = workbench_model.ConversationList.model_validate(http_response.json())
+        assert conversations.next_cursor is None
+        all_conversations = conversations.conversations
+        assert [str(c.id) for c in all_conversations] == list(reversed(conversation_ids))
+
+        paged_conversations = []
+        params: dict[str, str | int] = {"limit": 2}
+        while True:
+            http_response = client.get("/conversations", params=params)
+            assert httpx.codes.is_success(http_response.status_code)
+            conversations = workbench_model.ConversationList.model_validate(http_response.json())
+            assert len(conversations.conversations) <= 2
+            paged_conversations.extend(conversations.conversations)
+            if conversations.next_cursor is None:
+                break
+            params["before"] = conversations.next_cursor
+
+        assert paged_conversations == all_conversations
+        for conversation in paged_conversations:
+            assert conversation.latest_message is not None
+            assert conversation.latest_message.content == conversation.title.removeprefix("test-conversation-")
+            assert [p.id for p in conversation.participants] == [test_user.id]
+
+        http_response = client.get("/conversations", params={"before": "not-a-cursor"})
+        assert http_response.status_code == httpx.codes.BAD_REQUEST
+
 
 @pytest.mark.httpx_mock(can_send_already_matched_responses=True)
 def test_create_assistant_send_assistant_message(
@@ -921,6 +1009,99 @@ def test_create_assistant_send_assistant_message(
         assert message["metadata"] == {"assistant_id": assistant_id, "generated_by": "test"}
 
 
+@pytest.mark.httpx_mock(can_send_already_matched_responses=True)
+def test_create_assistant_send_message_delta(
+    workbench_service: FastAPI,
+    httpx_mock: HTTPXMock,
+    test_user: MockUser,
+):
+    httpx_mock.add_response(
+        url=re.compile(f"http://testassistantservice/{id_segment}"),
+        method="PUT",
+        json=api_model.AssistantResponseModel(id="123").model_dump(),
+    )
+    httpx_mock.add_response(
+        url=re.compile(f"http://testassistantservice/{id_segment}/conversations/{id_segment}"),
+        method="PUT",
+        json=api_model.ConversationResponseModel(id="123").model_dump(),
+    )
+    httpx_mock.add_response(
+        url=re.compile(f"http://testassistantservice/{id_segment}/conversations/{id_segment}/events"),
+        method="POST",
+    )
+
+    with TestClient(app=workbench_service, headers=test_user.authorization_headers) as client:
+        registration = register_assistant_service(client)
+
+        http_response = client.post(
+            "/assistants",
+            json=workbench_model.NewAssistant(
+                name="test-assistant",
+                assistant_service_id=registration.assistant_service_id,
+            ).model_dump(mode="json"),
+        )
+        assert httpx.codes.is_success(http_response.status_code)
+        assistant_id = http_response.json()["id"]
+
+        http_response = client.post("/conversations", json={"title": "test-conversation"})
+        assert httpx.codes.is_success(http_response.status_code)
+        conversation_id = http_response.json()["id"]
+
+        http_response = client.post("/conversations", json={"title": "other-conversation"})
+        assert httpx.codes.is_success(http_response.status_code)
+        other_conversation_id = http_response.json()["id"]
+
+        http_response = client.put(f"/conversations/{conversation_id}/participants/{assistant_id}", json={})
+        assert httpx.codes.is_success(http_response.status_code)
+
+        assistant_headers = {
+            **workbench_service_client.AssistantServiceRequestHeaders(
+                assistant_service_id=registration.assistant_service_id,
+                api_key=registration.api_key or "",
+            ).to_headers(),
+            **workbench_service_client.AssistantRequestHeaders(
+                assistant_id=assistant_id,
+            ).to_headers(),
+        }
+        message_id = uuid.uuid4()
+        delta = workbench_model.NewConversationMessageDelta(content="hel").model_dump(mode="json")
+
+        http_response = client.post(
+            f"/conversations/{conversation_id}/messages/{message_id}/deltas", json=delta, headers=assistant_headers
+        )
+        assert http_response.status_code == httpx.codes.NO_CONTENT
+
+        # only assistants in the conversation can stream to it
+        http_response = client.post(
+            f"/conversations/{other_conversation_id}/messages/{message_id}/deltas",
+            json=delta,
+            headers=assistant_headers,
+        )
+        assert http_response.status_code == httpx.codes.NOT_FOUND
+
+        # and users cannot
+        http_response = client.post(f"/conversations/{conversation_id}/messages/{message_id}/deltas", json=delta)
+        assert http_response.status_code == httpx.codes.UNAUTHORIZED
+
+        # deltas are not stored
+        http_response = client.get(f"/conversations/{conversation_id}/messages")
+        assert httpx.codes.is_success(http_response.status_code)
+        assert http_response.json()["messages"] == []
+
+        # the message is stored once, when created with the id the deltas were sent for
+        http_response = client.post(
+            f"/conversations/{conversation_id}/messages",
+            json={"id": str(message_id), "content": "hello"},
+            headers=assistant_headers,
+        )
+        assert httpx.codes.is_success(http_response.status_code)
+
+        http_response = client.get(f"/conversations/{conversation_id}/messages")
+        assert httpx.codes.is_success(http_response.status_code)
+        messages = http_response.json()["messages"]
+        assert [(message["id"], message["content"]) for message in messages] == [(str(message_id), "hello")]
+
+
 def test_create_conversation_write_read_delete_file(
     workbench_service: FastAPI,
     test_user: MockUser,
@@ -1011,6 +1192,13 @@ def test_create_conversation_write_read_delete_file(
         assert httpx.codes.is_success(http_response.status_code)
         assert http_response.text == "hello world\n"
 
+        # write a file with the same content as a version of test.txt
+        payload = [
+            ("files", ("copy.txt", "hello world\n", "text/plain")),
+        ]
+        http_response = client.put(f"/conversations/{conversation_id}/files", files=payload)
+        assert httpx.codes.is_success(http_response.status_code)
+
         # delete a file
         http_response = client.delete(f"/conversations/{conversation_id}/files/test.txt")
         assert httpx.codes.is_success(http_response.status_code)
@@ -1021,6 +1209,11 @@ def test_create_conversation_write_read_delete_file(
         http_response = client.get(f"/conversations/{conversation_id}/files/test.txt/versions")
         assert http_response.status_code == httpx.codes.NOT_FOUND
 
+        # the content shared with the deleted file is still available
+        http_response = client.get(f"/conversations/{conversation_id}/files/copy.txt")
+        assert httpx.codes.is_success(http_response.status_code)
+        assert http_response.text == "hello world\n"
+
 
 @pytest.mark.httpx_mock(can_send_already_matched_responses=True)
 def test_create_assistant_export_import_data(
@@ -1091,8 +1284,9 @@ def test_create_assistant_export_import_data(
         assert httpx.codes.is_success(http_response.status_code)
 
         assert http_response.headers["content-type"] == "application/zip"
-        assert "content-length" in http_response.headers
-        assert int(http_response.headers["content-length"]) > 0
+        # exports are streamed, so the length is not known up front
+        assert "content-length" not in http_response.headers
+        assert len(http_response.content) > 0
 
         logging.info("response: %s", http_response.content)
 
@@ -1217,8 +1411,9 @@ def test_create_assistant_conversations_export_import_conversations(
         assert httpx.codes.is_success(http_response.status_code)
 
         assert http_response.headers["content-type"] == "application/zip"
-        assert "content-length" in http_response.headers
-        assert int(http_response.headers["content-length"]) > 0
+        # exports are streamed, so the length is not known up front
+        assert "content-length" not in http_response.headers
+        assert len(http_response.content) > 0
 
         logging.info("response: %s", http_response.content)
 
@@ -1346,6 +1541,90 @@ def test_export_import_conversations_with_files(
                             pytest.fail(f"unexpected file: {file.filename}")
 
 
+@pytest.fixture
+def published_user_events(monkeypatch: pytest.MonkeyPatch) -> list[tuple[str, UserEventQueueItem]]:
+    """
+    Records the events published to the user SSE subscribers. Must be requested before the workbench_service
+    fixture, which binds the publish method.
+    """
+    published: list[tuple[str, UserEventQueueItem]] = []
+    publish = sse.SubscriberRegistry.publish
+
+    def record_publish(self: sse.SubscriberRegistry, key, item) -> None:
+        if isinstance(item, UserEventQueueItem):
+            published.append((key, item))
+        publish(self, key, item)
+
+    monkeypatch.setattr(sse.SubscriberRegistry, "publish", record_publish)
+    return published
+
+
+def test_import_conversations_reports_progress(
+    published_user_events: list[tuple[str, UserEventQueueItem]],
+    workbench_service: FastAPI,
+    test_user: MockUser,
+) -> None:
+    with TestClient(app=workbench_service, headers=test_user.authorization_headers) as client:
+        http_response = client.post("/conversations", json={"title": "test-conversation"})
+        assert httpx.codes.is_success(http_response.status_code)
+        conversation = workbench_model.Conversation.model_validate(http_response.json())
+
+        http_response = client.get("/conversations/export", params={"id": [str(conversation.id)]})
+        assert httpx.codes.is_success(http_response.status_code)
+
+        http_response = client.post("/conversations/import", files={"from_export": io.BytesIO(http_response.content)})
+        assert httpx.codes.is_success(http_response.status_code)
+
+    progress_events = [item for user_id, item in published_user_events if item.event == "import.progress"]
+    assert progress_events
+    assert all(user_id == test_user.id for user_id, item in published_user_events if item.event == "import.progress")
+    assert progress_events[-1].data["conversations"] == 1
+
+
+def test_import_conversations_with_file_content_not_matching_digest(
+    workbench_service: FastAPI,
+    test_user: MockUser,
+) -> None:
+    with TestClient(app=workbench_service, headers=test_user.authorization_headers) as client:
+        http_response = client.post("/conversations", json={"title": "test-conversation"})
+        assert httpx.codes.is_success(http_response.status_code)
+
+        conversation = workbench_model.Conversation.model_validate(http_response.json())
+
+        http_response = client.put(
+            f"/conversations/{conversation.id}/files", files=[("files", ("test.txt", "hello world\n", "text/plain"))]
+        )
+        assert httpx.codes.is_success(http_response.status_code)
+
+        http_response = client.get("/conversations/export", params={"id": [str(conversation.id)]})
+        assert httpx.codes.is_success(http_response.status_code)
+
+        # replace the content of the file in the export
+        tampered_export = io.BytesIO()
+        with (
+            zipfile.ZipFile(io.BytesIO(http_response.content)) as exported,
+            zipfile.ZipFile(tampered_export, "w") as tampered,
+        ):
+            for entry in exported.infolist():
+                content = b"tampered\n" if entry.filename.startswith("files/") else exported.read(entry)
+                tampered.writestr(entry.filename, content)
+        tampered_export.seek(0)
+
+        http_response = client.post("/conversations/import", files={"from_export": tampered_export})
+        assert httpx.codes.is_success(http_response.status_code)
+
+        import_result = workbench_model.ConversationImportResult.model_validate(http_response.json())
+
+        # the imported file serves the content it was imported with, and the original is unchanged
+        http_response = client.get(f"/conversations/{import_result.conversation_ids[0]}/files/test.txt")
+        assert httpx.codes.is_success(http_response.status_code)
+        assert http_response.text == "tampered\n"
+
+        http_response = client.get(f"/conversations/{conversation.id}/files/test.txt")
+        assert httpx.codes.is_success(http_response.status_code)
+        assert http_response.text == "hello world\n"
+
+
 @pytest.mark.httpx_mock(can_send_already_matched_responses=True)
 def test_create_conversations_get_participants(
     workbench_service: FastAPI,
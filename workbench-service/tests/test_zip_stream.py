@@ -0,0 +1,47 @@
+import io
+import zipfile
+from typing import AsyncIterator
+
+import pytest
+
+from semantic_workbench_service import zip_stream
+
+
+async def _chunks(*chunks: bytes) -> AsyncIterator[bytes]:
+    for chunk in chunks:
+        yield chunk
+
+
+async def _missing() -> AsyncIterator[bytes]:
+    raise FileNotFoundError("missing")
+    yield b""
+
+
+async def test_zip_stream_round_trip() -> None:
+    archive = zip_stream.ZipStreamWriter()
+    output = io.BytesIO()
+
+    large_content = bytes(range(256)) * 10_000
+
+    async for data in archive.write("workbench.jsonl", _chunks(b'{"a": 1}\n', b'{"b": 2}\n')):
+        output.write(data)
+
+    async for data in archive.write("files/conversation/large", _chunks(*[large_content] * 3)):
+        output.write(data)
+
+    async for data in archive.write("empty", _chunks()):
+        output.write(data)
+
+    with pytest.raises(FileNotFoundError):
+        async for data in archive.write("missing", _missing()):
+            output.write(data)
+
+    output.write(archive.close())
+
+    output.seek(0)
+    with zipfile.ZipFile(output) as zip_file:
+        assert zip_file.testzip() is None
+        assert zip_file.namelist() == ["workbench.jsonl", "files/conversation/large", "empty"]
+        assert zip_file.read("workbench.jsonl") == b'{"a": 1}\n{"b": 2}\n'
+        assert zip_file.read("files/conversation/large") == large_content * 3
+        assert zip_file.read("empty") == b""